@@ -3,7 +3,7 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.admin import UserAdmin as DjangoUserAdmin
 from django.contrib.auth.forms import UserChangeForm
 
-from .models import UserProfile
+from .models import UserProfile, XPEvent
 
 User = get_user_model()
 
@@ -80,3 +80,16 @@ class UserAdmin(DjangoUserAdmin):
             ),
         }),
     )
+
+
+# ---------------------------
+# XP defteri (sadece okuma / itiraz incelemesi)
+# ---------------------------
+@admin.register(XPEvent)
+class XPEventAdmin(admin.ModelAdmin):
+    list_display = ("user", "reason", "amount", "day", "source_type", "source_id", "created_at")
+    list_filter = ("reason", "day")
+    search_fields = ("user__username",)
+    list_select_related = ("user", "source_type")
+    raw_id_fields = ("user",)
+    date_hierarchy = "day"
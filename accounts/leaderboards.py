@@ -0,0 +1,300 @@
+# accounts/leaderboards.py
+"""
+XP sıralamaları (liderlik tabloları).
+
+Tablolar: genel, sınıf (kurs.grade), kurs; her biri "all" (toplam XP) ve
+"week" (bu haftanın XP'si, pazartesi-pazar) dönemiyle.
+
+- Her tablo içerik cache'inde (CONTENT_CACHE_ALIAS) sıralı küme olarak
+  tutulur: Redis cache'te Redis ZSET, locmem cache'te process içi sıralı
+  liste (testler / geliştirme).
+- XP ödülü commit olunca ilgili tablolarda sadece o öğrencinin puanı
+  artırılır (ZINCRBY); "ilk 50 + benim sıram" tek tur, O(log n).
+- Tablo yoksa (ilk okuma, süresi doldu, reset) DB'den tek sorguyla kurulur.
+  LEADERBOARD_TIMEOUT sonunda tablolar düşer ve yeniden kurulur; olası
+  küçük sapmalar (ör. kurulumla aynı anda gelen ödül) böylece düzelir.
+- Kayıt (Enrollment) / kurs sınıfı değişince ilgili tablolar düşürülür.
+"""
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache.backends.redis import RedisCache
+from django.db.models import Sum
+from django.utils import timezone
+
+from content.caching import content_cache
+
+from .models import StudentStats, XPEvent
+
+
+SCOPES = ("global", "grade", "course")
+PERIODS = ("all", "week")
+GEN_KEY = "lb:gen"
+
+
+def board_timeout() -> int:
+    return getattr(settings, "LEADERBOARD_TIMEOUT", 60 * 60 * 6)
+
+
+def week_start(day=None):
+    day = day or timezone.localdate()
+    return day - timedelta(days=day.weekday())
+
+
+# ---------------------------
+# Sıralı küme deposu
+# ---------------------------
+
+class _LocalBoards:
+    """Process içi ZSET: {key: (scores, [(-score, member)], expires_at)}"""
+
+    def __init__(self):
+        self._boards = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        board = self._boards.get(key)
+        if board and board[2] < time.monotonic():
+            del self._boards[key]
+            return None
+        return board
+
+    def replace(self, key, scores, timeout):
+        order = sorted((-s, m) for m, s in scores.items())
+        now = time.monotonic()
+        with self._lock:
+            # eski nesil / süresi dolmuş tablolar burada temizlenir
+            for k in [k for k, b in self._boards.items() if b[2] < now]:
+                del self._boards[k]
+            self._boards[key] = (dict(scores), order, time.monotonic() + timeout)
+
+    def incr(self, key, member, amount):
+        with self._lock:
+            board = self._get(key)
+            if board is None:
+                return
+            scores, order, _ = board
+            old = scores.get(member)
+            if old is not None:
+                del order[bisect_left(order, (-old, member))]
+            scores[member] = new = (old or 0) + amount
+            insort(order, (-new, member))
+
+    def drop(self, keys):
+        with self._lock:
+            for key in keys:
+                self._boards.pop(key, None)
+
+    def read(self, key, limit, member):
+        """Dönüş: None (tablo yok) veya (top, rank, score, size)"""
+        with self._lock:
+            board = self._get(key)
+            if board is None:
+                return None
+            scores, order, _ = board
+            top = [(m, -s) for s, m in order[:limit]]
+            score = scores.get(member)
+            rank = bisect_left(order, (-score, member)) if score is not None else None
+            return top, rank, score, len(order)
+
+
+# tablo yoksa puan artırılmaz (yarım tablo oluşmasın); tablo boşken ilk
+# ZINCRBY ile oluşan küme, hazır anahtarının kalan süresini devralır
+_INCR_IF_READY = """
+if redis.call('exists', KEYS[1]) == 0 then
+    return false
+end
+local score = redis.call('zincrby', KEYS[2], ARGV[2], ARGV[1])
+if redis.call('ttl', KEYS[2]) < 0 then
+    redis.call('pexpire', KEYS[2], redis.call('pttl', KEYS[1]))
+end
+return score
+"""
+
+
+class _RedisBoards:
+    """
+    Tablo = ZSET + "<key>:ready" anahtarı (boş tablo da "kurulu" sayılsın diye;
+    Redis boş ZSET'i silinmiş kabul eder).
+    """
+
+    def __init__(self, cache):
+        self._cache = cache
+
+    def _keys(self, key):
+        board = self._cache.make_and_validate_key(key)
+        return f"{board}:ready", board
+
+    def _client(self, key):
+        return self._cache._cache.get_client(key, write=True)
+
+    def replace(self, key, scores, timeout):
+        ready, board = self._keys(key)
+        pipe = self._client(board).pipeline(transaction=True)
+        pipe.delete(board)
+        if scores:
+            pipe.zadd(board, scores)
+            pipe.expire(board, timeout)
+        pipe.set(ready, 1, ex=timeout)
+        pipe.execute()
+
+    def incr(self, key, member, amount):
+        ready, board = self._keys(key)
+        self._client(board).eval(_INCR_IF_READY, 2, ready, board, member, amount)
+
+    def drop(self, keys):
+        names = [k for key in keys for k in self._keys(key)]
+        if names:
+            self._client(names[0]).delete(*names)
+
+    def read(self, key, limit, member):
+        ready, board = self._keys(key)
+        pipe = self._client(board).pipeline(transaction=False)
+        pipe.exists(ready)
+        pipe.zrevrange(board, 0, limit - 1, withscores=True)
+        pipe.zrevrank(board, member)
+        pipe.zscore(board, member)
+        pipe.zcard(board)
+        exists, top, rank, score, size = pipe.execute()
+        if not exists:
+            return None
+        return (
+            [(int(m), int(s)) for m, s in top],
+            rank,
+            int(score) if score is not None else None,
+            size,
+        )
+
+
+_local_boards = _LocalBoards()
+
+
+def _store():
+    cache = content_cache()
+    return _RedisBoards(cache) if isinstance(cache, RedisCache) else _local_boards
+
+
+def _generation() -> int:
+    cache = content_cache()
+    gen = cache.get(GEN_KEY)
+    if gen is None:
+        cache.add(GEN_KEY, int(time.time()), None)
+        gen = cache.get(GEN_KEY, 0)
+    return gen
+
+
+def _key(gen, scope, scope_id, period, day=None) -> str:
+    window = week_start(day).isoformat() if period == "week" else "all"
+    return f"lb:{gen}:{scope}:{scope_id or 0}:{window}"
+
+
+# ---------------------------
+# Kurulum (DB'den)
+# ---------------------------
+
+def _members_filter(scope, scope_id):
+    from courses.models import Enrollment
+
+    if scope == "course":
+        return {"user_id__in": Enrollment.objects.filter(course_id=scope_id).values("user_id")}
+    if scope == "grade":
+        return {"user_id__in": Enrollment.objects.filter(course__grade_id=scope_id).values("user_id")}
+    return {}
+
+
+def load_scores(scope, scope_id=None, period="all", day=None):
+    """Dönüş: {user_id: xp} (tek sorgu)"""
+    members = _members_filter(scope, scope_id)
+
+    if period == "week":
+        start = week_start(day)
+        rows = (
+            XPEvent.objects
+            .filter(day__gte=start, day__lt=start + timedelta(days=7), **members)
+            .exclude(reason=XPEvent.Reason.OPENING)
+            .order_by()
+            .values("user_id")
+            .annotate(total=Sum("amount"))
+            .values_list("user_id", "total")
+        )
+    else:
+        rows = StudentStats.objects.filter(xp__gt=0, **members).values_list("user_id", "xp")
+
+    return {uid: xp for uid, xp in rows if xp}
+
+
+# ---------------------------
+# Okuma
+# ---------------------------
+
+def standings(scope, scope_id=None, period="all", user_id=None, limit: int = 50):
+    """
+    Dönüş: {"top": [(user_id, xp)], "rank": 1'den başlayan sıra veya None,
+            "xp": kullanıcının puanı veya None, "size": tablodaki öğrenci sayısı}
+    Sıcak yolda tek tur (Redis pipeline); tablo yoksa önce kurulur.
+    """
+    store = _store()
+    key = _key(_generation(), scope, scope_id, period)
+
+    result = store.read(key, limit, user_id or 0)
+    if result is None:
+        store.replace(key, load_scores(scope, scope_id, period), board_timeout())
+        result = store.read(key, limit, user_id or 0)
+
+    top, rank, score, size = result
+    return {
+        "top": top,
+        "rank": rank + 1 if rank is not None else None,
+        "xp": score,
+        "size": size,
+    }
+
+
+# ---------------------------
+# Artımlı güncelleme / geçersiz kılma
+# ---------------------------
+
+def scopes_for(user_id):
+    """Dönüş: [("global", None), ("course", id), ("grade", id), ...] (tek sorgu)"""
+    from courses.models import Enrollment
+
+    scopes = {("global", None)}
+    for course_id, grade_id in Enrollment.objects.filter(user_id=user_id).values_list("course_id", "course__grade_id"):
+        scopes.add(("course", course_id))
+        if grade_id:
+            scopes.add(("grade", grade_id))
+    return scopes
+
+
+def on_xp(user_id, amount: int, day=None, reason=None):
+    """XP ödülü commit olduktan sonra çağrılır: kurulu tablolarda puanı artırır."""
+    if not amount:
+        return
+
+    periods = ["all"]
+    # açılış bakiyesi haftalık yarışa sayılmaz; geçmiş haftalar okunmuyor
+    if reason != XPEvent.Reason.OPENING and week_start(day) == week_start():
+        periods.append("week")
+
+    store = _store()
+    gen = _generation()
+    for scope, scope_id in scopes_for(user_id):
+        for period in periods:
+            store.incr(_key(gen, scope, scope_id, period, day), user_id, amount)
+
+
+def invalidate(scope, scope_id=None):
+    """Üyelik değişti: tablo bir sonraki okumada DB'den yeniden kurulur."""
+    gen = _generation()
+    _store().drop([_key(gen, scope, scope_id, period) for period in PERIODS])
+
+
+def reset():
+    """Tüm tablolar (rebuild_xp sonrası vb.): nesil artar, eskiler süresiyle düşer."""
+    try:
+        content_cache().incr(GEN_KEY)
+    except ValueError:
+        _generation()
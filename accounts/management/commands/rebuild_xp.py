@@ -0,0 +1,75 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+
+from accounts import leaderboards
+from accounts.models import StudentStats, XPEvent
+from accounts.xp import streak_from_days
+
+
+class Command(BaseCommand):
+    help = "StudentStats xp/streak değerlerini XPEvent defterinden yeniden hesaplar"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        # 1) XP: tek aggregate sorgu
+        xp_by_user = dict(
+            XPEvent.objects.order_by().values("user_id").annotate(total=Sum("amount")).values_list("user_id", "total")
+        )
+
+        # 2) Streak: tamamlanan günler, user + gün sıralı tek akış
+        streak_by_user = {}
+        days, current = [], None
+        rows = (
+            XPEvent.objects
+            .filter(reason=XPEvent.Reason.PLAN_DAY)
+            .order_by("user_id", "day")
+            .values_list("user_id", "day")
+            .distinct()
+            .iterator(chunk_size=batch_size)
+        )
+        for user_id, day in rows:
+            if user_id != current:
+                if current is not None:
+                    streak_by_user[current] = streak_from_days(days)
+                days, current = [], user_id
+            days.append(day)
+        if current is not None:
+            streak_by_user[current] = streak_from_days(days)
+
+        # 3) Farkları yaz
+        changed = []
+        seen = set()
+        for stats in StudentStats.objects.only("id", "user_id", "xp", "streak", "last_streak_date").iterator(chunk_size=batch_size):
+            seen.add(stats.user_id)
+            before = (stats.xp, stats.streak, stats.last_streak_date)
+            stats.xp = max(0, xp_by_user.get(stats.user_id, 0))
+            # defterde hiç gün tamamlama yoksa eski streak korunur
+            if stats.user_id in streak_by_user:
+                stats.streak, stats.last_streak_date = streak_by_user[stats.user_id]
+            if (stats.xp, stats.streak, stats.last_streak_date) != before:
+                changed.append(stats)
+
+        missing = []
+        for user_id in (set(xp_by_user) | set(streak_by_user)) - seen:
+            streak, last = streak_by_user.get(user_id, (0, None))
+            missing.append(StudentStats(
+                user_id=user_id, xp=max(0, xp_by_user.get(user_id, 0)), streak=streak, last_streak_date=last,
+            ))
+
+        if not options["dry_run"]:
+            with transaction.atomic():
+                StudentStats.objects.bulk_update(changed, ["xp", "streak", "last_streak_date"], batch_size=batch_size)
+                StudentStats.objects.bulk_create(missing, batch_size=batch_size, ignore_conflicts=True)
+            if changed or missing:
+                leaderboards.reset()
+
+        suffix = " (dry-run, yazılmadı)" if options["dry_run"] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(changed)} öğrencinin istatistiği düzeltildi, {len(missing)} yeni kayıt açıldı{suffix}."
+        ))
@@ -0,0 +1,46 @@
+# Generated by Django 6.0 on 2026-10-18 12:58
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def opening_balances(apps, schema_editor):
+    # Defterden önce birikmiş XP kaybolmasın: her öğrenciye tek açılış kaydı
+    StudentStats = apps.get_model("accounts", "StudentStats")
+    XPEvent = apps.get_model("accounts", "XPEvent")
+    XPEvent.objects.bulk_create([
+        XPEvent(user_id=user_id, reason="opening", amount=xp, day=last or django.utils.timezone.localdate())
+        for user_id, xp, last in StudentStats.objects.filter(xp__gt=0).values_list("user_id", "xp", "last_streak_date")
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_alter_user_role'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='XPEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reason', models.CharField(choices=[('opening', 'Açılış bakiyesi'), ('plan_item', 'Plan maddesi tamamlandı'), ('plan_day', 'Günlük plan tamamlandı'), ('manual', 'Elle düzeltme')], max_length=20)),
+                ('amount', models.IntegerField()),
+                ('source_id', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('day', models.DateField(default=django.utils.timezone.localdate)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('source_type', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='contenttypes.contenttype')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='xp_events', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-id'],
+                'indexes': [models.Index(fields=['user', 'reason', 'day'], name='accounts_xp_user_id_3a9753_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'reason', 'source_type', 'source_id'), name='uniq_xp_event_source')],
+            },
+        ),
+        migrations.RunPython(opening_balances, migrations.RunPython.noop),
+    ]
@@ -47,3 +47,42 @@ class StudentStats(models.Model):
     def __str__(self):
         return f"{self.user.username} xp={self.xp} streak={self.streak}"
 
+
+
+class XPEvent(models.Model):
+    """
+    XP defteri (sadece eklenir). StudentStats.xp bu tablonun toplamıdır;
+    rebuild_xp komutu toplamları buradan yeniden hesaplar.
+    Aynı kaynak için aynı sebeple ikinci kayıt açılamaz (çift ödül olmaz).
+    """
+    class Reason(models.TextChoices):
+        OPENING = "opening", "Açılış bakiyesi"
+        PLAN_ITEM = "plan_item", "Plan maddesi tamamlandı"
+        PLAN_DAY = "plan_day", "Günlük plan tamamlandı"
+        MANUAL = "manual", "Elle düzeltme"
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="xp_events")
+    reason = models.CharField(max_length=20, choices=Reason.choices)
+    amount = models.IntegerField()
+
+    # kaynak nesne (örn. DailyPlanItem / DailyPlan)
+    source_type = models.ForeignKey("contenttypes.ContentType", null=True, blank=True, on_delete=models.SET_NULL)
+    source_id = models.PositiveBigIntegerField(null=True, blank=True)
+
+    day = models.DateField(default=timezone.localdate)  # streak hesabı için
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-id"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "reason", "source_type", "source_id"],
+                name="uniq_xp_event_source",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["user", "reason", "day"]),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.reason} {self.amount:+d}"
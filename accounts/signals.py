@@ -1,8 +1,10 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 
+from . import leaderboards
 from .models import UserProfile
 
 User = get_user_model()
@@ -11,3 +13,36 @@ User = get_user_model()
 def create_profile(sender, instance, created, **kwargs):
     if created:
         UserProfile.objects.create(user=instance, last_seen=timezone.now())
+
+
+# ---------------------------
+# Liderlik tabloları: üyelik değişince ilgili tablolar düşer
+# ---------------------------
+
+@receiver(post_save, sender="courses.Enrollment")
+@receiver(post_delete, sender="courses.Enrollment")
+def enrollment_changed(sender, instance, created=True, **kwargs):
+    if not created:
+        return
+    from courses.models import Course
+
+    course_id = instance.course_id
+    grade_id = Course.objects.filter(id=course_id).values_list("grade_id", flat=True).first()
+
+    def drop():
+        leaderboards.invalidate("course", course_id)
+        if grade_id:
+            leaderboards.invalidate("grade", grade_id)
+
+    transaction.on_commit(drop)
+
+
+@receiver(pre_save, sender="courses.Course")
+def course_grade_changing(sender, instance, **kwargs):
+    if not instance.pk:
+        return
+    old = sender.objects.filter(pk=instance.pk).values_list("grade_id", flat=True).first()
+    if old == instance.grade_id:
+        return
+    grades = [g for g in (old, instance.grade_id) if g]
+    transaction.on_commit(lambda: [leaderboards.invalidate("grade", g) for g in grades])
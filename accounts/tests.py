@@ -1,3 +1,58 @@
-from django.test import TestCase
+from datetime import date, timedelta
 
-# Create your tests here.
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+from content.models import DailyPlan
+
+from . import leaderboards
+from .models import StudentStats, User, XPEvent
+from .xp import award, award_plan_day
+
+
+class XPAwardTests(TestCase):
+    def setUp(self):
+        self.student = User.objects.create_user("ogrenci", password="x")
+
+    def _stats(self):
+        return StudentStats.objects.get(user=self.student)
+
+    def _finish_day(self, day):
+        plan = DailyPlan.objects.create(user=self.student, date=day)
+        return award_plan_day(self.student.id, plan)
+
+    def test_streak_grows_on_consecutive_days(self):
+        day = date(2026, 10, 1)
+        for offset in range(3):
+            self._finish_day(day + timedelta(days=offset))
+        stats = self._stats()
+        self.assertEqual((stats.streak, stats.last_streak_date), (3, day + timedelta(days=2)))
+
+    def test_late_plan_for_older_day_keeps_streak(self):
+        day = date(2026, 10, 10)
+        self._finish_day(day - timedelta(days=1))
+        self._finish_day(day)
+        self.assertTrue(self._finish_day(day - timedelta(days=5)))
+
+        stats = self._stats()
+        self.assertEqual((stats.streak, stats.last_streak_date), (2, day))
+        self.assertEqual(stats.xp, 150)
+
+    def test_negative_manual_adjustment_is_clamped(self):
+        award(self.student.id, XPEvent.Reason.MANUAL, 30)
+        award(self.student.id, XPEvent.Reason.MANUAL, -100)
+        self.assertEqual(self._stats().xp, 0)
+
+
+@override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "default"},
+        "content": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "content"},
+    },
+    CONTENT_CACHE_ALIAS="content",
+)
+class LeaderboardCacheTests(TestCase):
+    def test_generation_lives_in_content_cache(self):
+        leaderboards.reset()
+        self.assertIsNotNone(caches["content"].get(leaderboards.GEN_KEY))
+        self.assertIsNone(caches["default"].get(leaderboards.GEN_KEY))
@@ -0,0 +1,88 @@
+# accounts/xp.py
+"""
+XP / streak yazımı: her ödül XPEvent defterine eklenir ve StudentStats
+aynı transaction içinde F() ile artırılır (okuma-yaz-kaydet yok, kilit yok).
+Commit sonrası liderlik tabloları artımlı güncellenir.
+"""
+from datetime import timedelta
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from . import leaderboards
+from .models import StudentStats, XPEvent
+
+
+XP_PLAN_ITEM = 10
+XP_PLAN_DAY = 50
+
+
+def _bump_stats(user_id, **changes):
+    if not StudentStats.objects.filter(user_id=user_id).update(**changes):
+        StudentStats.objects.get_or_create(user_id=user_id)
+        StudentStats.objects.filter(user_id=user_id).update(**changes)
+
+
+def award(user_id, reason, amount: int, source=None, day=None, streak: bool = False) -> bool:
+    """
+    Dönüş: True = ödül verildi, False = bu kaynak için zaten verilmiş.
+    streak=True ise gün serisi de (aynı UPDATE içinde) ilerler; seriden eski
+    bir gün (geç kapanan plan) seriyi değiştirmez.
+    Negatif amount (elle düzeltme) toplamı 0'ın altına indirmez.
+    """
+    day = day or timezone.localdate()
+    source_type = ContentType.objects.get_for_model(source) if source is not None else None
+
+    with transaction.atomic():
+        try:
+            with transaction.atomic():
+                XPEvent.objects.create(
+                    user_id=user_id,
+                    reason=reason,
+                    amount=amount,
+                    source_type=source_type,
+                    source_id=source.pk if source is not None else None,
+                    day=day,
+                )
+        except IntegrityError:
+            return False
+
+        # xp PositiveIntegerField: rebuild_xp ile aynı şekilde 0'da kırpılır
+        changes = {"xp": F("xp") + amount if amount >= 0 else Greatest(F("xp") + amount, Value(0))}
+        if streak:
+            changes["streak"] = Case(
+                When(last_streak_date__gte=day, then=F("streak")),
+                When(last_streak_date=day - timedelta(days=1), then=F("streak") + 1),
+                default=Value(1),
+            )
+            changes["last_streak_date"] = Case(
+                When(last_streak_date__gt=day, then=F("last_streak_date")),
+                default=Value(day),
+            )
+        _bump_stats(user_id, **changes)
+        transaction.on_commit(lambda: leaderboards.on_xp(user_id, amount, day, reason))
+
+    return True
+
+
+def award_plan_item(user_id, item) -> bool:
+    return award(user_id, XPEvent.Reason.PLAN_ITEM, XP_PLAN_ITEM, source=item)
+
+
+def award_plan_day(user_id, plan) -> bool:
+    return award(user_id, XPEvent.Reason.PLAN_DAY, XP_PLAN_DAY, source=plan, day=plan.date, streak=True)
+
+
+def streak_from_days(days):
+    """
+    days: artan sıralı tarih listesi (tekrarsız).
+    Dönüş: (son günle biten ardışık gün sayısı, son gün)
+    """
+    streak, last = 0, None
+    for d in days:
+        streak = streak + 1 if last is not None and d - last == timedelta(days=1) else 1
+        last = d
+    return streak, last
@@ -0,0 +1,4 @@
+# Django başlarken Celery app'i de yüklensin (shared_task'lar buna bağlanır)
+from .celery import app as celery_app
+
+__all__ = ("celery_app",)
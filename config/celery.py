@@ -0,0 +1,36 @@
+# config/celery.py
+import os
+
+from celery import Celery
+from celery.schedules import crontab
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+app = Celery("config")
+
+# settings.py içindeki CELERY_* ayarları
+app.config_from_object("django.conf:settings", namespace="CELERY")
+app.autodiscover_tasks()
+
+app.conf.beat_schedule = {
+    # Ertesi günün planlarını sabah yoğunluğundan önce hazırla
+    "build-daily-plans": {
+        "task": "content.tasks.build_daily_plans_task",
+        "schedule": crontab(hour=23, minute=30),
+    },
+    # Video nabız tamponu (content/heartbeats.py)
+    "flush-video-progress": {
+        "task": "content.tasks.flush_video_progress_task",
+        "schedule": 60.0,
+    },
+    # Yarım kalmış parçalı yüklemeler (content/uploads.py)
+    "purge-uploads": {
+        "task": "content.tasks.purge_uploads_task",
+        "schedule": crontab(minute=15),
+    },
+    # Referansı kalmamış blob dosyaları (content/blobs.py)
+    "purge-blobs": {
+        "task": "content.tasks.purge_blobs_task",
+        "schedule": crontab(hour=4, minute=0),
+    },
+}
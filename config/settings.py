@@ -168,6 +168,63 @@ else:
         }
     }
 
+# -------------------------------------------------
+# CACHE
+# -------------------------------------------------
+# Örn: DJANGO_CACHE_URL="redis://127.0.0.1:6379/1"
+# Boşsa process içi locmem kullanılır (tek gunicorn worker / local için yeterli)
+CACHE_URL = os.getenv("DJANGO_CACHE_URL", "").strip()
+
+if CACHE_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Konu ağacı vb. içerik cache'i hangi alias'ı kullansın (CACHES içinde olmalı)
+CONTENT_CACHE_ALIAS = os.getenv("DJANGO_CONTENT_CACHE_ALIAS", "default")
+# İçerik cache'i locmem ise (worker'lar arası paylaşılmaz) kayıtlar en fazla bu kadar saniye tutulur
+CONTENT_LOCAL_CACHE_TIMEOUT = int(os.getenv("DJANGO_CONTENT_LOCAL_CACHE_TIMEOUT", "60"))
+TOPIC_TREE_CACHE_TIMEOUT = int(os.getenv("DJANGO_TOPIC_TREE_CACHE_TIMEOUT", str(60 * 60 * 24)))
+TOPIC_DETAIL_CACHE_TIMEOUT = int(os.getenv("DJANGO_TOPIC_DETAIL_CACHE_TIMEOUT", str(60 * 60 * 24)))
+# Video ilerleme nabızları en geç bu kadar saniyede bir DB'ye yazılır (sadece Redis cache ile;
+# locmem'de her nabız doğrudan yazılır)
+VIDEO_FLUSH_INTERVAL = int(os.getenv("DJANGO_VIDEO_FLUSH_INTERVAL", "60"))
+# Adaptif test soru indeksi (istatistikler bu sıklıkla tazelenir)
+ADAPTIVE_INDEX_TIMEOUT = int(os.getenv("DJANGO_ADAPTIVE_INDEX_TIMEOUT", "600"))
+# Liderlik tabloları (accounts/leaderboards.py) bu süre sonunda DB'den yeniden kurulur
+LEADERBOARD_TIMEOUT = int(os.getenv("DJANGO_LEADERBOARD_TIMEOUT", str(60 * 60 * 6)))
+# Öğrencinin kurs ilerleme özetleri (dashboard) bu kadar saniye cache'lenir
+COURSE_PROGRESS_CACHE_TIMEOUT = int(os.getenv("DJANGO_COURSE_PROGRESS_CACHE_TIMEOUT", "300"))
+
+# -------------------------------------------------
+# TEKRAR ZAMANLAYICISI (content/scheduling.py)
+# -------------------------------------------------
+# "sm2" | "fsrs" | "fixed" (eski 1-3-7-14 gün)
+REVIEW_SCHEDULER = os.getenv("DJANGO_REVIEW_SCHEDULER", "sm2")
+REVIEW_DESIRED_RETENTION = float(os.getenv("DJANGO_REVIEW_DESIRED_RETENTION", "0.9"))  # fsrs
+REVIEW_MAX_INTERVAL_DAYS = int(os.getenv("DJANGO_REVIEW_MAX_INTERVAL_DAYS", "60"))
+
+# -------------------------------------------------
+# CELERY
+# -------------------------------------------------
+# Örn: CELERY_BROKER_URL="redis://127.0.0.1:6379/2"
+# Broker yoksa görevler istek içinde senkron çalışır (local / test)
+_celery_broker = os.getenv("CELERY_BROKER_URL", "").strip()
+CELERY_BROKER_URL = _celery_broker or "memory://"
+CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "").strip() or None
+CELERY_TASK_ALWAYS_EAGER = (not _celery_broker) or os.getenv("CELERY_TASK_ALWAYS_EAGER", "0") == "1"
+CELERY_TASK_EAGER_PROPAGATES = True
+CELERY_TIMEZONE = "Europe/Istanbul"
+
 # -------------------------------------------------
 # AUTH
 # -------------------------------------------------
@@ -200,14 +257,66 @@ STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
 STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
     "staticfiles": {
         "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
-    }
+    },
+    # Yüklenen dosyalar içerik özetiyle, tekilleştirilerek "default" üzerine yazılır (content/blobs.py)
+    "blobs": {
+        "BACKEND": "content.blobs.BlobStorage",
+    },
 }
 
+# Yükleme okunurken SHA-256 hesaplanır (blob deposu dosyayı tekrar okumaz)
+FILE_UPLOAD_HANDLERS = [
+    "content.blobs.HashingMemoryFileUploadHandler",
+    "content.blobs.HashingTemporaryFileUploadHandler",
+]
+
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Yüklemeler (LessonFile, LessonVideo, TopicContent.file, Message.file) nereye:
+#   "local": MEDIA_ROOT (tek sunucu; Nginx /media servis eder)
+#   "s3"   : S3 uyumlu bucket (AWS S3, MinIO, R2 ...); bucket private kalır,
+#            indirmeler kısa ömürlü imzalı (presigned) URL ile doğrudan bucket'tan
+MEDIA_STORAGE = os.getenv("DJANGO_MEDIA_STORAGE", "local")
+# İmzalı URL geçerlilik süresi (saniye)
+MEDIA_URL_EXPIRE = int(os.getenv("DJANGO_MEDIA_URL_EXPIRE", "600"))
+# Yerel depolamada korumalı dosyalar Nginx'e devredilir (X-Accel-Redirect);
+# boşsa Django kendisi (Range destekli) akıtır. Bkz. content/media.py
+MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv("DJANGO_MEDIA_ACCEL_REDIRECT_PREFIX", "")
+# Parçalı yükleme (content/uploads.py): dosya ve tek parça üst sınırları (bayt)
+UPLOAD_MAX_SIZE = int(os.getenv("DJANGO_UPLOAD_MAX_SIZE", str(20 * 1024 ** 3)))
+UPLOAD_CHUNK_MAX_SIZE = int(os.getenv("DJANGO_UPLOAD_CHUNK_MAX_SIZE", str(64 * 1024 ** 2)))
+# Bu süreden (saniye) uzun süren birleştirme ölü sayılır, finalize tekrar edilebilir
+UPLOAD_ASSEMBLE_TIMEOUT = int(os.getenv("DJANGO_UPLOAD_ASSEMBLE_TIMEOUT", str(2 * 60 * 60)))
+# Önizleme görsellerinin en büyük boyutu (content/mediaproc.py)
+MEDIA_PREVIEW_SIZE = (480, 480)
+
+if MEDIA_STORAGE == "s3":
+    _s3_endpoint = os.getenv("DJANGO_S3_ENDPOINT_URL", "").strip() or None  # MinIO: http://minio:9000
+    STORAGES["default"] = {
+        "BACKEND": "storages.backends.s3.S3Storage",
+        "OPTIONS": {
+            "bucket_name": os.getenv("DJANGO_S3_BUCKET", ""),
+            "access_key": os.getenv("DJANGO_S3_ACCESS_KEY", ""),
+            "secret_key": os.getenv("DJANGO_S3_SECRET_KEY", ""),
+            "endpoint_url": _s3_endpoint,
+            "region_name": os.getenv("DJANGO_S3_REGION", "").strip() or None,
+            "location": os.getenv("DJANGO_S3_PREFIX", "media"),
+            "default_acl": None,
+            "file_overwrite": False,
+            "querystring_auth": True,
+            "querystring_expire": MEDIA_URL_EXPIRE,
+            "signature_version": "s3v4",
+            # MinIO vb. sanal host adreslemeyi desteklemez
+            "addressing_style": "path" if _s3_endpoint else None,
+        },
+    }
+
 # -------------------------------------------------
 # DRF
 # -------------------------------------------------
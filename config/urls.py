@@ -39,6 +39,6 @@ urlpatterns = [
     path("", include("parents.urls")),
 ]
 
-# Media sadece DEBUG'da (prod'da Nginx servis etmeli)
-if settings.DEBUG:
+# Media sadece DEBUG'da ve yerel depolamada (prod'da Nginx / S3 servis eder)
+if settings.DEBUG and settings.MEDIA_STORAGE == "local":
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -0,0 +1,160 @@
+# content/adaptive.py
+"""
+Adaptif mini test (1PL / Rasch modeli).
+
+- Soru zorluğu (b): TopicQuestionStats'taki doğru oranından; az cevaplanmış
+  sorularda TopicQuestion.difficulty (1-5) ön bilgi olarak karışır.
+- Öğrenci yeteneği (theta): EAP tahmini, N(0, 1) ön dağılım.
+- Seçim: theta'ya en yakın b (en çok bilgi veren soru); en yakın birkaç
+  aday içinden en az gösterilmiş olan seçilir (aşırı gösterimi önler).
+
+Konu başına indeks cache'te kompakt tutulur: b'ye göre sıralı
+(b, question_id, correct) üçlüleri. Seçim tabloyu taramaz, bisect ile yapılır.
+"""
+import math
+import random
+from bisect import bisect_left
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .caching import content_cache
+from .models import TopicQuestion, TopicQuestionStats
+
+
+MAX_ITEMS = 10          # en fazla bu kadar soru
+MIN_ITEMS = 3           # en az bu kadar soru
+TARGET_SE = 0.5         # tahmin bu hassasiyete inince dur
+CANDIDATES = 3          # en yakın kaç aday arasından seçilsin
+PRIOR_WEIGHT = 10       # difficulty ön bilgisi kaç "sanal cevap" ağırlığında
+
+_GRID = [x / 10 for x in range(-40, 41)]  # theta ızgarası: -4.0 .. 4.0
+
+
+def _logistic(x):
+    return 1 / (1 + math.exp(-x))
+
+
+def item_difficulty(difficulty: int, answers: int, correct: int) -> float:
+    prior_b = (max(1, min(5, difficulty or 1)) - 3) * 0.75
+    prior_p = _logistic(-prior_b)
+    p = (correct + PRIOR_WEIGHT * prior_p) / (answers + PRIOR_WEIGHT)
+    p = min(0.98, max(0.02, p))
+    return math.log((1 - p) / p)
+
+
+# ---------------------------
+# Konu indeksi (cache)
+# ---------------------------
+
+def _index_key(topic_id: int) -> str:
+    return f"topics:adaptive:{topic_id}"
+
+
+def build_index(topic_id: int):
+    rows = (
+        TopicQuestion.objects
+        .filter(topic_id=topic_id)
+        .values_list("id", "difficulty", "correct", "stats__answers", "stats__correct", "stats__exposures")
+    )
+    items = []
+    for qid, difficulty, correct_letter, answers, correct, exposures in rows:
+        b = item_difficulty(difficulty, answers or 0, correct or 0)
+        items.append((round(b, 3), qid, correct_letter, exposures or 0))
+    items.sort()
+    return items
+
+
+def get_index(topic_id: int):
+    c = content_cache()
+    items = c.get(_index_key(topic_id))
+    if items is None:
+        items = build_index(topic_id)
+        c.set(_index_key(topic_id), items, getattr(settings, "ADAPTIVE_INDEX_TIMEOUT", 600))
+    return items
+
+
+def invalidate_index(*topic_ids):
+    content_cache().delete_many([_index_key(tid) for tid in topic_ids if tid])
+
+
+# ---------------------------
+# Tahmin + seçim
+# ---------------------------
+
+def estimate(responses, b_by_id, prior_mean: float = 0.0):
+    """
+    responses: [(question_id, is_correct)]
+    Dönüş: (theta, se)  — EAP, N(prior_mean, 1) ön dağılım
+    """
+    weights = []
+    for theta in _GRID:
+        log_w = -(theta - prior_mean) ** 2 / 2
+        for qid, ok in responses:
+            b = b_by_id.get(qid)
+            if b is None:
+                continue
+            p = _logistic(theta - b)
+            log_w += math.log(p if ok else 1 - p)
+        weights.append(log_w)
+
+    top = max(weights)
+    weights = [math.exp(w - top) for w in weights]
+    total = sum(weights)
+    mean = sum(t * w for t, w in zip(_GRID, weights)) / total
+    var = sum((t - mean) ** 2 * w for t, w in zip(_GRID, weights)) / total
+    return mean, math.sqrt(var)
+
+
+def pick_next(items, theta: float, served):
+    """
+    b'ye göre sıralı indeks üzerinde theta'nın iki yanına doğru yürür,
+    gösterilmemiş en yakın CANDIDATES soruyu toplar; en az gösterileni seçer.
+    """
+    served = set(served)
+    bs = [it[0] for it in items]
+    i = bisect_left(bs, theta)
+    lo, hi = i - 1, i
+    cands = []
+
+    while len(cands) < CANDIDATES and (lo >= 0 or hi < len(items)):
+        take_hi = lo < 0 or (hi < len(items) and abs(items[hi][0] - theta) <= abs(items[lo][0] - theta))
+        if take_hi:
+            it, hi = items[hi], hi + 1
+        else:
+            it, lo = items[lo], lo - 1
+        if it[1] not in served:
+            cands.append(it)
+
+    if not cands:
+        return None
+
+    least = min(it[3] for it in cands)
+    return random.choice([it for it in cands if it[3] == least])
+
+
+def expected_score(items, theta: float) -> float:
+    """Konunun tüm soru havuzunda beklenen doğru yüzdesi (0-100)."""
+    if not items:
+        return 0
+    return round(100 * sum(_logistic(theta - it[0]) for it in items) / len(items), 1)
+
+
+def should_stop(answered: int, se: float, remaining: int) -> bool:
+    if remaining <= 0 or answered >= MAX_ITEMS:
+        return True
+    return answered >= MIN_ITEMS and se <= TARGET_SE
+
+
+# ---------------------------
+# Sayaçlar (F() ile)
+# ---------------------------
+
+# (cevap sayaçları: content/responses.py)
+
+def record_exposure(question_id: int):
+    changes = {"exposures": F("exposures") + 1, "updated_at": timezone.now()}
+    if not TopicQuestionStats.objects.filter(question_id=question_id).update(**changes):
+        TopicQuestionStats.objects.get_or_create(question_id=question_id)
+        TopicQuestionStats.objects.filter(question_id=question_id).update(**changes)
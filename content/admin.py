@@ -1,10 +1,29 @@
 from django.contrib import admin
 from .models import Grade, Subject, TopicTemplate
-from .models import TopicContent, TopicQuestion, StudentTopicProgress
+from .models import TopicContent, TopicQuestion, StudentTopicProgress, TopicAnswer
 
 admin.site.register(Grade)
 admin.site.register(Subject)
-admin.site.register(TopicTemplate)
 admin.site.register(TopicContent)
 admin.site.register(TopicQuestion)
 admin.site.register(StudentTopicProgress)
+
+
+@admin.register(TopicTemplate)
+class TopicTemplateAdmin(admin.ModelAdmin):
+    list_display = ("title", "grade", "subject", "depth", "order")
+    list_filter = ("grade", "subject", "depth")
+    search_fields = ("title",)
+    # __str__ grade/subject/parent'a gidiyor: satır başına ek sorgu olmasın
+    list_select_related = ("grade", "subject", "parent")
+    readonly_fields = ("path", "depth")
+    raw_id_fields = ("parent",)
+
+
+@admin.register(TopicAnswer)
+class TopicAnswerAdmin(admin.ModelAdmin):
+    list_display = ("user", "question", "chosen", "is_correct", "source", "created_at")
+    list_filter = ("source", "is_correct")
+    list_select_related = ("user", "question")
+    raw_id_fields = ("user", "topic", "question")
+    date_hierarchy = "created_at"
@@ -1,54 +1,53 @@
 from datetime import timedelta
 
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from django.contrib.auth import get_user_model
+
+from accounts import leaderboards
+from accounts.models import StudentStats
+from accounts.xp import award_plan_item, award_plan_day
+from courses.models import Course
+
 from .models import (
-    TopicTemplate, TopicContent, TopicQuestion, StudentTopicProgress, Grade, Subject,
+    TopicTemplate, TopicQuestion, TopicAnswer, StudentTopicProgress, Grade, Subject,
     ReviewItem, ReviewAttempt,
-    DailyPlan, DailyPlanItem
+    DailyPlanItem
+)
+from .services import generate_daily_plan, mark_items_done, mark_topic_items_done
+from . import heartbeats
+from .adaptive import (
+    get_index, estimate, pick_next, should_stop, expected_score,
+    record_exposure,
+)
+from .media import with_media_urls
+from .responses import record_responses
+from .scheduling import DEFAULT_SCORE, ReviewState, get_scheduler
+from .caching import (
+    get_tree_version, get_tree_modified, tree_etag,
+    get_cached_tree, set_cached_tree, build_topic_tree,
+    get_topic_payload,
 )
-from .services import generate_daily_plan
 
 
 # ---------------------------
 # Helpers
 # ---------------------------
 
-def _node(t):
-    return {"id": t.id, "title": t.title, "order": t.order, "children": []}
-
-
-def _next_days(stage: int) -> int:
-    schedule = [1, 3, 7, 14]
-    return schedule[stage] if stage < len(schedule) else -1
-
-
-def _recalc_plan(plan: DailyPlan):
-    total = plan.items.count()
-    done = plan.items.filter(is_done=True).count()
-    plan.completion_rate = int((done / total) * 100) if total else 0
-    plan.is_completed = (plan.completion_rate == 100)
-    plan.save()
-
-
-def _mark_plan_items_done_for_topic(user, topic):
-    today = timezone.localdate()
-    plan = DailyPlan.objects.filter(user=user, date=today).first()
-    if not plan:
-        return
-
-    DailyPlanItem.objects.filter(
-        plan=plan,
-        topic=topic,
-        type__in=["topic", "test", "video"]
-    ).update(is_done=True)
-
-    _recalc_plan(plan)
+def _with_tree_headers(resp, etag: str, last_modified: int):
+    resp["ETag"] = etag
+    resp["Last-Modified"] = http_date(last_modified)
+    # Tarayıcı her seferinde koşullu istekle doğrulasın (304 ucuz)
+    patch_cache_control(resp, private=True, no_cache=True)
+    return resp
 
 
 def _ensure_review_for_wrong(user, topic, wrong_count: int):
@@ -69,34 +68,24 @@ def _ensure_review_for_wrong(user, topic, wrong_count: int):
     item.save()
 
 
-def _award_xp_and_streak_if_available(user, plan: DailyPlan, just_completed_item: bool):
-    """
-    XP: item done +10
-    Günü bitirince +50 ve streak.
-    StudentStats yoksa sessizce geçer.
-    """
-    try:
-        from accounts.models import StudentStats
-        stats, _ = StudentStats.objects.get_or_create(user=user)
+def _save_test_result(user, topic, score: float, wrong: int, ability=None):
+    prog, _ = StudentTopicProgress.objects.get_or_create(user=user, topic=topic)
+    prog.test_score = score
+    if ability is not None:
+        prog.ability = ability
 
-        if just_completed_item:
-            stats.xp += 10
+    if prog.video_completed and prog.test_score >= 70:
+        prog.completed = True
 
-        if plan.is_completed:
-            today = timezone.localdate()
-            yesterday = today.fromordinal(today.toordinal() - 1)
+    prog.save()
 
-            if stats.last_streak_date == yesterday:
-                stats.streak += 1
-            else:
-                stats.streak = 1
+    if wrong > 0:
+        _ensure_review_for_wrong(user, topic, wrong)
 
-            stats.last_streak_date = today
-            stats.xp += 50
+    if prog.completed:
+        mark_topic_items_done(user.id, topic.id)
 
-        stats.save()
-    except Exception:
-        pass
+    return prog
 
 
 # ---------------------------
@@ -106,72 +95,85 @@ def _award_xp_and_streak_if_available(user, plan: DailyPlan, just_completed_item
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def topics_tree(request):
+    """
+    GET /api/topics/tree?grade=8&subject=Matematik
+    Ağaç (grade, subject) bazında cache'lenir; ETag/Last-Modified eşleşirse
+    konu tablosuna hiç gitmeden 304 döner.
+    """
     grade_val = request.GET.get("grade")
     subject_name = request.GET.get("subject")
 
     if not grade_val or not subject_name:
         return Response({"ok": False, "error": "grade ve subject zorunlu"}, status=400)
 
-    grade = get_object_or_404(Grade, number=int(grade_val))
-    subject = get_object_or_404(Subject, name=subject_name)
-
-    qs = (
-        TopicTemplate.objects
-        .filter(grade=grade, subject=subject)
-        .select_related("parent")
-        .order_by("order", "id")
+    try:
+        grade_number = int(grade_val)
+    except ValueError:
+        return Response({"ok": False, "error": "grade geçersiz"}, status=400)
+
+    version = get_tree_version()
+    etag = tree_etag(version, grade_number, subject_name)
+    last_modified = get_tree_modified()
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return _with_tree_headers(not_modified, etag, last_modified)
+
+    roots = get_cached_tree(version, grade_number, subject_name)
+    if roots is None:
+        grade = get_object_or_404(Grade, number=grade_number)
+        subject = get_object_or_404(Subject, name=subject_name)
+        roots = build_topic_tree(grade, subject)
+        set_cached_tree(version, grade_number, subject_name, roots)
+
+    return _with_tree_headers(Response({"ok": True, "data": roots}), etag, last_modified)
+
+
+def _progress_payload(user, topic_id: int):
+    prog = (
+        StudentTopicProgress.objects
+        .filter(user=user, topic_id=topic_id)
+        .only("video_progress", "video_completed", "test_score", "completed")
+        .first()
     )
+    if not prog:
+        return None
 
-    by_id = {}
-    roots = []
-    for t in qs:
-        by_id[t.id] = _node(t)
-
-    for t in qs:
-        n = by_id[t.id]
-        if t.parent_id and t.parent_id in by_id:
-            by_id[t.parent_id]["children"].append(n)
-        else:
-            roots.append(n)
-
-    return Response({"ok": True, "data": roots})
+    buffered = heartbeats.buffered_progress(user.id, topic_id)
+    return {
+        "video_progress": max(prog.video_progress, buffered or 0),
+        "video_completed": prog.video_completed,
+        "test_score": prog.test_score,
+        "completed": prog.completed,
+    }
 
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def topic_detail(request, topic_id: int):
-    topic = get_object_or_404(TopicTemplate, id=topic_id)
+    """
+    GET /api/topics/<id>                  -> topic + contents + questions + progress
+    GET /api/topics/<id>?fields=progress  -> sadece progress (POST sonrası yenileme)
+    Ortak kısım konu bazında cache'lenir; her istekte sadece progress DB'ye gider.
+    """
+    fields = {f.strip() for f in (request.GET.get("fields") or "").split(",") if f.strip()}
 
-    contents = TopicContent.objects.filter(topic=topic, is_active=True).order_by("order", "id")
-    questions = TopicQuestion.objects.filter(topic=topic).order_by("order", "id")
-    prog = StudentTopicProgress.objects.filter(user=request.user, topic=topic).first()
+    if fields == {"progress"}:
+        # Konu kontrolü de cache'ten gelir; yok/pasif konu için boş progress yerine 404
+        if get_topic_payload(topic_id) is None:
+            raise Http404
+        return Response({"ok": True, "data": {"progress": _progress_payload(request.user, topic_id)}})
+
+    payload = get_topic_payload(topic_id)
+    if payload is None:
+        raise Http404
 
     return Response({
         "ok": True,
         "data": {
-            "topic": {"id": topic.id, "title": topic.title},
-            "contents": [{
-                "id": c.id,
-                "type": c.content_type,
-                "title": c.title,
-                "file": c.file.url if c.file else None,
-                "url": c.url,
-                "duration_sec": c.duration_sec
-            } for c in contents],
-            "questions": [{
-                "id": q.id,
-                "text": q.text,
-                "a": q.choice_a,
-                "b": q.choice_b,
-                "c": q.choice_c,
-                "d": q.choice_d,
-            } for q in questions],
-            "progress": None if not prog else {
-                "video_progress": prog.video_progress,
-                "video_completed": prog.video_completed,
-                "test_score": prog.test_score,
-                "completed": prog.completed,
-            }
+            **payload,
+            "contents": with_media_urls(payload["contents"]),
+            "progress": _progress_payload(request.user, topic_id),
         }
     })
 
@@ -179,28 +181,25 @@ def topic_detail(request, topic_id: int):
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def topic_video_progress(request, topic_id: int):
-    topic = get_object_or_404(TopicTemplate, id=topic_id)
-    progress = int(request.data.get("progress", 0))
-    progress = max(0, min(100, progress))
-    video_completed = progress >= 80
-
-    prog, _ = StudentTopicProgress.objects.get_or_create(user=request.user, topic=topic)
-    prog.video_progress = progress
-    prog.video_completed = video_completed
-
-    if prog.video_completed and prog.test_score >= 70:
-        prog.completed = True
+    """
+    POST /api/topics/<id>/video-progress  {"progress": 0-100, "final": false}
+    Nabızlar tamponlanır (content/heartbeats.py); %80 eşiği ve final=true
+    (sayfa kapanışı) hemen DB'ye yazılır.
+    """
+    # konu var mı: cache'teki ortak payload'dan (nabız başına DB'ye gitmesin)
+    if get_topic_payload(topic_id) is None:
+        raise Http404
 
-    prog.save()
+    try:
+        progress = int(float(request.data.get("progress", 0)))
+    except (TypeError, ValueError):
+        return Response({"ok": False, "error": "progress 0-100 arası sayı olmalı"}, status=400)
+    progress = max(0, min(100, progress))
+    final = str(request.data.get("final", "")).lower() in ("1", "true", "yes")
 
-    if prog.completed:
-        _mark_plan_items_done_for_topic(request.user, topic)
+    state = heartbeats.record(request.user.id, topic_id, progress, final=final)
 
-    return Response({"ok": True, "data": {
-        "video_progress": prog.video_progress,
-        "video_completed": prog.video_completed,
-        "completed": prog.completed
-    }})
+    return Response({"ok": True, "data": state})
 
 
 @api_view(["POST"])
@@ -213,34 +212,28 @@ def topic_test_submit(request, topic_id: int):
         return Response({"ok": False, "error": "answers zorunlu"}, status=400)
 
     q_ids = [a.get("question_id") for a in answers if a.get("question_id")]
-    qs = TopicQuestion.objects.filter(topic=topic, id__in=q_ids)
-    correct_map = {q.id: q.correct for q in qs}
+    correct_map = dict(
+        TopicQuestion.objects.filter(topic=topic, id__in=q_ids).values_list("id", "correct")
+    )
 
     total, correct = 0, 0
+    graded = []
     for a in answers:
         qid = a.get("question_id")
         ans = (a.get("answer") or "").strip().upper()
         if qid in correct_map:
             total += 1
-            if ans == (correct_map[qid] or "").strip().upper():
+            ok = ans == (correct_map[qid] or "").strip().upper()
+            if ok:
                 correct += 1
+            graded.append((qid, ans, ok))
+
+    record_responses(request.user, topic.id, graded)
 
     score = (correct / total) * 100 if total else 0
     wrong = total - correct
 
-    prog, _ = StudentTopicProgress.objects.get_or_create(user=request.user, topic=topic)
-    prog.test_score = score
-
-    if prog.video_completed and prog.test_score >= 70:
-        prog.completed = True
-
-    prog.save()
-
-    if wrong > 0:
-        _ensure_review_for_wrong(request.user, topic, wrong)
-
-    if prog.completed:
-        _mark_plan_items_done_for_topic(request.user, topic)
+    prog = _save_test_result(request.user, topic, score, wrong)
 
     return Response({"ok": True, "data": {
         "score": score,
@@ -251,6 +244,96 @@ def topic_test_submit(request, topic_id: int):
     }})
 
 
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def topic_adaptive_next(request, topic_id: int):
+    """
+    POST /api/topics/<id>/adaptive
+      {}  veya  {"reset": true}                 -> ilk soru
+      {"question_id": 12, "answer": "B"}         -> cevapla + sıradaki soru
+    Test bitince test_score = tüm havuzda beklenen doğru yüzdesi.
+    """
+    items = get_index(topic_id)
+    if not items:
+        get_object_or_404(TopicTemplate, id=topic_id)
+        return Response({"ok": False, "error": "Bu konuya soru eklenmemiş"}, status=400)
+
+    key = f"adaptive:{topic_id}"
+    state = request.session.get(key)
+
+    if state is None or request.data.get("reset"):
+        prior = (
+            StudentTopicProgress.objects
+            .filter(user=request.user, topic_id=topic_id)
+            .values_list("ability", flat=True)
+            .first()
+        )
+        state = {"prior": prior or 0.0, "theta": prior or 0.0, "se": 1.0,
+                 "served": [], "responses": [], "pending": None}
+
+    by_id = {it[1]: it for it in items}
+    qid = request.data.get("question_id")
+
+    if qid is not None:
+        try:
+            qid = int(qid)
+        except (TypeError, ValueError):
+            return Response({"ok": False, "error": "Geçersiz question_id"}, status=400)
+        if qid != state["pending"]:
+            return Response({"ok": False, "error": "Beklenen soru bu değil"}, status=400)
+
+        ans = (request.data.get("answer") or "").strip().upper()
+        item = by_id.get(qid)
+        state["pending"] = None
+        if item is not None:
+            ok = ans == item[2]
+            state["responses"].append([qid, ok])
+            record_responses(request.user, topic_id, [(qid, ans, ok)], source=TopicAnswer.SOURCE_ADAPTIVE)
+            state["theta"], state["se"] = estimate(
+                state["responses"], {k: v[0] for k, v in by_id.items()}, prior_mean=state["prior"]
+            )
+
+    answered = len(state["responses"])
+    remaining = len([i for i in by_id if i not in set(state["served"])])
+
+    if state["pending"] is None and should_stop(answered, state["se"], remaining):
+        topic = get_object_or_404(TopicTemplate, id=topic_id)
+        score = expected_score(items, state["theta"])
+        wrong = len([1 for _, ok in state["responses"] if not ok])
+        prog = _save_test_result(request.user, topic, score, wrong, ability=state["theta"])
+        request.session.pop(key, None)
+
+        return Response({"ok": True, "data": {
+            "done": True,
+            "question": None,
+            "answered": answered,
+            "correct": answered - wrong,
+            "ability": round(state["theta"], 3),
+            "se": round(state["se"], 3),
+            "score": score,
+            "completed": prog.completed,
+        }})
+
+    if state["pending"] is None:
+        nxt = pick_next(items, state["theta"], state["served"])
+        state["pending"] = nxt[1]
+        state["served"].append(nxt[1])
+        record_exposure(nxt[1])
+
+    request.session[key] = state
+
+    payload = get_topic_payload(topic_id) or {"questions": []}
+    question = next((q for q in payload["questions"] if q["id"] == state["pending"]), None)
+
+    return Response({"ok": True, "data": {
+        "done": False,
+        "question": question,
+        "answered": answered,
+        "ability": round(state["theta"], 3),
+        "se": round(state["se"], 3),
+    }})
+
+
 # ---------------------------
 # Sprint-2: Reviews
 # ---------------------------
@@ -283,22 +366,23 @@ def my_reviews_today(request):
 def review_mark_done(request, review_id: int):
     item = get_object_or_404(ReviewItem, id=review_id, user=request.user, is_active=True)
 
-    score = float(request.data.get("score", 0) or 0)
-    ReviewAttempt.objects.create(item=item, score=score)
+    raw = request.data.get("score")
+    try:
+        score = DEFAULT_SCORE if raw in (None, "") else float(raw)
+    except (TypeError, ValueError):
+        return Response({"ok": False, "error": "score 0-100 arası sayı olmalı"}, status=400)
+    score = min(100.0, max(0.0, score))
 
-    item.stage += 1
-    nd = _next_days(item.stage)
-
-    if nd == -1:
-        item.is_active = False
-    else:
-        item.next_review_at = timezone.now() + timedelta(days=nd)
+    attempt = ReviewAttempt.objects.create(item=item, score=score)
 
+    state = get_scheduler().review(ReviewState.of(item), score, now=attempt.at)
+    state.apply_to(item)
     item.save()
 
     return Response({"ok": True, "data": {
         "is_active": item.is_active,
         "stage": item.stage,
+        "interval_days": item.interval_days,
         "next_review_at": item.next_review_at if item.is_active else None
     }})
 
@@ -330,18 +414,15 @@ def my_daily_plan(request):
 @permission_classes([IsAuthenticated])
 def daily_plan_item_done(request, item_id):
     item = get_object_or_404(DailyPlanItem, id=item_id, plan__user=request.user)
-    plan = item.plan
-
-    just_completed_item = False
-    if not item.is_done:
-        item.is_done = True
-        item.save()
-        just_completed_item = True
 
-    _recalc_plan(plan)
+    # iki sekme aynı anda gönderse de madde/plan bir kez sayılır
+    plan, n, just_completed_plan = mark_items_done(item.plan_id, id=item.id)
 
-    # XP/Streak
-    _award_xp_and_streak_if_available(request.user, plan, just_completed_item)
+    # XP/Streak (defter + F(); aynı madde/gün için ikinci kez verilmez)
+    if n:
+        award_plan_item(request.user.id, item)
+    if just_completed_plan:
+        award_plan_day(request.user.id, plan)
 
     return Response({"ok": True, "data": {
         "completion_rate": plan.completion_rate,
@@ -355,10 +436,58 @@ def my_stats(request):
     """
     GET /api/me/stats
     """
+    s = StudentStats.objects.filter(user=request.user).only("xp", "streak").first()
+    return Response({"ok": True, "data": {"xp": s.xp if s else 0, "streak": s.streak if s else 0}})
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def leaderboard(request, scope, scope_id=None):
+    """
+    GET /api/leaderboard/global
+    GET /api/leaderboard/grade/<grade_id>
+    GET /api/leaderboard/course/<course_id>
+    ?period=all|week  (week = bu haftanın XP'si)  &limit=50
+    """
+    period = request.GET.get("period", "all")
+    if period not in leaderboards.PERIODS:
+        return Response({"ok": False, "error": "period all veya week olmalı"}, status=400)
+
     try:
-        from accounts.models import StudentStats
-        s, _ = StudentStats.objects.get_or_create(user=request.user)
-        return Response({"ok": True, "data": {"xp": s.xp, "streak": s.streak}})
-    except Exception:
-        return Response({"ok": True, "data": {"xp": 0, "streak": 0}})
+        limit = min(max(int(request.GET.get("limit", 50)), 1), 100)
+    except ValueError:
+        return Response({"ok": False, "error": "limit sayı olmalı"}, status=400)
+
+    if scope == "grade":
+        get_object_or_404(Grade, id=scope_id)
+    elif scope == "course":
+        course = get_object_or_404(Course.objects.only("id", "owner_id"), id=scope_id)
+        allowed = (
+            request.user.is_staff
+            or course.owner_id == request.user.id
+            or course.enrollments.filter(user=request.user).exists()
+        )
+        if not allowed:
+            return Response({"ok": False, "error": "Bu kursun sıralamasını göremezsiniz"}, status=403)
+
+    board = leaderboards.standings(scope, scope_id, period, user_id=request.user.id, limit=limit)
+
+    names = {
+        u["id"]: f"{u['first_name']} {u['last_name']}".strip() or u["username"]
+        for u in get_user_model().objects.filter(id__in=[uid for uid, _ in board["top"]])
+        .values("id", "username", "first_name", "last_name")
+    }
+
+    return Response({"ok": True, "data": {
+        "scope": scope,
+        "scope_id": scope_id,
+        "period": period,
+        "week_start": leaderboards.week_start().isoformat() if period == "week" else None,
+        "size": board["size"],
+        "top": [
+            {"rank": i, "user_id": uid, "name": names.get(uid, ""), "xp": xp}
+            for i, (uid, xp) in enumerate(board["top"], start=1)
+        ],
+        "me": {"rank": board["rank"], "xp": board["xp"] or 0},
+    }})
 
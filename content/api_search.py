@@ -15,7 +15,7 @@ def topics_search(request):
     grade_val = (request.GET.get("grade") or "").strip()
     subject_name = (request.GET.get("subject") or "").strip()
 
-    qs = TopicTemplate.objects.select_related("grade", "subject")
+    qs = TopicTemplate.objects.filter(is_active=True).select_related("grade", "subject")
 
     if q:
         qs = qs.filter(title__icontains=q)
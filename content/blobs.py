@@ -0,0 +1,418 @@
+# content/blobs.py
+"""
+İçerik adresli (tekilleştirilmiş) dosya deposu.
+
+LessonFile.file, LessonVideo.video, TopicContent.file ve Message.file bu
+depoyu kullanır: dosya adı içeriğin SHA-256 özetidir,
+    blobs/3f/a2/3fa2...e9.pdf
+aynı PDF yüz derse / sohbete yüklense de depoda tek kopya durur.
+
+- özet yükleme sırasında hesaplanır: HashingMemory/TemporaryFileUploadHandler
+  gelen parçaları diske / belleğe yazarken özetler (dosya ikinci kez okunmaz).
+  Diğer kaynaklar (ContentFile) okunurken özetlenir; geri sarılamayan akışlar
+  (parçalı yükleme) depoya geçici adla yazılırken özetlenir.
+- dosya önce geçici ada (blobs/tmp/) yazılır, tamamı yazılınca blob adına
+  taşınır: yarıda kesilen yazım blob adında eksik dosya bırakmaz. Blob adındaki
+  dosya varsa ve boyutu tutuyorsa hiçbir şey yazılmaz: tekrar yükleme anında biter.
+- Blob satırı: özet -> depo adı, boyut, referans sayısı. Sayaç model
+  kaydedilince / dosyası değişince / silinince (content/signals.py) ve toplu
+  kopyalamada (course_clone) F() ile güncellenir; BlobFileMixin kaydı ve
+  sayacı aynı transaction'a alır (ATOMIC_REQUESTS kapalı).
+- referansı 0'a düşen blob hemen silinmez: purge_blobs (beat) GRACE süresinden
+  eski olanları (ve sahipsiz kalmış geçici dosyaları) siler; bu sırada aynı içerik tekrar yüklenirse blob yeniden
+  kullanılır. recount() sayaçları model satırlarından baştan hesaplar.
+
+Depo (yerel / S3) STORAGES["default"]'tır; bu sınıf sadece adlandırma ve
+tekilleştirme yapar, okuma / URL / silme default depoya devredilir.
+"""
+import hashlib
+import io
+import os
+import uuid
+from collections import Counter
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.files import File
+from django.core.files.storage import Storage, default_storage, storages
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+
+# model -> dosya alanı
+BLOB_FIELDS = {
+    "content.LessonFile": "file",
+    "content.LessonVideo": "video",
+    "content.TopicContent": "file",
+    "messaging.Message": "file",
+}
+
+PREFIX = "blobs/"
+TMP_DIR = f"{PREFIX}tmp"
+GRACE = timedelta(hours=1)
+CHUNK_SIZE = 1024 * 1024
+
+
+def blob_storage():
+    """FileField(storage=...) için (migration'a depo sınıfı değil bu fonksiyon yazılır)."""
+    return storages["blobs"]
+
+
+def blob_name(digest, ext="") -> str:
+    return f"{PREFIX}{digest[:2]}/{digest[2:4]}/{digest}{ext}"
+
+
+def is_blob(name) -> bool:
+    return bool(name) and name.startswith(PREFIX)
+
+
+def temp_name(ext="") -> str:
+    """Tamamı yazılınca blob adına taşınacak dosya için geçici ad."""
+    return f"{TMP_DIR}/{uuid.uuid4().hex}{ext}"
+
+
+def upload_name(name) -> str:
+    """Yükleme anındaki dosya adı (original_name alanı için)."""
+    return os.path.basename(name or "")[:255]
+
+
+def _blob_model():
+    return apps.get_model("content", "Blob")
+
+
+# ---------------------------
+# Yükleme sırasında özet
+# ---------------------------
+
+class _HashingMixin:
+    def new_file(self, *args, **kwargs):
+        self._sha = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        out = super().receive_data_chunk(raw_data, start)
+        if out is None:
+            # veriyi bu işleyici aldı (bir sonrakine aktarılmadı)
+            self._sha.update(raw_data)
+        return out
+
+    def file_complete(self, file_size):
+        f = super().file_complete(file_size)
+        if f is not None:
+            f.sha256 = self._sha.hexdigest()
+        return f
+
+
+class HashingMemoryFileUploadHandler(_HashingMixin, MemoryFileUploadHandler):
+    pass
+
+
+class HashingTemporaryFileUploadHandler(_HashingMixin, TemporaryFileUploadHandler):
+    pass
+
+
+def _seekable(f) -> bool:
+    try:
+        return f.seekable()
+    except (AttributeError, ValueError):
+        return False
+
+
+def _digest(content):
+    """Dönüş: (özet, boyut); geri sarılamayan akışta (None, None) (yazılırken özetlenir)."""
+    digest = getattr(content, "sha256", None)
+    if digest:
+        return digest, content.size
+    if not _seekable(content):
+        return None, None
+
+    sha, size = hashlib.sha256(), 0
+    for chunk in content.chunks(CHUNK_SIZE):
+        sha.update(chunk)
+        size += len(chunk)
+    content.seek(0)
+    return sha.hexdigest(), size
+
+
+class _HashingReader(io.RawIOBase):
+    """Okunan baytları özetler: akış depoya yazılırken tek geçişte özet çıkar."""
+
+    def __init__(self, f):
+        self._f = f
+        self._sha = hashlib.sha256()
+        self.size = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buf):
+        data = self._f.read(len(buf))
+        n = len(data)
+        buf[:n] = data
+        self._sha.update(data)
+        self.size += n
+        return n
+
+    def hexdigest(self):
+        return self._sha.hexdigest()
+
+
+def move_file(storage, src, dst):
+    """
+    Depo içinde taşıma (dst varsa üzerine yazılır): yerel diskte rename,
+    S3'te sunucu tarafı kopya (büyük nesnede çok parçalı kopya; baytlar
+    worker'dan geçmez) + silme.
+    """
+    bucket = getattr(storage, "bucket", None)
+    if bucket is not None:
+        from storages.utils import clean_name
+
+        def key(name):
+            return storage._normalize_name(clean_name(name))
+
+        bucket.Object(key(dst)).copy({"Bucket": bucket.name, "Key": key(src)}, Config=storage.transfer_config)
+        storage.delete(src)
+        return
+
+    try:
+        src_path, dst_path = storage.path(src), storage.path(dst)
+    except NotImplementedError:
+        storage.delete(dst)
+        with storage.open(src, "rb") as f:
+            storage.save(dst, f)
+        storage.delete(src)
+        return
+    os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+    os.replace(src_path, dst_path)
+
+
+# ---------------------------
+# Depo
+# ---------------------------
+
+class BlobStorage(Storage):
+    """Adı içerik özeti olan, aynı içeriği bir kez yazan depo (default depo üzerinde)."""
+
+    @property
+    def backend(self):
+        return default_storage
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+
+        ext = os.path.splitext(name)[1].lower()[:16]
+
+        digest, size = _digest(content)
+        temp = None
+        if digest is None:
+            reader = _HashingReader(content)
+            temp = self._write_temp(File(reader, name=name), ext, max_length)
+            digest, size = reader.hexdigest(), reader.size
+        return self._place(digest, size, ext, temp, content, max_length)
+
+    def adopt(self, temp, name):
+        """
+        Depoda geçici adla (temp_name) zaten duran dosyayı blob yapar; örn. S3'te
+        sunucu tarafında birleştirilmiş yükleme. Özet için bir kez okunur,
+        yerine taşınır (içerik zaten varsa geçici dosya silinir). Dönüş: blob adı.
+        """
+        sha, size = hashlib.sha256(), 0
+        with self.backend.open(temp, "rb") as f:
+            for chunk in f.chunks(CHUNK_SIZE):
+                sha.update(chunk)
+                size += len(chunk)
+        return self._place(sha.hexdigest(), size, os.path.splitext(name)[1].lower()[:16], temp)
+
+    def _place(self, digest, size, ext, temp, content=None, max_length=None):
+        Blob = _blob_model()
+        try:
+            # Blob satırı dosyadan önce alınır: last_used_at güncel olan satıra purge
+            # dokunmaz. Güncelleme satır bulamazsa purge az önce sildi (dosya da
+            # gidiyor): satır yeniden oluşturulur, dosya yeniden yazılır.
+            blob = Blob.objects.filter(digest=digest).first()
+            if blob and not Blob.objects.filter(id=blob.id).update(last_used_at=timezone.now()):
+                blob = None
+            if blob is None:
+                blob = self._create_blob(digest, size, ext)
+
+            # tekrar yükleme: dosya eksiksiz duruyorsa yazılmaz; yoksa ya da
+            # yarım kalmışsa (boyut tutmuyor) geçici addan yerine konur
+            if not self._intact(blob):
+                if temp is None:
+                    temp = self._write_temp(content, ext, max_length)
+                move_file(self.backend, temp, blob.name)
+                temp = None
+        finally:
+            if temp is not None:
+                self.backend.delete(temp)
+        return blob.name
+
+    def _write_temp(self, content, ext, max_length=None):
+        return self.backend.save(temp_name(ext), content, max_length=max_length)
+
+    def _intact(self, blob):
+        return self.backend.exists(blob.name) and self.backend.size(blob.name) == blob.size
+
+    @staticmethod
+    def _create_blob(digest, size, ext):
+        Blob = _blob_model()
+        try:
+            with transaction.atomic():
+                return Blob.objects.create(digest=digest, name=blob_name(digest, ext), size=size)
+        except IntegrityError:
+            # aynı içerik eşzamanlı yüklendi
+            blob = Blob.objects.get(digest=digest)
+            Blob.objects.filter(id=blob.id).update(last_used_at=timezone.now())
+            return blob
+
+    def _open(self, name, mode="rb"):
+        return self.backend.open(name, mode)
+
+    def delete(self, name):
+        # dosyalar referans sayacıyla silinir (purge_blobs); eski (blob olmayan) adlar doğrudan
+        if not is_blob(name):
+            self.backend.delete(name)
+
+    def exists(self, name):
+        return self.backend.exists(name)
+
+    def size(self, name):
+        return self.backend.size(name)
+
+    def url(self, name, parameters=None):
+        # S3: imzalı URL'ye ResponseContentDisposition vb. eklenebilir
+        if parameters:
+            return self.backend.url(name, parameters=parameters)
+        return self.backend.url(name)
+
+    def path(self, name):
+        return self.backend.path(name)
+
+    def listdir(self, path):
+        return self.backend.listdir(path)
+
+    def get_modified_time(self, name):
+        return self.backend.get_modified_time(name)
+
+
+# ---------------------------
+# Model
+# ---------------------------
+
+class BlobFileMixin:
+    """
+    BLOB_FIELDS modelleri için: yeni dosya transaction açılmadan depoya yazılır
+    (büyük videolar bağlantıyı tutmasın), satır ve referans sayacı
+    (content/signals.py) tek transaction'da kaydedilir / silinir.
+    Depodaki ad içerik özeti olduğundan yüklenen adı original_name saklar.
+    """
+
+    def save(self, *args, **kwargs):
+        attname = BLOB_FIELDS[self._meta.label]
+        update_fields = kwargs.get("update_fields")
+        # ertelenmiş (only/defer) alan okunmaz
+        if attname in self.__dict__ and (update_fields is None or attname in update_fields):
+            f = getattr(self, attname)
+            if f and not f._committed:
+                self.original_name = upload_name(f.name)
+                f.save(f.name, f.file, save=False)
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get("using")):
+            return super().delete(*args, **kwargs)
+
+
+# ---------------------------
+# Referans sayacı
+# ---------------------------
+
+def add_refs(names, delta: int = 1):
+    """names: dosya adları (tekrar edebilir). Blob olmayanlar yok sayılır."""
+    counts = Counter(n for n in names if is_blob(n))
+    Blob = _blob_model()
+    now = timezone.now()
+    for name, n in counts.items():
+        Blob.objects.filter(name=name).update(
+            refcount=Greatest(F("refcount") + Value(n * delta), Value(0)),
+            last_used_at=now,
+        )
+
+
+def remove_refs(names):
+    add_refs(names, delta=-1)
+
+
+def recount() -> int:
+    """Sayaçları model satırlarından baştan hesaplar. Dönüş: düzeltilen blob sayısı."""
+    Blob = _blob_model()
+    refs = Counter()
+    for label, field in BLOB_FIELDS.items():
+        rows = (
+            apps.get_model(label).objects
+            .filter(**{f"{field}__startswith": PREFIX})
+            .order_by()
+            .values_list(field)
+            .annotate(n=Count("pk"))
+        )
+        for name, n in rows:
+            refs[name] += n
+
+    changed = []
+    for blob in Blob.objects.only("id", "name", "refcount").iterator():
+        if blob.refcount != refs.get(blob.name, 0):
+            blob.refcount = refs.get(blob.name, 0)
+            changed.append(blob)
+    Blob.objects.bulk_update(changed, ["refcount"], batch_size=1000)
+    return len(changed)
+
+
+def purge(grace=GRACE) -> int:
+    """Referansı kalmamış, GRACE'ten eski blob'lar (ve önizlemeleri) silinir."""
+    from .mediaproc import legacy_preview_name, preview_name
+
+    Blob = _blob_model()
+    cutoff = timezone.now() - grace
+    n = 0
+    ids = Blob.objects.filter(refcount=0, last_used_at__lt=cutoff).values_list("id", flat=True)
+    for blob_id in list(ids):
+        with transaction.atomic():
+            # satır kilitliyken koşul tekrar kontrol edilir: bu arada referans aldıysa
+            # dokunulmaz; BlobStorage.save aynı blob'u isterse kilit bitene kadar bekler,
+            # satırı bulamayınca dosyayı yeniden yazar
+            blob = Blob.objects.select_for_update().filter(id=blob_id, refcount=0, last_used_at__lt=cutoff).first()
+            if blob is None:
+                continue
+            default_storage.delete(blob.name)
+            default_storage.delete(preview_name(blob.name))
+            default_storage.delete(legacy_preview_name(blob.name))
+            blob.delete()
+        n += 1
+
+    _purge_temp(cutoff)
+    return n
+
+
+def _purge_temp(cutoff):
+    """Yazımı / taşıması yarıda kalmış geçici dosyalar (süreç öldü)."""
+    try:
+        _, files = default_storage.listdir(TMP_DIR)
+    except (FileNotFoundError, NotImplementedError):
+        return
+    for f in files:
+        name = f"{TMP_DIR}/{f}"
+        if default_storage.get_modified_time(name) < cutoff:
+            default_storage.delete(name)
+
+
+def import_file(name) -> str:
+    """Eski (blob olmayan) dosyayı blob deposuna taşır. Dönüş: yeni ad."""
+    with default_storage.open(name, "rb") as f:
+        return blob_storage().save(name, File(f, name=name))
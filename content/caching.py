@@ -0,0 +1,185 @@
+# content/caching.py
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+from .models import TopicTemplate, TopicContent, TopicQuestion
+
+
+TREE_VERSION_KEY = "topics:tree:version"
+TREE_MODIFIED_KEY = "topics:tree:modified"
+
+
+def content_cache():
+    return caches[getattr(settings, "CONTENT_CACHE_ALIAS", "default")]
+
+
+def cache_is_shared(cache=None) -> bool:
+    """Process içi (locmem / dummy) değilse True: tüm worker'lar ve Celery aynı veriyi görür."""
+    return not isinstance(cache or content_cache(), (LocMemCache, DummyCache))
+
+
+def cache_timeout(timeout):
+    """
+    Process içi cache'te silme / versiyon artırma sadece o worker'da görünür:
+    diğer worker'lar en geç CONTENT_LOCAL_CACHE_TIMEOUT saniyede tazelensin.
+    """
+    if cache_is_shared():
+        return timeout
+    local = getattr(settings, "CONTENT_LOCAL_CACHE_TIMEOUT", 60)
+    return local if timeout is None else min(timeout, local)
+
+
+# ---------------------------
+# Topic tree (grade + subject)
+# ---------------------------
+
+def get_tree_version() -> int:
+    """
+    Konu ağacının global versiyonu.
+    Cache'ten düşerse "şimdi" (epoch saniye) ile tekrar başlar; böylece
+    eski ETag'lerle çakışan küçük bir sayıya geri dönmez.
+    """
+    c = content_cache()
+    v = c.get(TREE_VERSION_KEY)
+    if v is None:
+        now = int(time.time())
+        c.add(TREE_VERSION_KEY, now, cache_timeout(None))
+        c.add(TREE_MODIFIED_KEY, now, cache_timeout(None))
+        v = c.get(TREE_VERSION_KEY, now)
+    return v
+
+
+def get_tree_modified() -> int:
+    c = content_cache()
+    ts = c.get(TREE_MODIFIED_KEY)
+    if ts is None:
+        ts = int(time.time())
+        c.add(TREE_MODIFIED_KEY, ts, cache_timeout(None))
+    return ts
+
+
+def bump_tree_version():
+    c = content_cache()
+    now = int(time.time())
+    try:
+        c.incr(TREE_VERSION_KEY)
+    except ValueError:
+        c.add(TREE_VERSION_KEY, now, cache_timeout(None))
+    c.set(TREE_MODIFIED_KEY, now, cache_timeout(None))
+
+
+def _subject_key(subject_name: str) -> str:
+    # memcached/redis key'lerinde boşluk + Türkçe karakter sorun çıkarmasın
+    return hashlib.md5(subject_name.encode("utf-8")).hexdigest()[:16]
+
+
+def tree_etag(version: int, grade_number: int, subject_name: str) -> str:
+    return f'"topics-{version}-{grade_number}-{_subject_key(subject_name)}"'
+
+
+def _tree_key(version: int, grade_number: int, subject_name: str) -> str:
+    return f"topics:tree:v{version}:{grade_number}:{_subject_key(subject_name)}"
+
+
+def build_topic_tree(grade, subject):
+    qs = (
+        TopicTemplate.objects
+        .filter(grade=grade, subject=subject, is_active=True)
+        .only("id", "title", "order", "parent_id")
+        .order_by("order", "id")
+    )
+
+    by_id = {}
+    roots = []
+    rows = list(qs)
+    for t in rows:
+        by_id[t.id] = {"id": t.id, "title": t.title, "order": t.order, "children": []}
+
+    for t in rows:
+        n = by_id[t.id]
+        if t.parent_id and t.parent_id in by_id:
+            by_id[t.parent_id]["children"].append(n)
+        else:
+            roots.append(n)
+
+    return roots
+
+
+def get_cached_tree(version: int, grade_number: int, subject_name: str):
+    return content_cache().get(_tree_key(version, grade_number, subject_name))
+
+
+def set_cached_tree(version: int, grade_number: int, subject_name: str, roots):
+    content_cache().set(
+        _tree_key(version, grade_number, subject_name),
+        roots,
+        cache_timeout(getattr(settings, "TOPIC_TREE_CACHE_TIMEOUT", 60 * 60 * 24)),
+    )
+
+
+# ---------------------------
+# Topic detail (herkes için ortak kısım)
+# ---------------------------
+
+def _detail_key(topic_id: int) -> str:
+    return f"topics:detail:v3:{topic_id}"
+
+
+def build_topic_payload(topic):
+    contents = TopicContent.objects.filter(topic=topic, is_active=True).order_by("order", "id")
+    questions = TopicQuestion.objects.filter(topic=topic).order_by("order", "id")
+
+    return {
+        "topic": {"id": topic.id, "title": topic.title},
+        "contents": [{
+            "id": c.id,
+            "type": c.content_type,
+            "title": c.title,
+            # URL değil dosya adı: imzalı URL'ler istek anında üretilir (content/media.py)
+            "file": c.file.name or None,
+            "preview": c.preview.name or None,
+            "url": c.url,
+            "duration_sec": c.duration_sec,
+            "page_count": c.page_count,
+        } for c in contents],
+        "questions": [{
+            "id": q.id,
+            "text": q.text,
+            "a": q.choice_a,
+            "b": q.choice_b,
+            "c": q.choice_c,
+            "d": q.choice_d,
+        } for q in questions],
+    }
+
+
+def get_topic_payload(topic_id: int):
+    """
+    Cache'te varsa DB'ye gitmez; yoksa konu + içerik + soru 3 sorguda kurulur.
+    Konu yoksa ya da pasifse None döner.
+    """
+    c = content_cache()
+    payload = c.get(_detail_key(topic_id))
+    if payload is not None:
+        return payload
+
+    topic = TopicTemplate.objects.filter(id=topic_id, is_active=True).only("id", "title").first()
+    if topic is None:
+        return None
+
+    payload = build_topic_payload(topic)
+    c.set(
+        _detail_key(topic_id),
+        payload,
+        cache_timeout(getattr(settings, "TOPIC_DETAIL_CACHE_TIMEOUT", 60 * 60 * 24)),
+    )
+    return payload
+
+
+def invalidate_topic_payload(*topic_ids):
+    content_cache().delete_many([_detail_key(tid) for tid in topic_ids if tid])
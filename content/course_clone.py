@@ -0,0 +1,102 @@
+# content/course_clone.py
+"""
+Kurs kopyalama (yeni dönem / yeni şube).
+
+Kopyalanan: kurs bilgileri, dersler (sıra anahtarlarıyla), ders dosyaları ve
+videoları, sınavlar ve soruları. Kayıtlar, ilerleme, denemeler, canlı dersler
+ve mesajlar kopyalanmaz.
+
+- kaynak grafik 5 sorguda okunur; her tablo tek bulk_create ile yazılır
+  (N kopya için de aynı), yabancı anahtarlar bellekte eşlenir:
+      {(yeni_kurs_id, eski_ders_id): yeni_ders_id}
+  bulk_create'in id döndürmesine dayanır (PostgreSQL / SQLite).
+- dosyalar kopyalanmaz: yeni satırlar aynı depolama nesnesini (dosya adı,
+  önizleme) gösterir; 30 şube = 30 satır, disk kullanımı değişmez.
+  Blob referans sayaçları (content/blobs.py) kopya sayısı kadar artırılır.
+- bulk_create sinyal tetiklemez: medya yeniden işlenmez (süre / önizleme
+  bilgisi de kopyalanır), yeni kursların kaydı olmadığından ilerleme özeti yok.
+"""
+from django.db import transaction
+from django.db.models.fields.files import FieldFile
+
+from courses.models import Course
+from quiz.models import Exam, Question
+
+from .blobs import add_refs
+from .models import Lesson, LessonFile, LessonVideo
+
+
+BATCH_SIZE = 1000
+
+
+def _copy(obj, **overrides):
+    """Aynı alan değerleriyle kaydedilmemiş yeni nesne (pk yok)."""
+    values = {}
+    for f in obj._meta.concrete_fields:
+        if f.primary_key:
+            continue
+        value = getattr(obj, f.attname)
+        # FileField: aynı depolama nesnesi (bayt kopyalanmaz)
+        values[f.attname] = value.name if isinstance(value, FieldFile) else value
+    values.update(overrides)
+    return type(obj)(**values)
+
+
+def section_titles(title, copies: int):
+    if copies == 1:
+        return [title]
+    return [f"{title} - Şube {i}" for i in range(1, copies + 1)]
+
+
+def clone_course(source, titles, owner=None):
+    """
+    source kursunu her başlık için bir kez kopyalar. Dönüş: [Course]
+    owner verilmezse kaynağın öğretmeni.
+    """
+    titles = list(titles)
+    if not titles:
+        return []
+
+    lessons = list(Lesson.objects.filter(course=source).order_by("order", "id"))
+    files = list(LessonFile.objects.filter(lesson__course=source).order_by("id"))
+    videos = list(LessonVideo.objects.filter(lesson__course=source).order_by("id"))
+    exams = list(Exam.objects.filter(course=source).order_by("id"))
+    questions = list(Question.objects.filter(exam__course=source).order_by("order", "id"))
+
+    with transaction.atomic():
+        courses = Course.objects.bulk_create([
+            _copy(source, title=title, owner_id=owner.id if owner else source.owner_id)
+            for title in titles
+        ])
+
+        new_lessons = [_copy(l, course_id=c.id) for c in courses for l in lessons]
+        Lesson.objects.bulk_create(new_lessons, batch_size=BATCH_SIZE)
+        lesson_map = {
+            (new.course_id, old.id): new.id
+            for new, old in zip(new_lessons, (l for _ in courses for l in lessons))
+        }
+
+        LessonFile.objects.bulk_create(
+            [_copy(f, lesson_id=lesson_map[(c.id, f.lesson_id)]) for c in courses for f in files],
+            batch_size=BATCH_SIZE,
+        )
+        LessonVideo.objects.bulk_create(
+            [_copy(v, lesson_id=lesson_map[(c.id, v.lesson_id)]) for c in courses for v in videos],
+            batch_size=BATCH_SIZE,
+        )
+        # bulk_create sinyal tetiklemez: paylaşılan blob'ların sayaçları burada
+        add_refs([f.file.name for f in files] * len(courses) + [v.video.name for v in videos] * len(courses))
+
+        new_exams = [_copy(e, course_id=c.id) for c in courses for e in exams]
+        Exam.objects.bulk_create(new_exams, batch_size=BATCH_SIZE)
+        exam_map = {
+            (new.course_id, old.id): new.id
+            for new, old in zip(new_exams, (e for _ in courses for e in exams))
+        }
+
+        Question.objects.bulk_create(
+            [_copy(q, exam_id=exam_map[(c.id, q.exam_id)]) for c in courses for q in questions],
+            batch_size=BATCH_SIZE,
+        )
+
+    return courses
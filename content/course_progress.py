@@ -0,0 +1,217 @@
+# content/course_progress.py
+"""
+CourseProgressSummary bakımı.
+
+- lesson_complete: sadece o (öğrenci, kurs) satırı F() ile kaydırılır;
+  sıradaki ders sadece tamamlanan ders "sıradaki" ise yeniden bulunur.
+- ders ekle / sil / sırala: kursun tüm özetleri küme bazlı yeniden hesaplanır
+  (dersler, tamamlananlar, kayıtlar, mevcut özetler: 4 sorgu + bulk yazım).
+- özeti olmayan (yeni kayıt) çiftler ilk okumada resolve() ile tek sorguda
+  hesaplanıp oluşturulur.
+- öğrencinin özetleri kısa süreli cache'lenir (COURSE_PROGRESS_CACHE_TIMEOUT);
+  özet değiştiren her yazım o öğrencilerin cache'ini siler.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, F, Max, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import GreaterThan
+from django.utils import timezone
+
+from courses.models import Course, Enrollment
+
+from .caching import content_cache
+from .models import CourseProgressSummary, Lesson, LessonProgress
+
+
+FIELDS = ["done_count", "total_lessons", "percent", "next_lesson", "last_activity"]
+
+
+def _percent(done, total) -> int:
+    return int(done * 100 / total) if total else 0
+
+
+def _cache_key(user_id) -> str:
+    return f"course_progress:{user_id}"
+
+
+def invalidate(user_ids):
+    content_cache().delete_many([_cache_key(uid) for uid in set(user_ids)])
+
+
+def resolve(user_id, course_ids):
+    """
+    Öğrencinin kayıtlı olduğu kurslar için toplam / tamamlanan / sıradaki ders /
+    son etkinlik; kurs sayısından bağımsız tek sorgu (ilişkili alt sorgular).
+    Dönüş: {course_id: (total, done, next_lesson_id, last_activity)}
+    """
+    lessons = Lesson.objects.filter(course=OuterRef("pk")).order_by()
+    done = LessonProgress.objects.filter(user_id=user_id, completed=True, lesson__course=OuterRef("pk")).order_by()
+    done_ids = LessonProgress.objects.filter(user_id=user_id, completed=True).values("lesson_id")
+
+    rows = (
+        Course.objects
+        .filter(id__in=course_ids, enrollments__user_id=user_id)
+        .annotate(
+            total=Coalesce(Subquery(lessons.values("course").annotate(n=Count("id")).values("n")), 0),
+            done=Coalesce(Subquery(done.values("lesson__course").annotate(n=Count("id")).values("n")), 0),
+            last=Subquery(done.values("lesson__course").annotate(at=Max("completed_at")).values("at")),
+            # ilk tamamlanmamış ders; hepsi bittiyse ilk ders
+            next_id=Coalesce(
+                Subquery(lessons.exclude(id__in=done_ids).order_by("order", "id").values("id")[:1]),
+                Subquery(lessons.order_by("order", "id").values("id")[:1]),
+            ),
+        )
+        .values_list("id", "total", "done", "next_id", "last")
+    )
+    return {cid: (total, done, next_id, last) for cid, total, done, next_id, last in rows}
+
+
+def build(course_ids, user_ids=None):
+    """
+    Verilen kursların özetlerini (user_ids verilirse sadece o öğrencilerin)
+    yeniden hesaplar ve yazar. Dönüş: {(user_id, course_id): CourseProgressSummary}
+    """
+    course_ids = list(course_ids)
+    if not course_ids:
+        return {}
+
+    lessons_by_course = {cid: [] for cid in course_ids}
+    for lid, cid in Lesson.objects.filter(course_id__in=course_ids).order_by("order", "id").values_list("id", "course_id"):
+        lessons_by_course[cid].append(lid)
+
+    enrolled = Enrollment.objects.filter(course_id__in=course_ids)
+    progress = LessonProgress.objects.filter(lesson__course_id__in=course_ids, completed=True)
+    existing = CourseProgressSummary.objects.filter(course_id__in=course_ids)
+    if user_ids is not None:
+        enrolled = enrolled.filter(user_id__in=user_ids)
+        progress = progress.filter(user_id__in=user_ids)
+        existing = existing.filter(user_id__in=user_ids)
+
+    pairs = set(enrolled.values_list("user_id", "course_id"))
+
+    done_by_pair, last_by_pair = {}, {}
+    for uid, cid, lid, at in progress.values_list("user_id", "lesson__course_id", "lesson_id", "completed_at"):
+        done_by_pair.setdefault((uid, cid), set()).add(lid)
+        if at and (last_by_pair.get((uid, cid)) is None or at > last_by_pair[(uid, cid)]):
+            last_by_pair[(uid, cid)] = at
+
+    summaries = {(s.user_id, s.course_id): s for s in existing}
+    new, changed = [], []
+
+    for pair in pairs | set(summaries):
+        uid, cid = pair
+        lessons = lessons_by_course[cid]
+        done = done_by_pair.get(pair, set())
+        next_id = next((lid for lid in lessons if lid not in done), lessons[0] if lessons else None)
+
+        values = {
+            "done_count": len(done),
+            "total_lessons": len(lessons),
+            "percent": _percent(len(done), len(lessons)),
+            "next_lesson_id": next_id,
+        }
+
+        s = summaries.get(pair)
+        if s is None:
+            s = summaries[pair] = CourseProgressSummary(user_id=uid, course_id=cid, last_activity=last_by_pair.get(pair))
+            new.append(s)
+        elif all(getattr(s, k) == v for k, v in values.items()):
+            continue
+        else:
+            changed.append(s)
+        for k, v in values.items():
+            setattr(s, k, v)
+
+    with transaction.atomic():
+        if new:
+            CourseProgressSummary.objects.bulk_create(new, ignore_conflicts=True)
+        if changed:
+            CourseProgressSummary.objects.bulk_update(changed, FIELDS)
+
+    if new or changed:
+        invalidate(s.user_id for s in new + changed)
+    return summaries
+
+
+def refresh_course(course_id):
+    """Ders eklendi / silindi / yeniden sıralandı."""
+    build([course_id])
+
+
+def summaries_for(user_id, course_ids):
+    """
+    Dönüş: {course_id: CourseProgressSummary}
+    Sıcak yolda sorgu yok (cache); değilse öğrencinin tüm özetleri tek sorgu,
+    eksikler için resolve + bulk_create.
+    """
+    course_ids = list(course_ids)
+    c = content_cache()
+    key = _cache_key(user_id)
+
+    cached = c.get(key)
+    if cached is not None and all(cid in cached for cid in course_ids):
+        return {cid: cached[cid] for cid in course_ids}
+
+    out = {s.course_id: s for s in CourseProgressSummary.objects.filter(user_id=user_id)}
+
+    missing = [cid for cid in course_ids if cid not in out]
+    if missing:
+        new = [
+            CourseProgressSummary(
+                user_id=user_id, course_id=cid, done_count=done, total_lessons=total,
+                percent=_percent(done, total), next_lesson_id=next_id, last_activity=last,
+            )
+            for cid, (total, done, next_id, last) in resolve(user_id, missing).items()
+        ]
+        CourseProgressSummary.objects.bulk_create(new, ignore_conflicts=True)
+        out.update((s.course_id, s) for s in new)
+
+    c.set(key, out, getattr(settings, "COURSE_PROGRESS_CACHE_TIMEOUT", 300))
+    return {cid: out[cid] for cid in course_ids if cid in out}
+
+
+def lesson_completed(user_id, lesson, at=None):
+    """
+    LessonProgress tamamlanmadı -> tamamlandı geçişinde çağrılır.
+    Tek UPDATE; tamamlanan ders "sıradaki" ise sonraki ders bir sorguyla bulunur.
+    """
+    at = at or timezone.now()
+    summary = (
+        CourseProgressSummary.objects
+        .filter(user_id=user_id, course_id=lesson.course_id)
+        .only("id", "next_lesson_id")
+        .first()
+    )
+    if summary is None:
+        build([lesson.course_id], user_ids=[user_id])
+        return
+
+    changes = {
+        "done_count": F("done_count") + 1,
+        "percent": Case(
+            When(GreaterThan(F("total_lessons"), 0), then=(F("done_count") + 1) * 100 / F("total_lessons")),
+            default=Value(0),
+        ),
+        "last_activity": at,
+        "updated_at": timezone.now(),
+    }
+
+    if summary.next_lesson_id == lesson.id:
+        # önceki dersler zaten tamamlanmış: bu dersten sonraki ilk tamamlanmamış ders
+        done = LessonProgress.objects.filter(user_id=user_id, completed=True).values("lesson_id")
+        after = (
+            Lesson.objects
+            .filter(course_id=lesson.course_id)
+            .filter(Q(order__gt=lesson.order) | Q(order=lesson.order, id__gt=lesson.id))
+            .exclude(id__in=done)
+            .order_by("order", "id")
+            .values_list("id", flat=True)
+            .first()
+        )
+        if after is None:
+            after = Lesson.objects.filter(course_id=lesson.course_id).order_by("order", "id").values_list("id", flat=True).first()
+        changes["next_lesson_id"] = after
+
+    CourseProgressSummary.objects.filter(id=summary.id).update(**changes)
+    invalidate([user_id])
@@ -0,0 +1,292 @@
+# content/curriculum.py
+"""
+Müfredat (konu bankası) yükleme motoru.
+
+Girdi formatı (JSON/YAML veya Python dict):
+    {
+      "8": {
+        "Matematik": [
+          {"title": "Üslü ifadeler", "children": ["Kurallar", {"title": "Problemler", "children": [...]}]},
+          "Olasılık",
+        ]
+      }
+    }
+
+Akış:
+    1) Mevcut Grade/Subject/TopicTemplate satırları tek geçişte okunur
+    2) Bellekte diff çıkarılır: insert / update (yeniden aktif) / reorder / retire
+    3) Tek transaction içinde bulk_create / bulk_update ile uygulanır
+
+Bir konunun kimliği: (sınıf, ders, kökten itibaren başlık zinciri).
+"""
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.db import transaction
+
+from .caching import bump_tree_version, invalidate_topic_payload
+from .cursors import reset_cursors
+from .models import Grade, Subject, TopicTemplate
+from .tree import make_path, title_chains
+
+
+class CurriculumError(Exception):
+    pass
+
+
+@dataclass
+class CurriculumDiff:
+    new_grades: list = field(default_factory=list)
+    new_subjects: list = field(default_factory=list)
+    insert: list = field(default_factory=list)    # [(grade, subject, titles, order)]
+    update: list = field(default_factory=list)    # [TopicTemplate] (retired -> aktif)
+    reorder: list = field(default_factory=list)   # [(TopicTemplate, new_order)]
+    retire: list = field(default_factory=list)    # [TopicTemplate]
+    existing: dict = field(default_factory=dict, repr=False)
+
+    @property
+    def has_changes(self):
+        return any([self.new_grades, self.new_subjects, self.insert, self.update, self.reorder, self.retire])
+
+    def summary(self):
+        return {
+            "grades": len(self.new_grades),
+            "subjects": len(self.new_subjects),
+            "insert": len(self.insert),
+            "update": len(self.update),
+            "reorder": len(self.reorder),
+            "retire": len(self.retire),
+        }
+
+
+# ---------------------------
+# Dosya okuma
+# ---------------------------
+
+def load_file(path) -> dict:
+    path = Path(path)
+    text = path.read_text(encoding="utf-8")
+
+    if path.suffix.lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise CurriculumError("YAML dosyaları için PyYAML kurulu olmalı (pip install pyyaml).")
+        data = yaml.safe_load(text)
+    else:
+        data = json.loads(text)
+
+    if not isinstance(data, dict):
+        raise CurriculumError(f"{path}: üst seviye sınıf -> ders sözlüğü olmalı.")
+    return data
+
+
+def merge(*datasets) -> dict:
+    out = {}
+    for data in datasets:
+        for grade, subjects in data.items():
+            out.setdefault(int(grade), {}).update(subjects or {})
+    return out
+
+
+def flatten(data: dict):
+    """
+    {grade: {subject: [node, ...]}} -> {(grade, subject): {titles_tuple: order}}
+    """
+    out = {}
+
+    def walk(nodes, prefix, bucket):
+        for i, node in enumerate(nodes or [], start=1):
+            if isinstance(node, str):
+                title, children = node, []
+            elif isinstance(node, dict) and node.get("title"):
+                title, children = node["title"], node.get("children") or []
+            else:
+                raise CurriculumError(f"Geçersiz konu düğümü: {node!r}")
+
+            key = prefix + (title.strip(),)
+            bucket.setdefault(key, i)
+            walk(children, key, bucket)
+
+    for grade, subjects in data.items():
+        for subject_name, nodes in (subjects or {}).items():
+            walk(nodes, (), out.setdefault((int(grade), subject_name), {}))
+
+    return out
+
+
+# ---------------------------
+# Diff
+# ---------------------------
+
+def _existing_topics(grade_ids, subject_ids):
+    """
+    Kapsamdaki tüm konular tek sorguda; başlık zinciri bellekte çıkarılır.
+    Dönüş: {(grade_id, subject_id, titles): TopicTemplate}
+    """
+    rows = list(
+        TopicTemplate.objects
+        .filter(grade_id__in=grade_ids, subject_id__in=subject_ids)
+        .only("id", "grade_id", "subject_id", "parent_id", "title", "order", "is_active", "path", "depth")
+        .order_by("id")
+    )
+    chains = title_chains((t.id, t.parent_id, t.title) for t in rows)
+
+    out = {}
+    for t in rows:
+        # aynı zincirden birden fazla varsa ilk (en eski) kayıt esas alınır
+        out.setdefault((t.grade_id, t.subject_id, chains[t.id]), t)
+    return out
+
+
+def compute_diff(data: dict, retire: bool = False) -> CurriculumDiff:
+    flat = flatten(data)
+    diff = CurriculumDiff()
+
+    grades = {}
+    for g in Grade.objects.order_by("id"):
+        grades.setdefault(g.number, g)
+    subjects = {}
+    for s in Subject.objects.order_by("id"):
+        subjects.setdefault(s.name, s)
+
+    wanted_grades = sorted({g for g, _ in flat})
+    wanted_subjects = sorted({s for _, s in flat})
+    diff.new_grades = [n for n in wanted_grades if n not in grades]
+    diff.new_subjects = [n for n in wanted_subjects if n not in subjects]
+
+    existing = _existing_topics(
+        [grades[n].id for n in wanted_grades if n in grades],
+        [subjects[n].id for n in wanted_subjects if n in subjects],
+    )
+    diff.existing = existing
+
+    seen_ids = set()
+    for (grade_num, subject_name), nodes in flat.items():
+        g, s = grades.get(grade_num), subjects.get(subject_name)
+        for titles, order in nodes.items():
+            t = existing.get((g.id, s.id, titles)) if g and s else None
+            if t is None:
+                diff.insert.append((grade_num, subject_name, titles, order))
+                continue
+
+            seen_ids.add(t.id)
+            if not t.is_active:
+                diff.update.append(t)
+            if t.order != order:
+                diff.reorder.append((t, order))
+
+    if retire:
+        scopes = {
+            (grades[g].id, subjects[s].id)
+            for g, s in flat if g in grades and s in subjects
+        }
+        diff.retire = [
+            t for (gid, sid, _), t in existing.items()
+            if (gid, sid) in scopes and t.is_active and t.id not in seen_ids
+        ]
+
+    return diff
+
+
+# ---------------------------
+# Uygula
+# ---------------------------
+
+def apply_diff(diff: CurriculumDiff, batch_size: int = 500):
+    with transaction.atomic():
+        Grade.objects.bulk_create([Grade(number=n) for n in diff.new_grades], batch_size=batch_size)
+        Subject.objects.bulk_create([Subject(name=n) for n in diff.new_subjects], batch_size=batch_size)
+
+        grades, subjects = {}, {}
+        for g in Grade.objects.order_by("id"):
+            grades.setdefault(g.number, g)
+        for s in Subject.objects.order_by("id"):
+            subjects.setdefault(s.name, s)
+
+        _insert_topics(diff.insert, diff.existing, grades, subjects, batch_size)
+
+        if diff.update:
+            for t in diff.update:
+                t.is_active = True
+            TopicTemplate.objects.bulk_update(diff.update, ["is_active"], batch_size=batch_size)
+
+        if diff.reorder:
+            objs = []
+            for t, order in diff.reorder:
+                t.order = order
+                objs.append(t)
+            TopicTemplate.objects.bulk_update(objs, ["order"], batch_size=batch_size)
+
+        if diff.retire:
+            TopicTemplate.objects.filter(id__in=[t.id for t in diff.retire]).update(is_active=False)
+
+    if diff.has_changes:
+        bump_tree_version()
+    if diff.update or diff.retire:
+        # bulk_update/update sinyal tetiklemez; aktiflik değişen konuların detay cache'i elle düşürülür
+        invalidate_topic_payload(*[t.id for t in diff.update + diff.retire])
+
+    if diff.insert or diff.update:
+        reset_cursors(
+            {(grades[g].id, subjects[s].id) for g, s, _, _ in diff.insert}
+            | {(t.grade_id, t.subject_id) for t in diff.update}
+        )
+
+
+def _insert_topics(inserts, existing, grades, subjects, batch_size):
+    """
+    Seviye seviye bulk_create (ebeveyn id'leri bir önceki seviyeden gelir),
+    en sonda path/depth tek bulk_update ile yazılır.
+    """
+    if not inserts:
+        return
+
+    existing = dict(existing)
+    by_level = {}
+    for grade_num, subject_name, titles, order in inserts:
+        by_level.setdefault(len(titles), []).append((grade_num, subject_name, titles, order))
+
+    created = []
+    for level in sorted(by_level):
+        objs, keys = [], []
+        for grade_num, subject_name, titles, order in by_level[level]:
+            g, s = grades[grade_num], subjects[subject_name]
+            parent = existing.get((g.id, s.id, titles[:-1])) if level > 1 else None
+            objs.append(TopicTemplate(
+                grade=g, subject=s, parent=parent,
+                title=titles[-1], order=order,
+            ))
+            keys.append((g.id, s.id, titles))
+
+        TopicTemplate.objects.bulk_create(objs, batch_size=batch_size)
+
+        for key, obj in zip(keys, objs):
+            parent = obj.parent
+            obj.path = make_path(parent.path if parent else "", obj.pk)
+            obj.depth = parent.depth + 1 if parent else 0
+            existing[key] = obj
+            created.append(obj)
+
+    TopicTemplate.objects.bulk_update(created, ["path", "depth"], batch_size=batch_size)
+
+
+def describe(diff: CurriculumDiff, verbose: bool = False):
+    """--dry-run raporu için satırlar."""
+    s = diff.summary()
+    lines = [
+        f"Yeni sınıf: {s['grades']}  Yeni ders: {s['subjects']}",
+        f"Eklenecek: {s['insert']}  Yeniden aktif: {s['update']}  "
+        f"Sırası değişecek: {s['reorder']}  Emekliye ayrılacak: {s['retire']}",
+    ]
+    if verbose:
+        for g, subj, titles, order in diff.insert:
+            lines.append(f"  + {g}. Sınıf {subj}: {' > '.join(titles)} (#{order})")
+        for t in diff.update:
+            lines.append(f"  * #{t.id} {t.title} (yeniden aktif)")
+        for t, order in diff.reorder:
+            lines.append(f"  ~ #{t.id} {t.title}: sıra {t.order} -> {order}")
+        for t in diff.retire:
+            lines.append(f"  - #{t.id} {t.title}")
+    return lines
@@ -0,0 +1,129 @@
+# content/cursors.py
+"""
+Öğrenci başına müfredat imleci (CurriculumCursor).
+
+Kapsam: öğrencinin kayıtlı olduğu kursların (grade, subject) çiftleri;
+hiçbiri müfredata bağlı değilse (None, None) = tüm konu bankası.
+
+- Sıradaki konu: imleç satırından okunur (plan üretirken tablo taranmaz).
+- İmleç sadece konusu tamamlanınca (veya konu pasif olunca) ilerletilir;
+  ilerletme o kapsamdaki en küçük id'li tamamlanmamış aktif konuyu bulur.
+"""
+from django.db.models import Q
+
+from courses.models import Course
+
+from .models import CurriculumCursor, StudentTopicProgress, TopicTemplate
+
+
+GLOBAL_SCOPE = (None, None)
+
+
+def enrolled_scopes(user_ids):
+    """Dönüş: {user_id: [(grade_id, subject_id), ...]}  (tek sorgu)"""
+    out = {uid: [] for uid in user_ids}
+    rows = (
+        Course.objects
+        .filter(enrollments__user_id__in=out.keys(), grade__isnull=False, subject__isnull=False)
+        .values_list("enrollments__user_id", "grade_id", "subject_id")
+        .distinct()
+    )
+    for uid, grade_id, subject_id in rows:
+        out[uid].append((grade_id, subject_id))
+    for uid, scopes in out.items():
+        if not scopes:
+            scopes.append(GLOBAL_SCOPE)
+    return out
+
+
+def _scope_filter(grade_id, subject_id, prefix=""):
+    if (grade_id, subject_id) == GLOBAL_SCOPE:
+        return {}
+    return {f"{prefix}grade_id": grade_id, f"{prefix}subject_id": subject_id}
+
+
+def _next_topic_id(user_id, grade_id, subject_id):
+    completed = StudentTopicProgress.objects.filter(
+        user_id=user_id, completed=True, **_scope_filter(grade_id, subject_id, "topic__")
+    ).values("topic_id")
+
+    return (
+        TopicTemplate.objects
+        .filter(is_active=True, **_scope_filter(grade_id, subject_id))
+        .exclude(id__in=completed)
+        .order_by("id")
+        .values_list("id", flat=True)
+        .first()
+    )
+
+
+def advance(cursor):
+    cursor.topic_id = _next_topic_id(cursor.user_id, cursor.grade_id, cursor.subject_id)
+    cursor.save(update_fields=["topic", "updated_at"])
+    return cursor
+
+
+def advance_past(user_id, topic_id):
+    """Konu tamamlandı: o konuyu gösteren imleçleri ilerlet (yoksa tek hafif sorgu)."""
+    for cursor in CurriculumCursor.objects.filter(user_id=user_id, topic_id=topic_id):
+        advance(cursor)
+
+
+def reset_cursors(scopes):
+    """
+    Yeni/yeniden açılan konular imlecin gerisinde kalabilir: ilgili kapsamların
+    (ve tüm-banka kapsamının) imleçleri silinir, ilk kullanımda yeniden hesaplanır.
+    """
+    q = Q(grade__isnull=True, subject__isnull=True)
+    for grade_id, subject_id in scopes:
+        q |= Q(grade_id=grade_id, subject_id=subject_id)
+    CurriculumCursor.objects.filter(q).delete()
+
+
+def cursors_for(user_ids):
+    """
+    Dönüş: {user_id: [CurriculumCursor, ...]} (konu select_related)
+    Eksik imleçler burada bir kere hesaplanıp oluşturulur.
+    """
+    scopes = enrolled_scopes(user_ids)
+    out = {uid: [] for uid in scopes}
+
+    existing = (
+        CurriculumCursor.objects
+        .filter(user_id__in=scopes.keys())
+        .select_related("topic")
+    )
+    have = set()
+    for c in existing:
+        if (c.grade_id, c.subject_id) in scopes[c.user_id]:
+            out[c.user_id].append(c)
+            have.add((c.user_id, c.grade_id, c.subject_id))
+
+    for uid, user_scopes in scopes.items():
+        for grade_id, subject_id in user_scopes:
+            if (uid, grade_id, subject_id) in have:
+                continue
+            cursor, _ = CurriculumCursor.objects.get_or_create(user_id=uid, grade_id=grade_id, subject_id=subject_id)
+            out[uid].append(advance(cursor))
+
+    return out
+
+
+def pick(cursors):
+    """
+    Konusu olan imleçlerden en uzun süredir ilerlemeyeni seçer (dersler sırayla
+    döner). Konusu pasif olmuşsa imleç önce ilerletilir.
+    Dönüş: TopicTemplate veya None
+    """
+    for c in cursors:
+        if c.topic_id and not c.topic.is_active:
+            advance(c)
+
+    live = [c for c in cursors if c.topic_id]
+    if not live:
+        return None
+    return min(live, key=lambda c: (c.updated_at, c.id)).topic
+
+
+def next_topic_for(user):
+    return pick(cursors_for([user.id])[user.id])
@@ -0,0 +1,255 @@
+# content/heartbeats.py
+"""
+Video ilerleme nabızları için write-behind tampon.
+
+Oynatıcı birkaç saniyede bir ilerleme gönderir; her biri DB'ye yazılmaz:
+- (user, topic) başına en yüksek değer cache'te tutulur
+- DB'ye şu durumlarda yazılır:
+    * ilk nabız (satır yoksa oluşsun, durum bilinsin)
+    * %80 eşiği ilk kez geçildiğinde (video_completed / konu tamamlanma hemen işlenir)
+    * sayfa kapanırken (final=True)
+    * son yazımdan VIDEO_FLUSH_INTERVAL saniye geçtiyse (bir sonraki nabızda)
+    * periyodik süpürme: flush_video_progress komutu / Celery görevi
+- DB'deki değer hiçbir zaman geri gitmez (max alınır).
+
+Kirli kayıt listesi Redis set'inde tutulur (SADD/SPOP). Tampon ve liste tüm
+worker'lar arasında paylaşılmalıdır: content cache Redis değilse (locmem vb.)
+tamponlama kapalıdır, her nabız doğrudan DB'ye yazılır.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache.backends.redis import RedisCache
+from django.db import transaction
+from django.utils import timezone
+
+from .caching import content_cache
+from .cursors import advance_past
+from .models import StudentTopicProgress
+from .services import mark_topic_items_done
+
+
+VIDEO_DONE_AT = 80
+ENTRY_TIMEOUT = 60 * 60 * 24
+DIRTY_KEY = "video:hb:dirty"
+
+
+def flush_interval() -> int:
+    return getattr(settings, "VIDEO_FLUSH_INTERVAL", 60)
+
+
+def _key(user_id, topic_id) -> str:
+    return f"video:hb:{user_id}:{topic_id}"
+
+
+# ---------------------------
+# Kirli kayıt listesi
+# ---------------------------
+
+class _RedisDirty:
+    def __init__(self, cache):
+        self._cache = cache
+        self._key = cache.make_and_validate_key(DIRTY_KEY)
+
+    def _client(self):
+        return self._cache._cache.get_client(self._key, write=True)
+
+    def add(self, member):
+        self._client().sadd(self._key, member)
+
+    def discard(self, member):
+        self._client().srem(self._key, member)
+
+    def pop_many(self, count):
+        return [m.decode() if isinstance(m, bytes) else m for m in (self._client().spop(self._key, count) or [])]
+
+
+def buffering_enabled(cache=None) -> bool:
+    """
+    Process içi cache'te tampon başka worker'dan/süpürmeden görünmez; sayfa
+    kapanmadan process yeniden başlarsa ilerleme kaybolur.
+    """
+    return isinstance(cache or content_cache(), RedisCache)
+
+
+def _dirty():
+    return _RedisDirty(content_cache())
+
+
+# ---------------------------
+# DB'ye yazma (toplu)
+# ---------------------------
+
+def flush(progress_by_pair):
+    """
+    progress_by_pair: {(user_id, topic_id): progress}
+    1 SELECT + bulk_create (yeni satırlar) + bulk_update (değişenler);
+    yeni satır varsa çakışanlar için bir SELECT daha.
+    Dönüş: {(user_id, topic_id): {"video_progress", "video_completed", "completed"}}
+    """
+    if not progress_by_pair:
+        return {}
+
+    now = timezone.now()
+    user_ids = {u for u, _ in progress_by_pair}
+    topic_ids = {t for _, t in progress_by_pair}
+    state, flipped = {}, []
+
+    with transaction.atomic():
+        rows = {
+            (p.user_id, p.topic_id): p
+            for p in StudentTopicProgress.objects.select_for_update().filter(
+                user_id__in=user_ids, topic_id__in=topic_ids
+            )
+        }
+
+        new, changed = [], []
+        for pair, value in progress_by_pair.items():
+            prog = rows.get(pair)
+            if prog is None:
+                prog = StudentTopicProgress(user_id=pair[0], topic_id=pair[1])
+                new.append(prog)
+            elif value <= prog.video_progress:
+                state[pair] = _state(prog)
+                continue
+            else:
+                changed.append(prog)
+
+            if _apply(prog, value, now):
+                flipped.append(pair)
+            state[pair] = _state(prog)
+
+        if new:
+            StudentTopicProgress.objects.bulk_create(new, ignore_conflicts=True)
+            # SELECT ile INSERT arasında başka istek satırı açtıysa bizimki eklenmedi:
+            # değer o satıra da max kuralıyla uygulanır (kendi eklediklerimizde no-op)
+            new_pairs = {(p.user_id, p.topic_id) for p in new}
+            for prog in StudentTopicProgress.objects.select_for_update().filter(
+                user_id__in={u for u, _ in new_pairs}, topic_id__in={t for _, t in new_pairs}
+            ):
+                pair = (prog.user_id, prog.topic_id)
+                if pair not in new_pairs:
+                    continue
+                if progress_by_pair[pair] > prog.video_progress:
+                    changed.append(prog)
+                    if _apply(prog, progress_by_pair[pair], now):
+                        flipped.append(pair)
+                state[pair] = _state(prog)
+        if changed:
+            StudentTopicProgress.objects.bulk_update(
+                changed, ["video_progress", "video_completed", "completed", "last_activity"]
+            )
+
+        # bulk_update post_save tetiklemez: tamamlanan konuların yan etkileri elle
+        for user_id, topic_id in flipped:
+            advance_past(user_id, topic_id)
+            mark_topic_items_done(user_id, topic_id)
+
+    return state
+
+
+def _apply(prog, value, now) -> bool:
+    """Değeri satıra yazar; konu bu yazımla tamamlandıysa True."""
+    prog.last_activity = now
+    prog.video_progress = value
+    prog.video_completed = prog.video_completed or value >= VIDEO_DONE_AT
+    if prog.video_completed and prog.test_score >= 70 and not prog.completed:
+        prog.completed = True
+        return True
+    return False
+
+
+def _state(prog):
+    return {
+        "video_progress": prog.video_progress,
+        "video_completed": prog.video_completed,
+        "completed": prog.completed,
+    }
+
+
+# ---------------------------
+# Nabız
+# ---------------------------
+
+def record(user_id, topic_id, progress: int, final: bool = False):
+    """
+    Tek nabız. Dönüş: istemciye gösterilecek durum (tampondaki max dahil).
+    """
+    c = content_cache()
+    if not buffering_enabled(c):
+        return flush({(user_id, topic_id): progress})[(user_id, topic_id)]
+
+    key = _key(user_id, topic_id)
+    now = time.time()
+
+    entry = c.get(key)
+    if entry is None:
+        # ilk nabız (veya tampon düşmüş): DB ile senkronize ol
+        entry = {"p": progress, "f": -1, "t": 0, "done": False, "completed": False}
+
+    entry["p"] = max(entry["p"], progress)
+
+    due = (
+        final
+        or entry["f"] < 0
+        or (entry["p"] >= VIDEO_DONE_AT and not entry["done"])
+        or now - entry["t"] >= flush_interval()
+    )
+
+    member = f"{user_id}:{topic_id}"
+    if due and entry["p"] > entry["f"]:
+        st = flush({(user_id, topic_id): entry["p"]})[(user_id, topic_id)]
+        entry.update(p=st["video_progress"], f=st["video_progress"], t=now,
+                     done=st["video_completed"], completed=st["completed"])
+        _dirty().discard(member)
+    elif entry["p"] > entry["f"]:
+        _dirty().add(member)
+
+    c.set(key, entry, ENTRY_TIMEOUT)
+
+    return {
+        "video_progress": entry["p"],
+        "video_completed": entry["done"] or entry["p"] >= VIDEO_DONE_AT,
+        "completed": entry["completed"],
+    }
+
+
+def buffered_progress(user_id, topic_id):
+    """Henüz DB'ye yazılmamış en yüksek değer (yoksa None)."""
+    entry = content_cache().get(_key(user_id, topic_id))
+    if entry and entry["p"] > entry["f"]:
+        return entry["p"]
+    return None
+
+
+def sweep(batch_size: int = 500) -> int:
+    """Tamponda bekleyen tüm değerleri toplu yazar. Dönüş: yazılan (user, topic) sayısı."""
+    c = content_cache()
+    if not buffering_enabled(c):
+        return 0
+    dirty = _dirty()
+    total = 0
+
+    while True:
+        members = dirty.pop_many(batch_size)
+        if not members:
+            break
+
+        pairs = [tuple(int(x) for x in m.split(":")) for m in members]
+        entries = c.get_many([_key(u, t) for u, t in pairs])
+
+        pending = {}
+        for u, t in pairs:
+            entry = entries.get(_key(u, t))
+            if entry and entry["p"] > entry["f"]:
+                pending[(u, t)] = entry["p"]
+
+        states = flush(pending)
+        now = time.time()
+        for (u, t), st in states.items():
+            entry = entries[_key(u, t)]
+            entry.update(f=st["video_progress"], t=now, done=st["video_completed"], completed=st["completed"])
+        c.set_many({_key(u, t): entries[_key(u, t)] for u, t in states}, ENTRY_TIMEOUT)
+        total += len(states)
+
+    return total
@@ -0,0 +1,34 @@
+from datetime import date as date_cls
+
+from django.core.management.base import BaseCommand, CommandError
+
+from content.services import build_daily_plans
+
+
+class Command(BaseCommand):
+    help = "Aktif öğrencilerin günlük planlarını önceden (varsayılan: yarın için) toplu oluşturur"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", help="YYYY-MM-DD (varsayılan: yarın)")
+        parser.add_argument("--active-days", type=int, default=30,
+                            help="Son kaç günde görülen öğrenciler (0 = hepsi)")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        day = None
+        if options["date"]:
+            try:
+                day = date_cls.fromisoformat(options["date"])
+            except ValueError:
+                raise CommandError("--date YYYY-MM-DD formatında olmalı")
+
+        result = build_daily_plans(
+            date=day,
+            batch_size=options["batch_size"],
+            active_days=options["active_days"],
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['plans']} plan / {result['items']} madde oluşturuldu, "
+            f"{result['skipped']} öğrencinin planı zaten vardı."
+        ))
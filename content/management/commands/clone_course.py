@@ -0,0 +1,35 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.models import Course
+from content.course_clone import clone_course, section_titles
+
+
+class Command(BaseCommand):
+    help = "Kursu dersleri, dosya / video kayıtları, sınavları ve sorularıyla kopyalar (dosya baytları paylaşılır)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("course_id", type=int)
+        parser.add_argument("--title", help="Yeni kurs adı (varsayılan: '<ad> (kopya)')")
+        parser.add_argument("--copies", type=int, default=1, help="Şube sayısı; adlara '- Şube N' eklenir")
+        parser.add_argument("--owner", help="Öğretmen kullanıcı adı (varsayılan: kaynağın öğretmeni)")
+
+    def handle(self, *args, **options):
+        source = Course.objects.filter(id=options["course_id"]).first()
+        if source is None:
+            raise CommandError(f"Kurs bulunamadı: #{options['course_id']}")
+        if options["copies"] < 1:
+            raise CommandError("--copies en az 1 olmalı")
+
+        owner = None
+        if options["owner"]:
+            owner = get_user_model().objects.filter(username=options["owner"]).first()
+            if owner is None:
+                raise CommandError(f"Kullanıcı bulunamadı: {options['owner']}")
+
+        titles = section_titles(options["title"] or f"{source.title} (kopya)", options["copies"])
+        clones = clone_course(source, titles, owner=owner)
+
+        for c in clones:
+            self.stdout.write(f"  #{c.id} {c.title}")
+        self.stdout.write(self.style.SUCCESS(f"{len(clones)} kurs oluşturuldu."))
@@ -0,0 +1,41 @@
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from content.blobs import BLOB_FIELDS, PREFIX, import_file, recount, upload_name
+
+
+class Command(BaseCommand):
+    help = "Eski (tekilleştirilmemiş) yüklemeleri içerik adresli blob deposuna taşır"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Sadece say, taşıma")
+        parser.add_argument("--keep-old", action="store_true", help="Eski dosyaları silme")
+
+    def handle(self, *args, **options):
+        moved = missing = 0
+        for label, field in BLOB_FIELDS.items():
+            qs = apps.get_model(label).objects.exclude(**{f"{field}__startswith": PREFIX}).exclude(**{field: ""})
+            qs = qs.exclude(**{f"{field}__isnull": True})
+            names = sorted(set(qs.values_list(field, flat=True)))
+            self.stdout.write(f"{label}.{field}: {len(names)} dosya")
+            if options["dry_run"]:
+                continue
+
+            for old in names:
+                if not default_storage.exists(old):
+                    missing += 1
+                    continue
+                new = import_file(old)
+                # blob adı özettir: yüklenen ad kaybolmasın
+                qs.filter(**{field: old}, original_name="").update(original_name=upload_name(old))
+                # aynı adı gösteren tüm satırlar (kopyalanmış kurslar) tek UPDATE
+                qs.filter(**{field: old}).update(**{field: new})
+                if not options["keep_old"]:
+                    default_storage.delete(old)
+                moved += 1
+
+        if not options["dry_run"]:
+            recount()
+        suffix = " (dry-run, yazılmadı)" if options["dry_run"] else ""
+        self.stdout.write(self.style.SUCCESS(f"{moved} dosya taşındı, {missing} dosya bulunamadı.{suffix}"))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from content.question_bank import export_queryset, iter_csv, iter_export_rows, write_xlsx
+
+
+class Command(BaseCommand):
+    help = "TopicQuestion soru bankasını CSV/XLSX olarak dışa aktarır"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", "-o", help="Çıktı dosyası (.csv/.xlsx). Verilmezse CSV stdout'a yazılır.")
+        parser.add_argument("--grade", type=int)
+        parser.add_argument("--subject")
+
+    def handle(self, *args, **options):
+        rows = iter_export_rows(export_queryset(grade=options["grade"], subject=options["subject"]))
+        out = options["output"]
+
+        if not out:
+            for chunk in iter_csv(rows):
+                self.stdout.write(chunk, ending="")
+            return
+
+        if out.lower().endswith(".xlsx"):
+            write_xlsx(rows, out)
+        elif out.lower().endswith(".csv"):
+            with open(out, "w", encoding="utf-8", newline="") as f:
+                for chunk in iter_csv(rows):
+                    f.write(chunk)
+        else:
+            raise CommandError("Çıktı .csv veya .xlsx olmalı.")
+
+        self.stdout.write(self.style.SUCCESS(f"Soru bankası dışa aktarıldı: {out}"))
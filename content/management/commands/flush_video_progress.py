@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from content.heartbeats import sweep
+
+
+class Command(BaseCommand):
+    help = "Cache'te bekleyen video ilerleme nabızlarını toplu olarak DB'ye yazar"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        n = sweep(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"{n} video ilerlemesi DB'ye yazıldı."))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from content.question_bank import QuestionImportError, import_questions, iter_rows
+
+
+class Command(BaseCommand):
+    help = "TopicQuestion soru bankasını CSV/XLSX dosyasından toplu yükler"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help=".csv veya .xlsx dosyası")
+        parser.add_argument("--dry-run", action="store_true", help="Doğrula ama yazma")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        try:
+            with open(path, "rb") as f:
+                result = import_questions(
+                    iter_rows(f, path),
+                    batch_size=options["batch_size"],
+                    dry_run=options["dry_run"],
+                )
+        except (QuestionImportError, OSError) as e:
+            raise CommandError(str(e))
+
+        for line_no, msg in result["errors"]:
+            self.stdout.write(self.style.WARNING(f"Satır {line_no}: {msg}"))
+
+        verb = "eklenebilir (dry-run)" if options["dry_run"] else "eklendi"
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['created']} soru {verb}, {result['duplicates']} tekrar atlandı, "
+            f"{result['error_count']} hatalı satır."
+        ))
@@ -0,0 +1,23 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from content.mediaproc import SOURCE_FIELDS
+from content.tasks import process_media_task
+
+
+class Command(BaseCommand):
+    help = "İşlenmemiş (veya --all ile tüm) dosyalar için süre / sayfa sayısı / önizleme görevlerini kuyruğa alır"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Daha önce işlenmişleri de yeniden işle")
+
+    def handle(self, *args, **options):
+        total = 0
+        for label, source in SOURCE_FIELDS.items():
+            qs = apps.get_model(label).objects.exclude(**{source: ""})
+            if not options["all"]:
+                qs = qs.filter(processed_at__isnull=True)
+            for pk in qs.values_list("id", flat=True).iterator():
+                process_media_task.delay(label, pk)
+                total += 1
+        self.stdout.write(self.style.SUCCESS(f"{total} dosya kuyruğa alındı."))
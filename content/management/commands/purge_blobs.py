@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from content.blobs import GRACE, purge, recount
+
+
+class Command(BaseCommand):
+    help = "Referansı kalmamış blob dosyalarını siler (--recount: önce sayaçları model satırlarından düzelt)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--recount", action="store_true", help="Referans sayaçlarını baştan hesapla")
+        parser.add_argument("--grace-hours", type=float, default=GRACE.total_seconds() / 3600)
+
+    def handle(self, *args, **options):
+        if options["recount"]:
+            fixed = recount()
+            self.stdout.write(f"{fixed} blob sayacı düzeltildi.")
+
+        n = purge(timedelta(hours=options["grace_hours"]))
+        self.stdout.write(self.style.SUCCESS(f"{n} kullanılmayan blob silindi."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from content.uploads import purge_stale
+
+
+class Command(BaseCommand):
+    help = "Yarım kalmış eski parçalı yüklemeleri (ve parçalarını) siler"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than-hours", type=int, default=24)
+
+    def handle(self, *args, **options):
+        n = purge_stale(options["older_than_hours"])
+        self.stdout.write(self.style.SUCCESS(f"{n} yarım yükleme silindi."))
@@ -0,0 +1,28 @@
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+
+from courses.models import Course
+from content.course_progress import build
+
+
+class Command(BaseCommand):
+    help = "CourseProgressSummary satırlarını LessonProgress'ten kurs parçaları halinde yeniden hesaplar"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--course", type=int, action="append", help="Sadece bu kurs (tekrarlanabilir)")
+        parser.add_argument("--batch-size", type=int, default=50, help="Tek seferde işlenecek kurs sayısı")
+
+    def handle(self, *args, **options):
+        course_ids = options["course"] or Course.objects.order_by("id").values_list("id", flat=True)
+        course_ids = iter(course_ids)
+
+        courses = summaries = 0
+        while True:
+            chunk = list(islice(course_ids, options["batch_size"]))
+            if not chunk:
+                break
+            summaries += len(build(chunk))
+            courses += len(chunk)
+
+        self.stdout.write(self.style.SUCCESS(f"{courses} kurs için {summaries} ilerleme özeti güncel."))
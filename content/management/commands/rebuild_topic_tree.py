@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from content.caching import bump_tree_version
+from content.models import TopicTemplate
+from content.tree import rebuild_paths
+
+
+class Command(BaseCommand):
+    help = "TopicTemplate materialized path (path/depth) indeksini mevcut veriden yeniden kurar"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            changed = rebuild_paths(TopicTemplate, batch_size=options["batch_size"])
+
+        if changed:
+            bump_tree_version()
+
+        self.stdout.write(self.style.SUCCESS(f"Konu ağacı indeksi yenilendi. {changed} kayıt güncellendi."))
@@ -0,0 +1,53 @@
+from datetime import date as date_cls
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from content.models import DailyPlan
+
+
+class Command(BaseCommand):
+    help = "DailyPlan total_items/done_items sayaçlarını maddelerle toplu olarak eşitler"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", help="YYYY-MM-DD; sadece bu tarihten sonraki planlar")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        qs = DailyPlan.objects.all()
+        if options["since"]:
+            try:
+                qs = qs.filter(date__gte=date_cls.fromisoformat(options["since"]))
+            except ValueError:
+                raise CommandError("--since YYYY-MM-DD formatında olmalı")
+
+        # Tek aggregate sorgu: sadece sayacı tutmayan planlar gelir
+        drifted = (
+            qs.annotate(
+                real_total=Count("items"),
+                real_done=Count("items", filter=Q(items__is_done=True)),
+            )
+            .filter(~Q(total_items=F("real_total")) | ~Q(done_items=F("real_done")))
+            .only("id", "total_items", "done_items", "completion_rate", "is_completed")
+        )
+
+        fixed = []
+        for plan in drifted.iterator(chunk_size=options["batch_size"]):
+            plan.total_items = plan.real_total
+            plan.done_items = plan.real_done
+            plan.completion_rate = plan.done_items * 100 // plan.total_items if plan.total_items else 0
+            plan.is_completed = plan.completion_rate == 100
+            fixed.append(plan)
+
+        if fixed and not options["dry_run"]:
+            with transaction.atomic():
+                DailyPlan.objects.bulk_update(
+                    fixed,
+                    ["total_items", "done_items", "completion_rate", "is_completed"],
+                    batch_size=options["batch_size"],
+                )
+
+        suffix = " (dry-run, yazılmadı)" if options["dry_run"] else ""
+        self.stdout.write(self.style.SUCCESS(f"{len(fixed)} planın sayaçları düzeltildi{suffix}."))
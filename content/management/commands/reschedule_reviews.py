@@ -0,0 +1,82 @@
+from datetime import timedelta
+from itertools import groupby, islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from content.models import ReviewItem, ReviewAttempt
+from content.scheduling import get_scheduler
+
+
+FIELDS = [
+    "stage", "ease", "stability", "difficulty", "interval_days",
+    "last_reviewed_at", "next_review_at", "is_active",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Tüm tekrar kayıtlarının parametrelerini ve bir sonraki tekrar tarihini "
+        "ReviewAttempt geçmişinden yeniden hesaplar (zamanlayıcı değişince çalıştırın)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scheduler", help="sm2 | fsrs | fixed (varsayılan: settings.REVIEW_SCHEDULER)")
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--dry-run", action="store_true", help="Hesapla ama yazma")
+
+    def handle(self, *args, **options):
+        try:
+            scheduler = get_scheduler(options["scheduler"])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        batch_size = options["batch_size"]
+
+        # Tek sorgu, item'a göre sıralı akış: her item'ın geçmişi art arda gelir
+        attempts = (
+            ReviewAttempt.objects
+            .order_by("item_id", "at", "id")
+            .values_list("item_id", "at", "score")
+            .iterator(chunk_size=batch_size)
+        )
+        histories = (
+            (item_id, [(at, score) for _, at, score in rows])
+            for item_id, rows in groupby(attempts, key=lambda r: r[0])
+        )
+
+        seen = updated = retired = 0
+        while True:
+            chunk = dict(islice(histories, batch_size))
+            if not chunk:
+                break
+
+            items = ReviewItem.objects.filter(id__in=chunk).only("id", "last_wrong_at", *FIELDS)
+            changed = []
+            for item in items:
+                seen += 1
+                state = scheduler.replay(chunk[item.id])
+                before = [getattr(item, f) for f in FIELDS]
+                state.apply_to(item)
+
+                # son tekrardan sonra testte tekrar yanlış yapılmışsa konu
+                # tekrar listesinde kalır ve en geç ertesi gün sorulur
+                if item.last_wrong_at and item.last_wrong_at > state.last_reviewed_at:
+                    item.is_active = True
+                    soon = item.last_wrong_at + timedelta(days=1)
+                    item.next_review_at = min(state.due_at, soon) if state.due_at else soon
+
+                if [getattr(item, f) for f in FIELDS] != before:
+                    changed.append(item)
+                    retired += int(not item.is_active)
+
+            if changed and not options["dry_run"]:
+                with transaction.atomic():
+                    ReviewItem.objects.bulk_update(changed, FIELDS, batch_size=batch_size)
+            updated += len(changed)
+
+        suffix = " (dry-run, yazılmadı)" if options["dry_run"] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"[{scheduler.name}] {seen} tekrar kaydı incelendi, {updated} güncellendi "
+            f"({retired} tanesi tekrar listesinden çıktı){suffix}."
+        ))
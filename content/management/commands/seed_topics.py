@@ -1,5 +1,6 @@
-from django.core.management.base import BaseCommand
-from content.models import Grade, Subject, TopicTemplate
+from django.core.management.base import BaseCommand, CommandError
+
+from content.curriculum import CurriculumError, apply_diff, compute_diff, describe, load_file, merge
 
 
 # Alt başlık şablonları (B modeli)
@@ -191,38 +192,44 @@ DATA = build_full_data()
 
 
 class Command(BaseCommand):
-    help = "B modeli: 1–12. sınıf ders konu bankasını (üst konu + alt konular) yükler"
+    help = (
+        "Müfredat yükleyici: 1–12. sınıf konu bankasını (veya --file ile verilen "
+        "JSON/YAML dosyalarını) diff alarak toplu şekilde yükler"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--file", "-f", action="append", dest="files", default=[],
+            help="Müfredat dosyası (.json/.yaml). Birden fazla verilebilir; verilmezse dahili DATA kullanılır.",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Sadece raporla, veritabanına yazma")
+        parser.add_argument(
+            "--retire", action="store_true",
+            help="Dosyadaki (sınıf, ders) kapsamında olup dosyada olmayan konuları pasifleştir",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
 
     def handle(self, *args, **options):
-        created_count = 0
-
-        for grade_num, subjects in DATA.items():
-            grade, _ = Grade.objects.get_or_create(number=grade_num)
-
-            for subject_name, topics in subjects.items():
-                subject, _ = Subject.objects.get_or_create(name=subject_name)
-
-                for i, item in enumerate(topics, start=1):
-                    parent_obj, parent_created = TopicTemplate.objects.get_or_create(
-                        grade=grade,
-                        subject=subject,
-                        parent=None,
-                        title=item["title"],
-                        order=i,
-                    )
-                    if parent_created:
-                        created_count += 1
-
-                    children = item.get("children", []) or []
-                    for j, child_title in enumerate(children, start=1):
-                        _, child_created = TopicTemplate.objects.get_or_create(
-                            grade=grade,
-                            subject=subject,
-                            parent=parent_obj,
-                            title=child_title,
-                            order=j,
-                        )
-                        if child_created:
-                            created_count += 1
-
-        self.stdout.write(self.style.SUCCESS(f"Konu bankası yüklendi. Toplam {created_count} kayıt eklendi."))
+        try:
+            if options["files"]:
+                data = merge(*[load_file(f) for f in options["files"]])
+            else:
+                data = merge(DATA)
+
+            diff = compute_diff(data, retire=options["retire"])
+        except (CurriculumError, OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for line in describe(diff, verbose=options["verbosity"] >= 2 or options["dry_run"]):
+            self.stdout.write(line)
+
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING("Dry-run: hiçbir değişiklik yazılmadı."))
+            return
+
+        if not diff.has_changes:
+            self.stdout.write(self.style.SUCCESS("Konu bankası güncel, değişiklik yok."))
+            return
+
+        apply_diff(diff, batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Konu bankası yüklendi. Toplam {len(diff.insert)} kayıt eklendi."))
@@ -0,0 +1,230 @@
+# content/media.py
+"""
+Yüklenen dosyaların (FileField) erişim kontrollü teslimi.
+
+Tüm dosya linkleri /files/<tür>/<id>/ üzerinden verilir (protected_media view);
+erişim kontrolünden sonra dosya şu yollardan biriyle gönderilir:
+
+- S3 depolama (MEDIA_STORAGE=s3): kısa ömürlü imzalı URL'ye 302
+  (URL'ler cache'lenen veriye yazılmaz, istek anında üretilir)
+- yerel depolama + MEDIA_ACCEL_REDIRECT_PREFIX: Nginx'e X-Accel-Redirect
+  (byte aralıkları, sendfile vb. Nginx'te; worker beklemez)
+- yerel depolama, Nginx yok: Django'dan akış; tek aralıklı Range desteklenir
+  (video ileri sarma / büyük PDF görüntüleme)
+
+Nginx örneği (MEDIA_ACCEL_REDIRECT_PREFIX="/_protected_media/"):
+    location /_protected_media/ { internal; alias /srv/app/media/; }
+ve /media/ dışarı açık servis edilmez.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseRedirect, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+
+from courses.models import Enrollment
+from messaging.models import Message
+from payments.models import PurchaseRequest
+
+from .blobs import BLOB_FIELDS
+from .models import LessonFile, LessonVideo, TopicContent
+
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+CHUNK_SIZE = 64 * 1024
+
+
+def media_link(kind, pk, preview=False):
+    name = "protected_media_preview" if preview else "protected_media"
+    return reverse(name, kwargs={"kind": kind, "pk": pk})
+
+
+def with_media_urls(contents):
+    """Cache'teki konu içeriklerinde "file" / "preview" (dosya adı) -> korumalı link."""
+    return [{
+        **c,
+        "file": media_link("topic-content", c["id"]) if c["file"] else None,
+        "preview": media_link("topic-content", c["id"], preview=True) if c.get("preview") else None,
+    } for c in contents]
+
+
+# ---------------------------
+# Erişim
+# ---------------------------
+
+def can_view_course(user, course) -> bool:
+    """lesson_detail + course_detail kuralları: sahip öğretmen, admin, kayıtlı (ve ücretliyse onaylı) öğrenci."""
+    if user.role == "ADMIN" or user.is_superuser:
+        return True
+    if user.role == "TEACHER":
+        return course.owner_id == user.id
+    if not Enrollment.objects.filter(course=course, user=user).exists():
+        return False
+    if course.is_paid:
+        return PurchaseRequest.objects.filter(
+            user=user, course=course, status=PurchaseRequest.Status.APPROVED
+        ).exists()
+    return True
+
+
+def _message_file(user, pk):
+    msg = get_object_or_404(Message.objects.select_related("conversation"), id=pk, is_deleted=False)
+    convo = msg.conversation
+    if user.role != "ADMIN" and user.id not in (convo.student_id, convo.teacher_id):
+        raise PermissionDenied
+    return msg.file
+
+
+def resolve_file(user, kind, pk, preview=False):
+    """
+    Dönüş: FieldFile (preview=True ise önizleme görseli, content/mediaproc.py).
+    Yoksa Http404, yetki yoksa PermissionDenied.
+    """
+    if kind == "lesson-file":
+        obj = get_object_or_404(LessonFile.objects.select_related("lesson__course"), id=pk)
+        course, f = obj.lesson.course, obj.file
+    elif kind == "lesson-video":
+        obj = get_object_or_404(LessonVideo.objects.select_related("lesson__course"), id=pk)
+        course, f = obj.lesson.course, obj.video
+    elif kind == "topic-content":
+        # konu bankası tüm giriş yapmış kullanıcılara açık (topic_page gibi)
+        obj = get_object_or_404(TopicContent, id=pk, is_active=True)
+        course, f = None, obj.file
+    elif kind == "message" and not preview:
+        course, f = None, _message_file(user, pk)
+    else:
+        raise Http404
+
+    if preview:
+        f = obj.preview
+
+    if course is not None and not can_view_course(user, course):
+        raise PermissionDenied
+    if not f:
+        raise Http404
+    return f
+
+
+# ---------------------------
+# Teslim
+# ---------------------------
+
+def _local_path(storage, name):
+    try:
+        return storage.path(name)
+    except NotImplementedError:
+        return None
+
+
+def _parse_range(header, size):
+    """
+    Dönüş: None (başlık yok / desteklenmiyor -> tüm dosya),
+           (start, end) dahil aralık, veya False (karşılanamaz -> 416).
+    Çok aralıklı istekler tüm dosyayla cevaplanır (RFC 9110'a uygun).
+    """
+    m = RANGE_RE.match((header or "").strip())
+    if not m or m.groups() == ("", ""):
+        return None
+    if size == 0:
+        # boş dosyada karşılanabilir bayt aralığı yok
+        return False
+
+    first, last = m.groups()
+    if first == "":
+        # son N bayt
+        n = int(last)
+        if n == 0:
+            return False
+        return max(0, size - n), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _iter_range(f, start, length):
+    try:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        f.close()
+
+
+def download_name(field_file) -> str:
+    """İndirmede görünen ad: yükleme anındaki ad (blob deposunda dosya adı içerik özetidir)."""
+    instance = field_file.instance
+    original = getattr(instance, "original_name", "")
+    if original and field_file.field.attname == BLOB_FIELDS.get(instance._meta.label):
+        return original
+    return os.path.basename(field_file.name)
+
+
+def _disposition(filename) -> str:
+    return f"inline; filename*=UTF-8''{quote(filename)}"
+
+
+def _stream(request, path, content_type, filename):
+    size = os.path.getsize(path)
+    rng = _parse_range(request.headers.get("Range"), size)
+
+    if rng is False:
+        resp = HttpResponse(status=416)
+        resp["Content-Range"] = f"bytes */{size}"
+        return resp
+
+    if rng is None:
+        resp = FileResponse(open(path, "rb"), content_type=content_type)
+    else:
+        start, end = rng
+        resp = StreamingHttpResponse(
+            _iter_range(open(path, "rb"), start, end - start + 1),
+            status=206,
+            content_type=content_type,
+        )
+        resp["Content-Range"] = f"bytes {start}-{end}/{size}"
+        resp["Content-Length"] = str(end - start + 1)
+
+    resp["Accept-Ranges"] = "bytes"
+    resp["Content-Disposition"] = _disposition(filename)
+    return resp
+
+
+def serve(request, field_file):
+    storage, name = field_file.storage, field_file.name
+    filename = download_name(field_file)
+    path = _local_path(storage, name)
+
+    if path is None:
+        # uzak depolama: imzalı URL'ye yönlendir, baytlar worker'dan geçmez;
+        # dosya adı S3'ün döndüreceği Content-Disposition ile verilir
+        resp = HttpResponseRedirect(storage.url(name, parameters={"ResponseContentDisposition": _disposition(filename)}))
+        resp["Cache-Control"] = "private, no-store"
+        return resp
+
+    if not os.path.exists(path):
+        raise Http404
+
+    content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+    prefix = getattr(settings, "MEDIA_ACCEL_REDIRECT_PREFIX", "")
+    if prefix:
+        resp = HttpResponse(content_type=content_type)
+        resp["X-Accel-Redirect"] = prefix.rstrip("/") + "/" + quote(name)
+        resp["Content-Disposition"] = _disposition(filename)
+    else:
+        resp = _stream(request, path, content_type, filename)
+
+    resp["Cache-Control"] = "private, max-age=3600"
+    return resp
@@ -0,0 +1,332 @@
+# content/mediaproc.py
+"""
+Yüklenen dosyalardan türetilen bilgiler (Celery görevi: tasks.process_media_task).
+
+    LessonFile / TopicContent.file : sayfa sayısı (PDF) + önizleme (görsel / PDF ilk sayfa)
+    LessonVideo / TopicContent.file: süre + önizleme karesi
+
+Önizleme kaynağın yanına JPEG olarak kaydedilir (uzantı adda kalır: notlar.pdf
+ile notlar.mp4 aynı önizlemeyi ezmez):
+    lesson_videos/ders1.mp4 -> lesson_videos/ders1.mp4.preview.jpg
+Aynı kaynağı gösteren satırlar (blob tekrar yüklemesi) önizlemeyi paylaşır;
+başka bir satırın kullandığı önizleme silinmez.
+
+Araçlar:
+- görseller: Pillow
+- MP4/MOV süresi: saf Python ("moov/mvhd" kutusu); diğerleri ffprobe varsa
+- video karesi: ffmpeg varsa
+- PDF sayfa sayısı: pdfinfo varsa, yoksa sayfa nesneleri sayılır; ilk sayfa: pdftoppm varsa
+Sistemde olmayan araçların adımı atlanır; dosya yine "işlendi" sayılır.
+"""
+import io
+import logging
+import os
+import re
+import shutil
+import struct
+import subprocess
+import tempfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from PIL import Image, UnidentifiedImageError
+
+from .blobs import is_blob
+
+
+logger = logging.getLogger(__name__)
+
+# model -> kaynak dosya alanı
+SOURCE_FIELDS = {
+    "content.LessonFile": "file",
+    "content.LessonVideo": "video",
+    "content.TopicContent": "file",
+}
+
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".bmp"}
+VIDEO_EXTS = {".mp4", ".m4v", ".mov", ".webm", ".mkv", ".avi"}
+MP4_EXTS = {".mp4", ".m4v", ".mov"}
+PDF_EXTS = {".pdf"}
+
+TOOL_TIMEOUT = 120
+PDF_SCAN_LIMIT = 64 * 1024 ** 2
+
+
+def preview_size():
+    return getattr(settings, "MEDIA_PREVIEW_SIZE", (480, 480))
+
+
+@dataclass
+class MediaInfo:
+    duration_sec: int = 0
+    page_count: int = 0
+    preview: bytes = None  # JPEG
+
+
+# ---------------------------
+# Yardımcılar
+# ---------------------------
+
+@contextmanager
+def local_copy(field_file):
+    """Dış araçlar yol ister: yerel depolamada dosyanın kendisi, değilse geçici kopya."""
+    try:
+        path = field_file.storage.path(field_file.name)
+    except NotImplementedError:
+        path = None
+    if path:
+        yield path
+        return
+
+    suffix = os.path.splitext(field_file.name)[1]
+    with tempfile.NamedTemporaryFile(suffix=suffix) as tmp:
+        with field_file.storage.open(field_file.name, "rb") as src:
+            shutil.copyfileobj(src, tmp, 1024 * 1024)
+        tmp.flush()
+        yield tmp.name
+
+
+def _run(*cmd):
+    """Araç yoksa / hata verirse None, yoksa stdout (bytes)."""
+    if not shutil.which(cmd[0]):
+        return None
+    try:
+        return subprocess.run(cmd, capture_output=True, check=True, timeout=TOOL_TIMEOUT).stdout
+    except (subprocess.SubprocessError, OSError):
+        logger.warning("%s başarısız: %s", cmd[0], cmd[-1])
+        return None
+
+
+def thumbnail_jpeg(image) -> bytes:
+    image = image.convert("RGB")
+    image.thumbnail(preview_size())
+    out = io.BytesIO()
+    image.save(out, "JPEG", quality=80, optimize=True)
+    return out.getvalue()
+
+
+def _jpeg_from_bytes(data):
+    if not data:
+        return None
+    try:
+        return thumbnail_jpeg(Image.open(io.BytesIO(data)))
+    except (UnidentifiedImageError, OSError):
+        return None
+
+
+# ---------------------------
+# Video
+# ---------------------------
+
+def _boxes(f, end):
+    while f.tell() + 8 <= end:
+        start = f.tell()
+        size, kind = struct.unpack(">I4s", f.read(8))
+        header = 8
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+            header = 16
+        elif size == 0:
+            size = end - start
+        if size < header:
+            return
+        yield kind, start + header, start + size
+        f.seek(start + size)
+
+
+def mp4_duration(f):
+    """MP4/MOV süresi (saniye, "moov/mvhd"); bulunamazsa None. Dosyanın tamamı okunmaz."""
+    f.seek(0, os.SEEK_END)
+    end = f.tell()
+    f.seek(0)
+
+    for kind, body, box_end in _boxes(f, end):
+        if kind != b"moov":
+            continue
+        f.seek(body)
+        for kind2, body2, _ in _boxes(f, box_end):
+            if kind2 != b"mvhd":
+                continue
+            f.seek(body2)
+            version = f.read(4)[0]
+            if version == 1:
+                f.seek(16, os.SEEK_CUR)
+                timescale, duration = struct.unpack(">IQ", f.read(12))
+            else:
+                f.seek(8, os.SEEK_CUR)
+                timescale, duration = struct.unpack(">II", f.read(8))
+            return duration / timescale if timescale else None
+        return None
+    return None
+
+
+def video_info(path, ext) -> MediaInfo:
+    info = MediaInfo()
+
+    seconds = None
+    if ext in MP4_EXTS:
+        try:
+            with open(path, "rb") as f:
+                seconds = mp4_duration(f)
+        except (OSError, struct.error, IndexError):
+            seconds = None
+    if seconds is None:
+        out = _run("ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", path)
+        try:
+            seconds = float(out) if out else None
+        except ValueError:
+            seconds = None
+    info.duration_sec = int(round(seconds)) if seconds else 0
+
+    # kapak karesi: ilk saniyeler genelde siyah, %10'dan al
+    at = str(min(max(info.duration_sec * 0.1, 0), 60)) if info.duration_sec else "1"
+    frame = _run("ffmpeg", "-v", "error", "-ss", at, "-i", path, "-frames:v", "1",
+                 "-f", "image2pipe", "-vcodec", "mjpeg", "-")
+    info.preview = _jpeg_from_bytes(frame)
+    return info
+
+
+# ---------------------------
+# PDF / görsel
+# ---------------------------
+
+_PAGE_RE = re.compile(rb"/Type\s*/Page(?![a-zA-Z])")
+_COUNT_RE = re.compile(rb"/Count\s+(\d+)")
+
+
+def pdf_page_count(path) -> int:
+    out = _run("pdfinfo", path)
+    if out:
+        m = re.search(rb"^Pages:\s+(\d+)", out, re.M)
+        if m:
+            return int(m.group(1))
+
+    if os.path.getsize(path) > PDF_SCAN_LIMIT:
+        return 0
+    with open(path, "rb") as f:
+        data = f.read()
+    # sıkıştırılmış nesne akışlarında sayfa nesneleri görünmez: /Pages /Count'a bak
+    return len(_PAGE_RE.findall(data)) or max((int(n) for n in _COUNT_RE.findall(data)), default=0)
+
+
+def pdf_info(path) -> MediaInfo:
+    size = max(preview_size())
+    page = _run("pdftoppm", "-f", "1", "-l", "1", "-singlefile", "-jpeg", "-scale-to", str(size), path, "-")
+    return MediaInfo(page_count=pdf_page_count(path), preview=_jpeg_from_bytes(page))
+
+
+def image_info(path) -> MediaInfo:
+    try:
+        with Image.open(path) as im:
+            return MediaInfo(page_count=1, preview=thumbnail_jpeg(im))
+    except (UnidentifiedImageError, OSError):
+        return MediaInfo()
+
+
+def analyze(field_file) -> MediaInfo:
+    ext = os.path.splitext(field_file.name)[1].lower()
+    if ext not in IMAGE_EXTS | VIDEO_EXTS | PDF_EXTS:
+        return MediaInfo()
+
+    with local_copy(field_file) as path:
+        if ext in VIDEO_EXTS:
+            return video_info(path, ext)
+        if ext in PDF_EXTS:
+            return pdf_info(path)
+        return image_info(path)
+
+
+# ---------------------------
+# Model kaydı
+# ---------------------------
+
+def preview_name(source_name) -> str:
+    return f"{source_name}.preview.jpg"
+
+
+def legacy_preview_name(source_name) -> str:
+    """Eski (uzantısız) önizleme adı; blob silinirken bu da temizlenir."""
+    return f"{os.path.splitext(source_name)[0]}.preview.jpg"
+
+
+def _preview_in_use(name, obj) -> bool:
+    """Önizleme obj dışında bir satırda da kayıtlı mı."""
+    for label in SOURCE_FIELDS:
+        qs = apps.get_model(label).objects.filter(preview=name)
+        if label == obj._meta.label:
+            qs = qs.exclude(pk=obj.pk)
+        if qs.exists():
+            return True
+    return False
+
+
+def _set_preview(obj, name):
+    old = obj.preview.name
+    obj.preview.name = name
+    if old and old != name and not _preview_in_use(old, obj):
+        obj.preview.storage.delete(old)
+
+
+def _processed_twin(model, field, obj, source):
+    """Aynı blob'u gösteren, daha önce işlenmiş satır (tekrar yüklemede analiz atlanır)."""
+    if not is_blob(source.name):
+        return None
+    return (
+        model.objects
+        .filter(**{field: source.name}, processed_at__isnull=False)
+        .exclude(pk=obj.pk)
+        .first()
+    )
+
+
+def process(model_label, pk):
+    """Dönüş: güncellenen alanlar (nesne / kaynak yoksa boş liste)."""
+    model = apps.get_model(model_label)
+    field = SOURCE_FIELDS[model_label]
+    obj = model.objects.filter(pk=pk).first()
+    source = getattr(obj, field, None) if obj else None
+    if not source:
+        return []
+
+    twin = _processed_twin(model, field, obj, source)
+    if twin is not None:
+        _set_preview(obj, twin.preview.name)
+        for attr in ("duration_sec", "page_count"):
+            if hasattr(obj, attr):
+                setattr(obj, attr, getattr(twin, attr))
+        obj.processed_at = timezone.now()
+        fields = ["preview", "processed_at"] + [a for a in ("duration_sec", "page_count") if hasattr(obj, a)]
+        obj.save(update_fields=fields)
+        return fields
+
+    info = analyze(source)
+    fields = ["processed_at"]
+
+    if info.preview:
+        # önizleme blob deposundan değil doğrudan default depodan (ad kaynaktan türetilir)
+        storage = obj.preview.storage
+        name = preview_name(source.name)
+        # yeniden işlemede aynı ad kullanılsın (ad_xyz.preview.jpg birikmesin);
+        # aynı kaynağı gösteren başka satır kullanıyorsa olduğu gibi paylaşılır
+        if storage.exists(name) and not _preview_in_use(name, obj):
+            storage.delete(name)
+        if not storage.exists(name):
+            name = storage.save(name, ContentFile(info.preview))
+        _set_preview(obj, name)
+        fields.append("preview")
+
+    if info.duration_sec and hasattr(obj, "duration_sec"):
+        obj.duration_sec = info.duration_sec
+        fields.append("duration_sec")
+
+    if info.page_count and hasattr(obj, "page_count"):
+        obj.page_count = info.page_count
+        fields.append("page_count")
+
+    obj.processed_at = timezone.now()
+    obj.save(update_fields=fields)
+    return fields
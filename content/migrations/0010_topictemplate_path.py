@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-18 12:42
+
+from django.db import migrations, models
+
+
+def fill_paths(apps, schema_editor):
+    from content.tree import rebuild_paths
+
+    TopicTemplate = apps.get_model("content", "TopicTemplate")
+    rebuild_paths(TopicTemplate)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0009_dailyplan_dailyplanitem'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='topictemplate',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='topictemplate',
+            name='path',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='topictemplate',
+            index=models.Index(fields=['grade', 'subject', 'depth'], name='content_top_grade_i_148da3_idx'),
+        ),
+        migrations.RunPython(fill_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 12:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0010_topictemplate_path'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='topictemplate',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+    ]
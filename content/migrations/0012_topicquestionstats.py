@@ -0,0 +1,29 @@
+# Generated by Django 6.0 on 2026-10-18 12:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0011_topictemplate_is_active'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TopicQuestionStats',
+            fields=[
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='content.topicquestion')),
+                ('exposures', models.PositiveIntegerField(default=0)),
+                ('answers', models.PositiveIntegerField(default=0)),
+                ('correct', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='studenttopicprogress',
+            name='ability',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 6.0 on 2026-10-18 12:49
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0012_topicquestionstats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='topicquestionstats',
+            name='chose_a',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='topicquestionstats',
+            name='chose_b',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='topicquestionstats',
+            name='chose_c',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='topicquestionstats',
+            name='chose_d',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='TopicAnswer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chosen', models.CharField(blank=True, max_length=1)),
+                ('is_correct', models.BooleanField(default=False)),
+                ('source', models.CharField(choices=[('test', 'Konu testi'), ('adaptive', 'Adaptif test')], default='test', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='responses', to='content.topicquestion')),
+                ('topic', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='answers', to='content.topictemplate')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='topic_answers', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'topic', 'created_at'], name='content_top_user_id_ea7c38_idx'), models.Index(fields=['question', 'created_at'], name='content_top_questio_72c3dd_idx')],
+            },
+        ),
+    ]
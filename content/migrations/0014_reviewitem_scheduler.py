@@ -0,0 +1,38 @@
+# Generated by Django 6.0 on 2026-10-18 12:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0013_topicanswer'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reviewitem',
+            name='difficulty',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='reviewitem',
+            name='ease',
+            field=models.FloatField(default=2.5),
+        ),
+        migrations.AddField(
+            model_name='reviewitem',
+            name='interval_days',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='reviewitem',
+            name='last_reviewed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='reviewitem',
+            name='stability',
+            field=models.FloatField(default=0),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 6.0 on 2026-10-18 12:55
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    DailyPlan = apps.get_model("content", "DailyPlan")
+    DailyPlanItem = apps.get_model("content", "DailyPlanItem")
+
+    def count(**filters):
+        sq = (
+            DailyPlanItem.objects
+            .filter(plan=OuterRef("pk"), **filters)
+            .order_by()
+            .values("plan")
+            .annotate(n=Count("id"))
+            .values("n")
+        )
+        return Coalesce(Subquery(sq, output_field=IntegerField()), 0)
+
+    DailyPlan.objects.update(total_items=count(), done_items=count(is_done=True))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0015_curriculum_cursor'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailyplan',
+            name='done_items',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dailyplan',
+            name='total_items',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
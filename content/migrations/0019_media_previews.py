@@ -0,0 +1,58 @@
+# Generated by Django 6.0 on 2026-10-18 13:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0018_upload_session'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lessonfile',
+            name='page_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='lessonfile',
+            name='preview',
+            field=models.FileField(blank=True, upload_to='lesson_files/'),
+        ),
+        migrations.AddField(
+            model_name='lessonfile',
+            name='processed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='lessonvideo',
+            name='duration_sec',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='lessonvideo',
+            name='preview',
+            field=models.FileField(blank=True, upload_to='lesson_videos/'),
+        ),
+        migrations.AddField(
+            model_name='lessonvideo',
+            name='processed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='topiccontent',
+            name='page_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='topiccontent',
+            name='preview',
+            field=models.FileField(blank=True, upload_to='topic_contents/'),
+        ),
+        migrations.AddField(
+            model_name='topiccontent',
+            name='processed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
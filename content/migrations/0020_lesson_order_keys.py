@@ -0,0 +1,40 @@
+# Generated by Django 6.0 on 2026-10-18 13:16
+
+from django.db import migrations, models
+
+
+STEP = 1 << 16
+
+
+def space_orders(apps, schema_editor):
+    """Mevcut 1, 2, 3 ... sıraları aralıklı anahtarlara (content/ordering.py)."""
+    Lesson = apps.get_model("content", "Lesson")
+
+    changed, last_course, pos = [], None, 0
+    for lesson in Lesson.objects.order_by("course_id", "order", "id").only("id", "course_id", "order").iterator():
+        pos = pos + 1 if lesson.course_id == last_course else 1
+        last_course = lesson.course_id
+        if lesson.order != pos * STEP:
+            lesson.order = pos * STEP
+            changed.append(lesson)
+        if len(changed) >= 1000:
+            Lesson.objects.bulk_update(changed, ["order"])
+            changed = []
+    if changed:
+        Lesson.objects.bulk_update(changed, ["order"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0019_media_previews'),
+        ('courses', '0003_course_grade_subject'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='lesson',
+            index=models.Index(fields=['course', 'order', 'id'], name='content_les_course__27b56c_idx'),
+        ),
+        migrations.RunPython(space_orders, migrations.RunPython.noop),
+    ]
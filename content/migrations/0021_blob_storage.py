@@ -0,0 +1,42 @@
+# Generated by Django 6.0 on 2026-10-18 13:20
+
+import content.blobs
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0020_lesson_order_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Blob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(max_length=64, unique=True)),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('size', models.BigIntegerField(default=0)),
+                ('refcount', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='lessonfile',
+            name='file',
+            field=models.FileField(storage=content.blobs.blob_storage, upload_to='lesson_files/'),
+        ),
+        migrations.AlterField(
+            model_name='lessonvideo',
+            name='video',
+            field=models.FileField(storage=content.blobs.blob_storage, upload_to='lesson_videos/'),
+        ),
+        migrations.AlterField(
+            model_name='topiccontent',
+            name='file',
+            field=models.FileField(blank=True, null=True, storage=content.blobs.blob_storage, upload_to='topic_contents/'),
+        ),
+    ]
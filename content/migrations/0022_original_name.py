@@ -0,0 +1,50 @@
+# Generated by Django 6.0 on 2026-10-18 13:33
+
+import os
+
+from django.db import migrations, models
+
+
+FIELDS = {"LessonFile": "file", "LessonVideo": "video", "TopicContent": "file"}
+
+
+def fill_original_names(apps, schema_editor):
+    """Henüz blob deposuna taşınmamış dosyaların adı (blobs/... adları özettir, atlanır)."""
+    for model_name, field in FIELDS.items():
+        Model = apps.get_model("content", model_name)
+        qs = Model.objects.exclude(**{f"{field}__startswith": "blobs/"}).exclude(**{field: ""}).exclude(**{f"{field}__isnull": True})
+        changed = []
+        for obj in qs.only("id", field).iterator():
+            obj.original_name = os.path.basename(getattr(obj, field).name)[:255]
+            changed.append(obj)
+            if len(changed) >= 1000:
+                Model.objects.bulk_update(changed, ["original_name"])
+                changed = []
+        if changed:
+            Model.objects.bulk_update(changed, ["original_name"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0021_blob_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lessonfile',
+            name='original_name',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='lessonvideo',
+            name='original_name',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='topiccontent',
+            name='original_name',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.RunPython(fill_original_names, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-18 13:47
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0022_original_name'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='dailyplan',
+            name='date',
+            field=models.DateField(default=django.utils.timezone.localdate),
+        ),
+    ]
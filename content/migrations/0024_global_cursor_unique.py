@@ -0,0 +1,29 @@
+# Generated by Django 6.0 on 2026-10-18 13:51
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def drop_duplicate_global_cursors(apps, schema_editor):
+    # imleç türetilmiş veridir: kullanıcı başına en eski tüm-banka imleci kalır
+    CurriculumCursor = apps.get_model("content", "CurriculumCursor")
+    global_cursors = CurriculumCursor.objects.filter(grade__isnull=True, subject__isnull=True)
+    keep = global_cursors.values("user").annotate(first=Min("id")).values("first")
+    global_cursors.exclude(id__in=keep).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0023_alter_dailyplan_date'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_global_cursors, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='curriculumcursor',
+            constraint=models.UniqueConstraint(condition=models.Q(('grade__isnull', True), ('subject__isnull', True)), fields=('user',), name='uniq_global_curriculum_cursor'),
+        ),
+    ]
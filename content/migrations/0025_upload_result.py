@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-18 14:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0024_global_cursor_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uploadsession',
+            name='error',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='uploadsession',
+            name='result_id',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
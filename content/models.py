@@ -1,9 +1,17 @@
+import uuid
+
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
 from django.conf import settings
 from django.utils import timezone
 
 from courses.models import Course
 
+from .blobs import BlobFileMixin, blob_storage
+from .tree import make_path, path_ids
+
 
 # ---------------------------
 # Lessons (mevcut)
@@ -13,32 +21,100 @@ class Lesson(models.Model):
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="lessons")
     title = models.CharField(max_length=200)
     body = models.TextField(blank=True)
+    # aralıklı sıra anahtarı (content/ordering.py); ekrandaki numara konumdur
     order = models.PositiveIntegerField(default=1)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ["order", "id"]
+        indexes = [models.Index(fields=["course", "order", "id"])]
 
     def __str__(self):
         return f"{self.course.title} - {self.title}"
 
 
-class LessonFile(models.Model):
+class LessonFile(BlobFileMixin, models.Model):
     lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name="files")
     title = models.CharField(max_length=200, blank=True)
-    file = models.FileField(upload_to="lesson_files/")
+    file = models.FileField(upload_to="lesson_files/", storage=blob_storage)
+    original_name = models.CharField(max_length=255, blank=True)  # depodaki ad içerik özeti
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
+    # arka planda doldurulur (content/mediaproc.py)
+    preview = models.FileField(upload_to="lesson_files/", blank=True)
+    page_count = models.PositiveIntegerField(default=0)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
 
-class LessonVideo(models.Model):
+class LessonVideo(BlobFileMixin, models.Model):
     lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name="videos")
     title = models.CharField(max_length=200, blank=True)
-    video = models.FileField(upload_to="lesson_videos/")
+    video = models.FileField(upload_to="lesson_videos/", storage=blob_storage)
+    original_name = models.CharField(max_length=255, blank=True)  # depodaki ad içerik özeti
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
+    # arka planda doldurulur (content/mediaproc.py)
+    preview = models.FileField(upload_to="lesson_videos/", blank=True)
+    duration_sec = models.PositiveIntegerField(default=0)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
     def __str__(self):
         return self.title or f"Video #{self.id}"
 
+    @property
+    def duration_label(self) -> str:
+        """12:05 / 1:02:09"""
+        m, s = divmod(self.duration_sec, 60)
+        h, m = divmod(m, 60)
+        return f"{h}:{m:02d}:{s:02d}" if h else f"{m}:{s:02d}"
+
+
+class Blob(models.Model):
+    """
+    İçerik adresli depodaki tek dosya (content/blobs.py). Aynı içeriğe sahip
+    tüm dosya alanları bu nesneyi gösterir; refcount 0 olunca purge_blobs siler.
+    """
+    digest = models.CharField(max_length=64, unique=True)  # sha256 hex
+    name = models.CharField(max_length=255, unique=True)
+    size = models.BigIntegerField(default=0)
+    refcount = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount})"
+
+
+class UploadSession(models.Model):
+    """
+    Parça parça, kaldığı yerden devam ettirilebilir yükleme (content/uploads.py).
+    Parçalar depolamaya ayrı nesneler olarak yazılır; finalize ile (Celery
+    görevinde) birleştirilip LessonFile / LessonVideo olur.
+    completed_at: birleştirme sahipliği; result_id: oluşan kayıt;
+    error: son birleştirme hatası (istemci durumu sorgular, tekrar dener).
+    """
+    class Kind(models.TextChoices):
+        FILE = "file", "Dosya"
+        VIDEO = "video", "Video"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="upload_sessions")
+    lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name="upload_sessions")
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    title = models.CharField(max_length=200, blank=True)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    parts = models.JSONField(default=list, blank=True)  # [[offset, length, depolama adı], ...]
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    result_id = models.PositiveIntegerField(null=True, blank=True)  # LessonFile / LessonVideo id
+    error = models.CharField(max_length=255, blank=True)
+
+    def __str__(self):
+        return f"{self.filename} {self.offset}/{self.size}"
+
 
 class LessonProgress(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="lesson_progress")
@@ -53,6 +129,34 @@ class LessonProgress(models.Model):
         return f"{self.user} - {self.lesson} ({'✓' if self.completed else '…'})"
 
 
+class CourseProgressSummary(models.Model):
+    """
+    (öğrenci, kurs) başına ilerleme özeti; sayfa başına yeniden sayılmaz.
+    lesson_complete ve ders ekle/sil/sırala ile güncellenir (content/course_progress.py).
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="course_progress")
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="progress_summaries")
+    done_count = models.PositiveIntegerField(default=0)
+    total_lessons = models.PositiveIntegerField(default=0)
+    percent = models.PositiveSmallIntegerField(default=0)
+    # ilk tamamlanmamış ders (hepsi bittiyse ilk ders)
+    next_lesson = models.ForeignKey(Lesson, null=True, blank=True, on_delete=models.SET_NULL, related_name="+")
+    last_activity = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "course"], name="uniq_course_progress_summary"),
+        ]
+
+    @property
+    def remaining(self):
+        return max(0, self.total_lessons - self.done_count)
+
+    def __str__(self):
+        return f"{self.user_id} / {self.course_id}: {self.done_count}/{self.total_lessons}"
+
+
 # ---------------------------
 # Topic Tree
 # ---------------------------
@@ -85,21 +189,80 @@ class TopicTemplate(models.Model):
 
     title = models.CharField(max_length=200)
     order = models.IntegerField(default=0)
+    is_active = models.BooleanField(default=True)  # müfredattan çıkan konu silinmez, emekliye ayrılır
+
+    # Materialized path (content/tree.py): "12/45/301/" + kök=0 derinlik
+    path = models.CharField(max_length=255, blank=True, default="", db_index=True, editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ["order", "id"]
+        indexes = [
+            models.Index(fields=["grade", "subject", "depth"]),
+        ]
 
     def __str__(self):
-        if self.parent:
+        if self.parent_id:
             return f"{self.grade} {self.subject} - {self.parent.title} > {self.title}"
         return f"{self.grade} {self.subject} - {self.title}"
 
+    def clean(self):
+        super().clean()
+        self._check_parent()
+
+    def _check_parent(self):
+        # kendi alt konusunun altına taşınırsa alt ağacın path'i döngüye girer
+        if self.pk and self.parent_id and (self.parent_id == self.pk or self.pk in path_ids(self.parent.path)):
+            raise ValidationError({"parent": "Konu kendisinin ya da alt konusunun altına taşınamaz."})
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "parent" not in update_fields:
+            return super().save(*args, **kwargs)
+
+        self._check_parent()
+        old_path = self.path
+        super().save(*args, **kwargs)
+
+        parent_path = self.parent.path if self.parent_id else ""
+        new_path = make_path(parent_path, self.pk)
+        new_depth = self.parent.depth + 1 if self.parent_id else 0
+
+        if new_path == old_path and new_depth == self.depth:
+            return
+
+        TopicTemplate.objects.filter(pk=self.pk).update(path=new_path, depth=new_depth)
+
+        # Taşındıysa alt ağacı tek UPDATE ile yeni prefix'e al
+        if old_path:
+            TopicTemplate.objects.filter(path__startswith=old_path).exclude(pk=self.pk).update(
+                path=Concat(Value(new_path), Substr("path", len(old_path) + 1)),
+                depth=F("depth") + (new_depth - self.depth),
+            )
+
+        self.path = new_path
+        self.depth = new_depth
+
+    # ---- ağaç sorguları (her biri tek indeksli sorgu) ----
+
+    def ancestor_ids(self):
+        return path_ids(self.path)[:-1]
+
+    def get_ancestors(self):
+        return TopicTemplate.objects.filter(id__in=self.ancestor_ids()).order_by("depth")
+
+    def get_descendants(self, include_self=False):
+        qs = TopicTemplate.objects.filter(path__startswith=self.path)
+        if not include_self:
+            qs = qs.exclude(pk=self.pk)
+        return qs
+
 
 # ---------------------------
 # Sprint-1: Topic Content + Questions + Progress
 # ---------------------------
 
-class TopicContent(models.Model):
+class TopicContent(BlobFileMixin, models.Model):
     class ContentType(models.TextChoices):
         VIDEO = "video", "Video"
         PDF = "pdf", "PDF"
@@ -108,9 +271,15 @@ class TopicContent(models.Model):
     topic = models.ForeignKey(TopicTemplate, on_delete=models.CASCADE, related_name="contents")
     content_type = models.CharField(max_length=10, choices=ContentType.choices)
     title = models.CharField(max_length=200)
-    file = models.FileField(upload_to="topic_contents/", null=True, blank=True)
+    file = models.FileField(upload_to="topic_contents/", null=True, blank=True, storage=blob_storage)
+    original_name = models.CharField(max_length=255, blank=True)  # depodaki ad içerik özeti
     url = models.URLField(blank=True)  # youtube vb
     duration_sec = models.PositiveIntegerField(default=0)
+
+    # dosya yüklenince arka planda doldurulur (content/mediaproc.py)
+    preview = models.FileField(upload_to="topic_contents/", blank=True)
+    page_count = models.PositiveIntegerField(default=0)
+    processed_at = models.DateTimeField(null=True, blank=True)
     order = models.IntegerField(default=0)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -146,6 +315,59 @@ class TopicQuestion(models.Model):
         return f"{self.topic.title} - Soru {self.order}"
 
 
+class TopicQuestionStats(models.Model):
+    """
+    Soru bazında özet istatistik (adaptif test seçimi + hata analizi).
+    Sayaçlar F() ile artırılır; satır ilk ihtiyaçta oluşturulur.
+    """
+    question = models.OneToOneField(TopicQuestion, on_delete=models.CASCADE, primary_key=True, related_name="stats")
+    exposures = models.PositiveIntegerField(default=0)  # kaç kez gösterildi
+    answers = models.PositiveIntegerField(default=0)    # kaç kez cevaplandı
+    correct = models.PositiveIntegerField(default=0)    # kaçı doğru
+
+    # şık dağılımı (çeldirici analizi); boş bırakılanlar hiçbirine yazılmaz
+    chose_a = models.PositiveIntegerField(default=0)
+    chose_b = models.PositiveIntegerField(default=0)
+    chose_c = models.PositiveIntegerField(default=0)
+    chose_d = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Soru {self.question_id}: {self.correct}/{self.answers} (gösterim {self.exposures})"
+
+
+class TopicAnswer(models.Model):
+    """
+    Konu testlerinde verilen her cevap (sadece eklenir, güncellenmez).
+    Gönderim başına tek bulk_create ile yazılır.
+    """
+    SOURCE_TEST = "test"
+    SOURCE_ADAPTIVE = "adaptive"
+    SOURCE_CHOICES = [
+        (SOURCE_TEST, "Konu testi"),
+        (SOURCE_ADAPTIVE, "Adaptif test"),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="topic_answers")
+    topic = models.ForeignKey(TopicTemplate, on_delete=models.CASCADE, related_name="answers")
+    question = models.ForeignKey(TopicQuestion, on_delete=models.CASCADE, related_name="responses")
+
+    chosen = models.CharField(max_length=1, blank=True)  # A/B/C/D, boşsa ""
+    is_correct = models.BooleanField(default=False)
+    source = models.CharField(max_length=10, choices=SOURCE_CHOICES, default=SOURCE_TEST)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "topic", "created_at"]),
+            models.Index(fields=["question", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - Soru {self.question_id}: {self.chosen or '-'} ({'✓' if self.is_correct else '✗'})"
+
+
 class StudentTopicProgress(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="topic_progress")
     topic = models.ForeignKey(TopicTemplate, on_delete=models.CASCADE, related_name="progress")
@@ -155,6 +377,7 @@ class StudentTopicProgress(models.Model):
 
     test_score = models.FloatField(default=0)  # 0-100
     completed = models.BooleanField(default=False)
+    ability = models.FloatField(null=True, blank=True)  # adaptif test yetenek tahmini (logit)
 
     last_activity = models.DateTimeField(auto_now=True)
 
@@ -165,6 +388,38 @@ class StudentTopicProgress(models.Model):
         return f"{self.user.username} - {self.topic.title} ({'✓' if self.completed else '…'})"
 
 
+class CurriculumCursor(models.Model):
+    """
+    Öğrencinin bir (sınıf, ders) müfredatındaki sıradaki konusu.
+    grade/subject boşsa kapsam tüm konu bankasıdır (kursu müfredata bağlı olmayanlar).
+    topic boşsa o kapsamda tamamlanmamış konu kalmamıştır.
+    Konu tamamlanınca content/cursors.py ilerletir.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="curriculum_cursors")
+    grade = models.ForeignKey(Grade, null=True, blank=True, on_delete=models.CASCADE)
+    subject = models.ForeignKey(Subject, null=True, blank=True, on_delete=models.CASCADE)
+    topic = models.ForeignKey(TopicTemplate, null=True, blank=True, on_delete=models.SET_NULL, related_name="+")
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("user", "grade", "subject")
+        constraints = [
+            # unique_together NULL'ları ayrı sayar: tüm-banka imleci ayrıca tekilleştirilir
+            models.UniqueConstraint(
+                fields=["user"],
+                condition=models.Q(grade__isnull=True, subject__isnull=True),
+                name="uniq_global_curriculum_cursor",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["user", "topic"]),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.grade_id}/{self.subject_id} -> {self.topic_id}"
+
+
 # ---------------------------
 # Sprint-2: Review System
 # ---------------------------
@@ -173,10 +428,17 @@ class ReviewItem(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="review_items")
     topic = models.ForeignKey(TopicTemplate, on_delete=models.CASCADE, related_name="review_items")
 
-    stage = models.PositiveIntegerField(default=0)  # 0->1g,1->3g,2->7g,3->14g
+    stage = models.PositiveIntegerField(default=0)  # art arda başarılı tekrar sayısı
     next_review_at = models.DateTimeField(default=timezone.now)
     is_active = models.BooleanField(default=True)
 
+    # zamanlayıcı parametreleri (content/scheduling.py)
+    ease = models.FloatField(default=2.5)        # SM-2 kolaylık katsayısı
+    stability = models.FloatField(default=0)     # FSRS kalıcılık (gün), 0 = henüz yok
+    difficulty = models.FloatField(default=0)    # FSRS zorluk (1-10), 0 = henüz yok
+    interval_days = models.FloatField(default=0)
+    last_reviewed_at = models.DateTimeField(null=True, blank=True)
+
     wrong_count_total = models.PositiveIntegerField(default=0)
     last_wrong_at = models.DateTimeField(null=True, blank=True)
 
@@ -216,6 +478,10 @@ class DailyPlan(models.Model):
     is_completed = models.BooleanField(default=False)
     completion_rate = models.PositiveIntegerField(default=0)  # 0-100
 
+    # madde sayaçları (F() ile güncellenir, bkz. content/services.py)
+    total_items = models.PositiveIntegerField(default=0)
+    done_items = models.PositiveIntegerField(default=0)
+
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
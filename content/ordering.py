@@ -0,0 +1,213 @@
+# content/ordering.py
+"""
+Ders sıralaması: kesirli (aralıklı) sıra anahtarları.
+
+Lesson.order artık 1, 2, 3 değil aralıklı bir anahtardır (STEP = 65536):
+    ders A=65536, B=131072, C=196608
+C'yi A ile B arasına taşımak = tek satır: C.order = (65536 + 131072) // 2
+
+- taşıma (sürükle-bırak): sadece taşınan ders yazılır
+- toplu sıralama formu: yeri değişmeyen en uzun dizi (LIS) korunur, sadece
+  taşınan dersler yazılır (tek bulk_update)
+- aynı noktaya art arda ekleme aralığı daraltır; MIN_GAP altına inince kurs
+  arka planda yeniden numaralandırılır (rebalance, tek bulk_update). Aralık
+  tamamen bittiyse (nadir) rebalance taşıma ile aynı işlemde yapılır.
+
+Sıra numarası (1., 2., ...) ekranda konumdan (forloop.counter) gösterilir.
+"""
+from bisect import bisect_left
+
+from django.db import transaction
+from django.db.models import Max, Q
+
+from courses.models import Course
+
+from .models import Lesson
+
+
+STEP = 1 << 16
+MAX_KEY = 2 ** 31 - 1  # PositiveIntegerField
+MIN_GAP = 8
+
+
+def append_key(course_id) -> int:
+    """Kursun sonuna eklenecek dersin anahtarı."""
+    last = Lesson.objects.filter(course_id=course_id).aggregate(m=Max("order"))["m"] or 0
+    key = last + STEP
+    if key > MAX_KEY:
+        rebalance(course_id)
+        last = Lesson.objects.filter(course_id=course_id).aggregate(m=Max("order"))["m"] or 0
+        key = last + STEP
+    return key
+
+
+def key_between(lo, hi):
+    """lo < anahtar < hi; yer yoksa None. lo/hi None: baş / son."""
+    lo = lo or 0
+    if hi is None:
+        key = lo + STEP
+        return key if key <= MAX_KEY else None
+    if hi - lo < 2:
+        return None
+    return (lo + hi) // 2
+
+
+def _renumber(ids):
+    """ids sırasıyla STEP aralıklı anahtarlar; sadece değişenler yazılır."""
+    current = dict(Lesson.objects.filter(id__in=ids).values_list("id", "order"))
+    changed = [
+        Lesson(id=lid, order=(i + 1) * STEP)
+        for i, lid in enumerate(ids)
+        if current.get(lid) != (i + 1) * STEP
+    ]
+    if changed:
+        Lesson.objects.bulk_update(changed, ["order"], batch_size=500)
+    return len(changed)
+
+
+def rebalance(course_id) -> int:
+    """Kursun tüm derslerini eşit aralıklarla yeniden numaralandırır."""
+    ids = list(Lesson.objects.filter(course_id=course_id).order_by("order", "id").values_list("id", flat=True))
+    return _renumber(ids)
+
+
+def _refresh_later(course_id, tight):
+    from .course_progress import refresh_course
+    from .tasks import rebalance_lessons_task
+
+    transaction.on_commit(lambda: refresh_course(course_id))
+    if tight:
+        transaction.on_commit(lambda: rebalance_lessons_task.delay(course_id))
+
+
+# ---------------------------
+# Taşıma (sürükle-bırak)
+# ---------------------------
+
+def move(lesson, after_id=None) -> bool:
+    """
+    Dersi `after_id` dersinin hemen arkasına (None ise en başa) taşır.
+    Normalde tek UPDATE. Dönüş: sıra değişti mi. Başka kursun dersi -> ValueError.
+    """
+    course_id = lesson.course_id
+    if after_id == lesson.id:
+        return False
+
+    with transaction.atomic():
+        # aynı kursta eşzamanlı taşımalar sıraya girsin (aynı anahtar çıkmasın)
+        Course.objects.select_for_update().filter(id=course_id).values_list("id", flat=True).first()
+
+        siblings = Lesson.objects.filter(course_id=course_id).exclude(id=lesson.id).order_by("order", "id")
+        current = Lesson.objects.filter(id=lesson.id).values_list("order", flat=True).first()
+
+        if after_id is None:
+            prev = None
+            nxt = siblings.values_list("order", "id").first()
+        else:
+            prev = siblings.filter(id=after_id).values_list("order", "id").first()
+            if prev is None:
+                raise ValueError("Önceki ders bu kursta değil")
+            nxt = (
+                siblings
+                .filter(Q(order__gt=prev[0]) | Q(order=prev[0], id__gt=prev[1]))
+                .values_list("order", "id")
+                .first()
+            )
+
+        lo = prev[0] if prev else 0
+        hi = nxt[0] if nxt else None
+
+        # zaten orada
+        if lo < current and (hi is None or current < hi):
+            return False
+
+        key = key_between(lo, hi)
+        if key is None:
+            # aralık bitti: yeni sırayla tümü yeniden numaralandırılır
+            ids = list(siblings.values_list("id", flat=True))
+            at = ids.index(after_id) + 1 if after_id is not None else 0
+            ids.insert(at, lesson.id)
+            _renumber(ids)
+            tight = False
+        else:
+            Lesson.objects.filter(id=lesson.id).update(order=key)
+            lesson.order = key
+            tight = key - lo < MIN_GAP or (hi is not None and hi - key < MIN_GAP)
+
+        _refresh_later(course_id, tight)
+
+    return True
+
+
+# ---------------------------
+# Toplu sıralama (form)
+# ---------------------------
+
+def _stable(seq):
+    """En uzun artan alt dizi (O(n log n)); dönüş: seq içindeki indeksler."""
+    tails, tail_idx, parent = [], [], [None] * len(seq)
+    for i, v in enumerate(seq):
+        pos = bisect_left(tails, v)
+        if pos == len(tails):
+            tails.append(v)
+            tail_idx.append(i)
+        else:
+            tails[pos] = v
+            tail_idx[pos] = i
+        parent[i] = tail_idx[pos - 1] if pos else None
+
+    out, i = [], tail_idx[-1] if tail_idx else None
+    while i is not None:
+        out.append(i)
+        i = parent[i]
+    return set(out)
+
+
+def reorder(course_id, ordered_ids) -> int:
+    """
+    ordered_ids: kursun dersleri istenen sırada (listede olmayanlar sona).
+    Sıraları zaten tutarlı olan dersler yazılmaz. Dönüş: güncellenen ders sayısı.
+    """
+    with transaction.atomic():
+        Course.objects.select_for_update().filter(id=course_id).values_list("id", flat=True).first()
+
+        current = list(Lesson.objects.filter(course_id=course_id).order_by("order", "id").values_list("id", "order"))
+        keys = dict(current)
+        index = {lid: i for i, (lid, _) in enumerate(current)}
+
+        seen = set()
+        wanted = [lid for lid in ordered_ids if lid in keys and not (lid in seen or seen.add(lid))]
+        wanted += [lid for lid, _ in current if lid not in seen]
+
+        keep = {wanted[i] for i in _stable([index[lid] for lid in wanted])}
+
+        changed, run, lo = {}, [], 0
+        for lid in wanted + [None]:
+            if lid is not None and lid not in keep:
+                run.append(lid)
+                continue
+
+            if run:
+                hi = keys[lid] if lid is not None else lo + STEP * (len(run) + 1)
+                gap = (hi - lo) // (len(run) + 1)
+                if gap < 1 or hi > MAX_KEY:
+                    changed = None
+                    break
+                for n, moved in enumerate(run, start=1):
+                    changed[moved] = lo + gap * n
+                run = []
+            if lid is not None:
+                lo = keys[lid]
+
+        if changed is None:
+            # aralık yetmedi: istenen sırayla baştan numaralandır
+            updated = _renumber(wanted)
+        else:
+            updated = len(changed)
+            if changed:
+                Lesson.objects.bulk_update([Lesson(id=lid, order=k) for lid, k in changed.items()], ["order"])
+
+        if updated:
+            _refresh_later(course_id, tight=False)
+
+    return updated
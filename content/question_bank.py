@@ -0,0 +1,271 @@
+# content/question_bank.py
+"""
+TopicQuestion soru bankası için akışlı (streaming) içe/dışa aktarım.
+
+Kolonlar (CSV/XLSX başlık satırı):
+    grade, subject, topic_path, text, a, b, c, d, correct, difficulty, order
+
+topic_path: kökten konuya başlık zinciri, " > " ile ayrılır
+            (örn. "Üslü ifadeler > Kurallar")
+"""
+import csv
+import io
+from itertools import islice
+
+from .adaptive import invalidate_index
+from .caching import invalidate_topic_payload
+from .models import TopicTemplate, TopicQuestion
+from .tree import title_chains
+
+
+COLUMNS = ["grade", "subject", "topic_path", "text", "a", "b", "c", "d", "correct", "difficulty", "order"]
+PATH_SEP = " > "
+MAX_ERRORS = 200
+
+
+class QuestionImportError(Exception):
+    pass
+
+
+# ---------------------------
+# Konu çözümleme (tek sorgu)
+# ---------------------------
+
+def topic_index():
+    """
+    Dönüş: ({(grade, subject, "A > B"): topic_id}, {topic_id: (grade, subject, "A > B")})
+    """
+    rows = list(
+        TopicTemplate.objects
+        .filter(is_active=True)
+        .values_list("id", "parent_id", "title", "grade__number", "subject__name")
+    )
+    chains = title_chains((r[0], r[1], r[2]) for r in rows)
+
+    by_key, by_id = {}, {}
+    for pk, _, _, grade_num, subject_name in rows:
+        path = PATH_SEP.join(chains[pk])
+        key = (grade_num, subject_name, path)
+        by_key.setdefault(key, pk)
+        by_id[pk] = key
+    return by_key, by_id
+
+
+# ---------------------------
+# Okuma (CSV / XLSX)
+# ---------------------------
+
+def _header_map(header):
+    names = [str(h or "").strip().lower() for h in header]
+    missing = [c for c in COLUMNS if c not in names and c not in ("difficulty", "order")]
+    if missing:
+        raise QuestionImportError(f"Eksik kolon(lar): {', '.join(missing)}")
+    return names
+
+
+def iter_rows(fileobj, filename: str):
+    """
+    (satır_no, {kolon: değer}) üretir; dosyanın tamamı belleğe alınmaz.
+    XLSX: openpyxl read-only modu.
+    """
+    name = (filename or "").lower()
+
+    if name.endswith(".xlsx"):
+        from openpyxl import load_workbook
+
+        wb = load_workbook(fileobj, read_only=True, data_only=True)
+        try:
+            ws = wb.worksheets[0]
+            rows = ws.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            names = _header_map(header)
+            for line_no, values in enumerate(rows, start=2):
+                if not values or all(v in (None, "") for v in values):
+                    continue
+                yield line_no, dict(zip(names, values))
+        finally:
+            wb.close()
+        return
+
+    if name.endswith(".csv"):
+        text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+        reader = csv.reader(text)
+        header = next(reader, None)
+        if header is None:
+            return
+        names = _header_map(header)
+        for line_no, values in enumerate(reader, start=2):
+            if not values or all(not v.strip() for v in values):
+                continue
+            yield line_no, dict(zip(names, values))
+        return
+
+    raise QuestionImportError("Sadece .csv veya .xlsx dosyaları desteklenir.")
+
+
+# ---------------------------
+# İçe aktarma
+# ---------------------------
+
+def _s(v):
+    return "" if v is None else str(v).strip()
+
+
+def _int(v, default):
+    v = _s(v)
+    if not v:
+        return default
+    try:
+        return int(float(v))
+    except ValueError:
+        raise QuestionImportError(f"sayı bekleniyordu: {v!r}")
+
+
+def _build(row, lookup):
+    try:
+        grade = _int(row.get("grade"), None)
+    except QuestionImportError:
+        raise QuestionImportError("grade geçersiz")
+
+    key = (grade, _s(row.get("subject")), _s(row.get("topic_path")))
+    topic_id = lookup.get(key)
+    if topic_id is None:
+        raise QuestionImportError(f"konu bulunamadı: {key[0]} / {key[1]} / {key[2]}")
+
+    text = _s(row.get("text"))
+    if not text:
+        raise QuestionImportError("soru metni boş")
+
+    choices = [_s(row.get(k)) for k in ("a", "b", "c", "d")]
+    if not all(choices):
+        raise QuestionImportError("A/B/C/D şıklarının hepsi dolu olmalı")
+    if any(len(c) > 255 for c in choices):
+        raise QuestionImportError("şık metni 255 karakteri geçemez")
+
+    correct = _s(row.get("correct")).upper()
+    if correct not in ("A", "B", "C", "D"):
+        raise QuestionImportError("correct A/B/C/D olmalı")
+
+    difficulty = _int(row.get("difficulty"), 1)
+    order = _int(row.get("order"), 1)
+    if difficulty < 1 or order < 1:
+        raise QuestionImportError("difficulty/order 1 veya daha büyük olmalı")
+
+    return TopicQuestion(
+        topic_id=topic_id,
+        text=text,
+        choice_a=choices[0],
+        choice_b=choices[1],
+        choice_c=choices[2],
+        choice_d=choices[3],
+        correct=correct,
+        difficulty=difficulty,
+        order=order,
+    )
+
+
+def import_questions(rows, batch_size: int = 500, dry_run: bool = False):
+    """
+    rows: iter_rows() çıktısı.
+    Satırlar batch_size'lık parçalar halinde doğrulanır; her parça tek
+    bulk_create ile yazılır. Aynı konuda aynı metinli soru tekrar eklenmez.
+    """
+    lookup, _ = topic_index()
+    result = {"created": 0, "duplicates": 0, "error_count": 0, "errors": []}
+    touched = set()
+
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, batch_size))
+        if not chunk:
+            break
+
+        objs = []
+        for line_no, row in chunk:
+            try:
+                objs.append(_build(row, lookup))
+            except QuestionImportError as e:
+                result["error_count"] += 1
+                if len(result["errors"]) < MAX_ERRORS:
+                    result["errors"].append((line_no, str(e)))
+
+        if not objs:
+            continue
+
+        existing = set(
+            TopicQuestion.objects
+            .filter(topic_id__in={o.topic_id for o in objs}, text__in={o.text for o in objs})
+            .values_list("topic_id", "text")
+        )
+        fresh = []
+        for o in objs:
+            key = (o.topic_id, o.text)
+            if key in existing:
+                result["duplicates"] += 1
+                continue
+            existing.add(key)
+            fresh.append(o)
+
+        if fresh and not dry_run:
+            TopicQuestion.objects.bulk_create(fresh, batch_size=batch_size)
+            touched.update(o.topic_id for o in fresh)
+        result["created"] += len(fresh)
+
+    # bulk_create sinyal tetiklemez: konu detay cache'ini elle temizle
+    if touched:
+        invalidate_topic_payload(*touched)
+        invalidate_index(*touched)
+
+    return result
+
+
+# ---------------------------
+# Dışa aktarma
+# ---------------------------
+
+def export_queryset(grade=None, subject=None):
+    qs = TopicQuestion.objects.filter(topic__is_active=True)
+    if grade:
+        qs = qs.filter(topic__grade__number=grade)
+    if subject:
+        qs = qs.filter(topic__subject__name=subject)
+    return qs.order_by("topic_id", "order", "id").values_list(
+        "topic_id", "text", "choice_a", "choice_b", "choice_c", "choice_d",
+        "correct", "difficulty", "order",
+    )
+
+
+def iter_export_rows(qs, chunk_size: int = 2000):
+    """Başlık + satırlar; sorgu .iterator() ile parça parça okunur."""
+    _, by_id = topic_index()
+    yield COLUMNS
+    for topic_id, text, a, b, c, d, correct, difficulty, order in qs.iterator(chunk_size=chunk_size):
+        grade_num, subject_name, path = by_id.get(topic_id, ("", "", ""))
+        yield [grade_num, subject_name, path, text, a, b, c, d, correct, difficulty, order]
+
+
+class _Echo:
+    """csv.writer için sahte buffer: yazılan satırı aynen döndürür."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows):
+    writer = csv.writer(_Echo())
+    yield "\ufeff"
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def write_xlsx(rows, fileobj):
+    """openpyxl write-only modu: satırlar belleğe toplanmadan yazılır."""
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Sorular")
+    for row in rows:
+        ws.append(row)
+    wb.save(fileobj)
@@ -0,0 +1,129 @@
+# content/ready_lessons.py
+"""
+Hazır dersler: (sınıf, ders) konu ağacından kursa ders kopyalama.
+
+Kök konular ders olur, 1. seviye alt konular "— <başlık>" dersi olarak
+ebeveyninin arkasına gelir. Kursta aynı başlıkta ders varsa atlanır.
+
+Akış (curriculum.py ile aynı):
+    1) compute_plan: konular tek sorgu, kurstaki mevcut başlıklar tek sorgu;
+       eklenecek / atlanacak dersler bellekte çıkarılır (önizleme bununla)
+    2) apply_plan: kurs kilitlenir, mevcut başlıklar tekrar okunur; hâlâ eksik
+       dersler kursun sonuna tek bulk_create ile eklenir
+
+bulk_create sinyal tetiklemez: ilerleme özetleri commit sonrası bir kez yenilenir.
+"""
+from dataclasses import dataclass, field
+
+from django.db import transaction
+
+from courses.models import Course
+
+from .course_progress import refresh_course
+from .models import Lesson, TopicTemplate
+from .ordering import STEP, append_key
+
+
+CHILD_PREFIX = "— "
+
+
+@dataclass
+class ReadyLessonsPlan:
+    course: Course
+    grade: object
+    subject: object
+    insert: list = field(default_factory=list)   # [(title, TopicTemplate)] konu sırasıyla
+    skip: list = field(default_factory=list)     # [title] kursta zaten var
+
+    @property
+    def has_changes(self):
+        return bool(self.insert)
+
+    def summary(self):
+        return {"insert": len(self.insert), "skip": len(self.skip)}
+
+
+def topic_lessons(grade, subject):
+    """Dönüş: [(ders başlığı, TopicTemplate)] ağaç sırasıyla (tek sorgu, depth indeksi)."""
+    topics = list(
+        TopicTemplate.objects
+        .filter(grade=grade, subject=subject, depth__lte=1, is_active=True)
+        .only("id", "parent_id", "title", "order")
+        .order_by("order", "id")
+    )
+    children_by_parent = {}
+    for t in topics:
+        if t.parent_id:
+            children_by_parent.setdefault(t.parent_id, []).append(t)
+
+    out = []
+    for p in topics:
+        if p.parent_id is not None:
+            continue
+        out.append((p.title, p))
+        out.extend((f"{CHILD_PREFIX}{c.title}", c) for c in children_by_parent.get(p.id, []))
+    return out
+
+
+def compute_plan(course, grade, subject) -> ReadyLessonsPlan:
+    plan = ReadyLessonsPlan(course=course, grade=grade, subject=subject)
+    wanted = topic_lessons(grade, subject)
+
+    existing = set(
+        Lesson.objects
+        .filter(course=course, title__in={title for title, _ in wanted})
+        .values_list("title", flat=True)
+    )
+
+    for title, topic in wanted:
+        if title in existing:
+            plan.skip.append(title)
+            continue
+        # aynı başlık ağaçta iki kez geçerse tek ders
+        existing.add(title)
+        plan.insert.append((title, topic))
+    return plan
+
+
+def apply_plan(plan: ReadyLessonsPlan, batch_size: int = 500) -> int:
+    """Dönüş: eklenen ders sayısı."""
+    course = plan.course
+
+    with transaction.atomic():
+        # aynı kursa eşzamanlı iki ekleme anahtar / başlık çakıştırmasın
+        Course.objects.select_for_update().filter(id=course.id).values_list("id", flat=True).first()
+
+        # plan kilitten önce hesaplandı: bu arada eklenen başlıklar kilit altında tekrar okunur
+        existing = set(
+            Lesson.objects
+            .filter(course=course, title__in={title for title, _ in plan.insert})
+            .values_list("title", flat=True)
+        )
+        titles = [title for title, _ in plan.insert if title not in existing]
+
+        key = append_key(course.id)
+        lessons = [
+            Lesson(course=course, title=title, order=key + i * STEP)
+            for i, title in enumerate(titles)
+        ]
+        Lesson.objects.bulk_create(lessons, batch_size=batch_size)
+
+        # kursun müfredat kapsamı (günlük plan "yeni konu" seçimi)
+        fields = []
+        if course.grade_id != plan.grade.id:
+            course.grade = plan.grade
+            fields.append("grade")
+        if course.subject_id is None:
+            course.subject = plan.subject
+            fields.append("subject")
+        if fields:
+            course.save(update_fields=fields)
+
+        if lessons:
+            transaction.on_commit(lambda: refresh_course(course.id))
+
+    return len(lessons)
+
+
+def add_ready_lessons(course, grade, subject) -> int:
+    return apply_plan(compute_plan(course, grade, subject))
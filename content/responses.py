@@ -0,0 +1,65 @@
+# content/responses.py
+"""
+Cevap kaydı (TopicAnswer) + soru bazında özet (TopicQuestionStats).
+
+Bir gönderim için:
+  1) TopicAnswer satırları tek bulk_create ile yazılır
+  2) eksik özet satırları tek bulk_create(ignore_conflicts) ile açılır
+  3) tüm sayaçlar tek UPDATE ile (F() + Case/When) artırılır
+"""
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+from .models import TopicAnswer, TopicQuestionStats
+
+
+CHOICES = ("A", "B", "C", "D")
+
+
+def _plus_if(ids, field):
+    """ids içindeki sorular için field + 1, diğerleri için field + 0."""
+    if not ids:
+        return F(field)
+    return F(field) + Case(
+        When(question_id__in=ids, then=Value(1)),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def record_responses(user, topic_id: int, rows, source: str = TopicAnswer.SOURCE_TEST):
+    """
+    rows: [(question_id, chosen, is_correct)]
+    Aynı soru bir gönderimde birden fazla gelirse sonuncusu sayılır.
+    """
+    latest = {}
+    for qid, chosen, ok in rows:
+        latest[qid] = (chosen if chosen in CHOICES else "", bool(ok))
+    if not latest:
+        return 0
+
+    answers = [
+        TopicAnswer(user=user, topic_id=topic_id, question_id=qid, chosen=chosen, is_correct=ok, source=source)
+        for qid, (chosen, ok) in latest.items()
+    ]
+    ids = list(latest)
+
+    changes = {
+        "answers": F("answers") + 1,
+        "correct": _plus_if([qid for qid, (_, ok) in latest.items() if ok], "correct"),
+        "updated_at": timezone.now(),
+    }
+    for letter in CHOICES:
+        field = f"chose_{letter.lower()}"
+        changes[field] = _plus_if([qid for qid, (chosen, _) in latest.items() if chosen == letter], field)
+
+    with transaction.atomic():
+        TopicAnswer.objects.bulk_create(answers)
+        TopicQuestionStats.objects.bulk_create(
+            [TopicQuestionStats(question_id=qid) for qid in ids],
+            ignore_conflicts=True,
+        )
+        TopicQuestionStats.objects.filter(question_id__in=ids).update(**changes)
+
+    return len(answers)
@@ -0,0 +1,200 @@
+# content/scheduling.py
+"""
+Tekrar (ReviewItem) zamanlayıcıları.
+
+settings.REVIEW_SCHEDULER ile seçilir:
+    "fixed" : eski sabit aralıklar (1, 3, 7, 14 gün; skor dikkate alınmaz)
+    "sm2"   : SuperMemo-2 (kolaylık katsayısı = ease)
+    "fsrs"  : FSRS-4.5 (kalıcılık = stability, zorluk = difficulty)
+
+Skor (0-100) önce 1-4 arası bir nota çevrilir:
+    1 = unuttu (<50), 2 = zor (<70), 3 = iyi (<90), 4 = kolay
+Aralık REVIEW_MAX_INTERVAL_DAYS'i geçerse konu tekrardan çıkar (is_active=False).
+"""
+import math
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+
+AGAIN, HARD, GOOD, EASY = 1, 2, 3, 4
+
+# skor gönderilmezse "iyi" sayılır (eski istemciler skor göndermiyor)
+DEFAULT_SCORE = 80
+
+
+def grade_from_score(score) -> int:
+    score = float(score or 0)
+    if score < 50:
+        return AGAIN
+    if score < 70:
+        return HARD
+    if score < 90:
+        return GOOD
+    return EASY
+
+
+def max_interval_days() -> float:
+    return getattr(settings, "REVIEW_MAX_INTERVAL_DAYS", 60)
+
+
+@dataclass(frozen=True)
+class ReviewState:
+    stage: int = 0
+    ease: float = 2.5
+    stability: float = 0.0
+    difficulty: float = 0.0
+    interval_days: float = 0.0
+    last_reviewed_at: datetime = None
+    retired: bool = False
+
+    @classmethod
+    def of(cls, item):
+        return cls(
+            stage=item.stage,
+            ease=item.ease,
+            stability=item.stability,
+            difficulty=item.difficulty,
+            interval_days=item.interval_days,
+            last_reviewed_at=item.last_reviewed_at,
+        )
+
+    @property
+    def due_at(self):
+        if self.retired or self.last_reviewed_at is None:
+            return None
+        return self.last_reviewed_at + timedelta(days=self.interval_days)
+
+    def apply_to(self, item):
+        item.stage = self.stage
+        item.ease = self.ease
+        item.stability = self.stability
+        item.difficulty = self.difficulty
+        item.interval_days = self.interval_days
+        item.last_reviewed_at = self.last_reviewed_at
+        if self.retired:
+            item.is_active = False
+        else:
+            item.next_review_at = self.due_at
+        return item
+
+
+class Scheduler:
+    name = ""
+
+    def step(self, state: ReviewState, grade: int, now) -> ReviewState:
+        raise NotImplementedError
+
+    def review(self, state: ReviewState, score, now=None) -> ReviewState:
+        now = now or timezone.now()
+        new = self.step(state, grade_from_score(score), now)
+        return replace(new, last_reviewed_at=now, retired=new.retired or new.interval_days > max_interval_days())
+
+    def replay(self, attempts, state: ReviewState = None) -> ReviewState:
+        """attempts: [(at, score)] zamana göre sıralı."""
+        state = state or ReviewState()
+        for at, score in attempts:
+            state = self.review(state, score, at)
+        return state
+
+
+class FixedScheduler(Scheduler):
+    name = "fixed"
+    SCHEDULE = [1, 3, 7, 14]
+
+    def step(self, state, grade, now):
+        stage = state.stage + 1
+        if stage >= len(self.SCHEDULE):
+            return replace(state, stage=stage, retired=True)
+        return replace(state, stage=stage, interval_days=self.SCHEDULE[stage])
+
+
+class SM2Scheduler(Scheduler):
+    name = "sm2"
+    # not -> SM-2 kalite puanı (0-5)
+    QUALITY = {AGAIN: 2, HARD: 3, GOOD: 4, EASY: 5}
+
+    def step(self, state, grade, now):
+        q = self.QUALITY[grade]
+        ease = max(1.3, state.ease + 0.1 - (5 - q) * (0.08 + (5 - q) * 0.02))
+
+        if q < 3:
+            return replace(state, stage=0, ease=ease, interval_days=1)
+
+        stage = state.stage + 1
+        if stage == 1:
+            interval = 1
+        elif stage == 2:
+            interval = 6
+        else:
+            interval = round(max(state.interval_days, 1) * state.ease)
+        return replace(state, stage=stage, ease=ease, interval_days=interval)
+
+
+class FSRSScheduler(Scheduler):
+    name = "fsrs"
+    # FSRS-4.5 varsayılan ağırlıkları
+    W = (
+        0.4872, 1.4003, 3.7145, 13.8206, 5.1618, 1.2298, 0.8975, 0.031, 1.6474,
+        0.1367, 1.0461, 2.1072, 0.0793, 0.3246, 1.587, 0.2272, 2.8755,
+    )
+    DECAY = -0.5
+    FACTOR = 19 / 81
+
+    def retention(self):
+        return getattr(settings, "REVIEW_DESIRED_RETENTION", 0.9)
+
+    def retrievability(self, elapsed_days, stability):
+        return (1 + self.FACTOR * elapsed_days / stability) ** self.DECAY
+
+    def interval(self, stability):
+        days = stability / self.FACTOR * (self.retention() ** (1 / self.DECAY) - 1)
+        return max(1, round(days))
+
+    def _init_difficulty(self, grade):
+        return min(10.0, max(1.0, self.W[4] - (grade - 3) * self.W[5]))
+
+    def step(self, state, grade, now):
+        w = self.W
+
+        if state.stability <= 0 or state.last_reviewed_at is None:
+            stability = w[grade - 1]
+            difficulty = self._init_difficulty(grade)
+        else:
+            elapsed = max(0.0, (now - state.last_reviewed_at).total_seconds() / 86400)
+            r = self.retrievability(elapsed, state.stability)
+            d, s = state.difficulty, state.stability
+
+            difficulty = w[7] * self._init_difficulty(GOOD) + (1 - w[7]) * (d - w[6] * (grade - 3))
+            difficulty = min(10.0, max(1.0, difficulty))
+
+            if grade == AGAIN:
+                stability = min(s, w[11] * d ** -w[12] * ((s + 1) ** w[13] - 1) * math.exp(w[14] * (1 - r)))
+            else:
+                hard = w[15] if grade == HARD else 1
+                easy = w[16] if grade == EASY else 1
+                stability = s * (
+                    1 + math.exp(w[8]) * (11 - d) * s ** -w[9] * (math.exp(w[10] * (1 - r)) - 1) * hard * easy
+                )
+
+        stage = 0 if grade == AGAIN else state.stage + 1
+        return replace(
+            state,
+            stage=stage,
+            stability=round(stability, 4),
+            difficulty=round(difficulty, 4),
+            interval_days=1 if grade == AGAIN else self.interval(stability),
+        )
+
+
+SCHEDULERS = {s.name: s for s in (FixedScheduler(), SM2Scheduler(), FSRSScheduler())}
+
+
+def get_scheduler(name: str = None) -> Scheduler:
+    name = name or getattr(settings, "REVIEW_SCHEDULER", "sm2")
+    try:
+        return SCHEDULERS[name]
+    except KeyError:
+        raise ValueError(f"Bilinmeyen tekrar zamanlayıcısı: {name}")
@@ -1,66 +1,240 @@
 # content/services.py
-from django.utils import timezone
 from datetime import timedelta
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.lookups import GreaterThan
+from django.utils import timezone
+
+from .cursors import cursors_for, next_topic_for, pick
+from .models import DailyPlan, DailyPlanItem, ReviewItem
+
+
+def _plan_items(plan_id, reviews, next_topic):
+    """
+    reviews   : [(review_item_id, topic_id, topic_title)] tekrar sırasıyla
+    next_topic: (topic_id, topic_title) veya None
+    Dönüş: kaydedilmemiş DailyPlanItem listesi (tek bulk_create için)
+    """
+    items = []
+
+    # 1) Günün tekrarları
+    for review_id, topic_id, title in reviews:
+        items.append(DailyPlanItem(
+            plan_id=plan_id,
+            type="review",
+            title=f"Tekrar: {title}",
+            topic_id=topic_id,
+            review_item_id=review_id,
+        ))
+
+    # 2) 1 yeni konu + 3) aynı konudan mini test
+    if next_topic:
+        topic_id, title = next_topic
+        items.append(DailyPlanItem(plan_id=plan_id, type="topic", title=f"Yeni Konu: {title}", topic_id=topic_id))
+        items.append(DailyPlanItem(plan_id=plan_id, type="test", title=f"Mini Test: {title}", topic_id=topic_id))
+
+    for order, it in enumerate(items, start=1):
+        it.order = order
+    return items
+
+
+# ---------------------------
+# Plan sayaçları
+# ---------------------------
+
+def bump_plan_counters(plan_id, added: int = 0, done: int = 0):
+    """
+    total_items/done_items'ı tek UPDATE ile kaydırır; completion_rate aynı
+    ifadede (eski satır değerlerinden) hesaplanır. Okuma yapılmaz.
+    Yeni madde eklenirse plan tekrar "tamamlanmadı" olur.
+    """
+    total = F("total_items") + added
+    changes = {
+        "total_items": total,
+        "done_items": F("done_items") + done,
+        "completion_rate": Case(
+            When(GreaterThan(total, 0), then=(F("done_items") + done) * 100 / total),
+            default=Value(0),
+        ),
+    }
+    if added:
+        changes["is_completed"] = Value(False)
+    DailyPlan.objects.filter(id=plan_id).update(**changes)
+
+
+def close_plan_if_done(plan_id) -> bool:
+    """Koşullu UPDATE: plan bu çağrıyla tamamlandıysa True (iki sekme aynı anda gelse de tek sefer)."""
+    return bool(
+        DailyPlan.objects
+        .filter(id=plan_id, is_completed=False, total_items__gt=0, done_items__gte=F("total_items"))
+        .update(is_completed=True, completion_rate=100)
+    )
+
+
+def mark_items_done(plan_id, **filters):
+    """
+    Maddeleri koşullu UPDATE ile kapatır (zaten yapılmışlara dokunmaz) ve
+    sayaçları kaydırır. Plan tamamlanma UPDATE'i sadece son maddede denenir.
+    Dönüş: (plan, kapanan madde sayısı, plan bu çağrıyla bitti mi)
+    """
+    n = DailyPlanItem.objects.filter(plan_id=plan_id, is_done=False, **filters).update(is_done=True)
+    if n:
+        bump_plan_counters(plan_id, done=n)
+
+    plan = DailyPlan.objects.only("date", "total_items", "done_items", "completion_rate", "is_completed").get(id=plan_id)
 
-from .models import DailyPlan, DailyPlanItem, ReviewItem, TopicTemplate, StudentTopicProgress
+    just_completed = False
+    if n and not plan.is_completed and plan.total_items and plan.done_items >= plan.total_items:
+        just_completed = close_plan_if_done(plan_id)
+        plan.is_completed = True
+        plan.completion_rate = 100
 
+    return plan, n, just_completed
 
-def _first_incomplete_topic(user):
-    # En basit: tamamlanmamış ilk konu
-    # (İstersen grade/subject filtreyi sonra ekleriz)
-    completed_topic_ids = StudentTopicProgress.objects.filter(
-        user=user, completed=True
-    ).values_list("topic_id", flat=True)
 
-    return TopicTemplate.objects.exclude(id__in=completed_topic_ids).order_by("id").first()
+def mark_topic_items_done(user_id, topic_id):
+    """Konu tamamlanınca bugünkü plandaki konu/test/video maddeleri kapanır."""
+    plan_id = (
+        DailyPlan.objects
+        .filter(user_id=user_id, date=timezone.localdate())
+        .values_list("id", flat=True)
+        .first()
+    )
+    if not plan_id:
+        return None
+    return mark_items_done(plan_id, topic_id=topic_id, type__in=["topic", "test", "video"])
 
 
 def generate_daily_plan(user):
-    today = timezone.now().date()
+    """
+    Günün planı (lazy yol). Plan gece build_daily_plans ile hazırlanmışsa
+    burada sadece okunur; hazır değilse ilk açılışta oluşturulur.
+    """
+    today = timezone.localdate()
 
-    plan, created = DailyPlan.objects.get_or_create(user=user, date=today)
-    if not created:
+    plan = DailyPlan.objects.filter(user=user, date=today).first()
+    if plan:
         return plan
 
-    order = 1
+    with transaction.atomic():
+        plan, created = DailyPlan.objects.get_or_create(user=user, date=today)
+        if not created:
+            return plan
 
-    # 1) Bugünkü tekrarlar
-    reviews = ReviewItem.objects.filter(
-        user=user,
-        is_active=True,
-        next_review_at__date__lte=today
-    ).select_related("topic").order_by("next_review_at")
-
-    for r in reviews:
-        DailyPlanItem.objects.create(
-            plan=plan,
-            type="review",
-            title=f"Tekrar: {r.topic.title}",
-            topic=r.topic,
-            review_item=r,
-            order=order
+        reviews = (
+            ReviewItem.objects
+            .filter(user=user, is_active=True, next_review_at__date__lte=today)
+            .order_by("next_review_at")
+            .values_list("id", "topic_id", "topic__title")
         )
-        order += 1
+        next_topic = next_topic_for(user)
 
-    # 2) 1 yeni konu
-    next_topic = _first_incomplete_topic(user)
-    if next_topic:
-        DailyPlanItem.objects.create(
-            plan=plan,
-            type="topic",
-            title=f"Yeni Konu: {next_topic.title}",
-            topic=next_topic,
-            order=order
-        )
-        order += 1
-
-        # 3) aynı konudan mini test
-        DailyPlanItem.objects.create(
-            plan=plan,
-            type="test",
-            title=f"Mini Test: {next_topic.title}",
-            topic=next_topic,
-            order=order
+        items = _plan_items(
+            plan.id,
+            list(reviews),
+            (next_topic.id, next_topic.title) if next_topic else None,
         )
+        DailyPlanItem.objects.bulk_create(items)
+        if items:
+            bump_plan_counters(plan.id, added=len(items))
+            plan.total_items = len(items)
 
     return plan
+
+
+# ---------------------------
+# Toplu (gece) planlama
+# ---------------------------
+
+def active_students(active_days: int = 30):
+    """Son active_days gün içinde görülmüş öğrenciler (0 = hepsi)."""
+    qs = get_user_model().objects.filter(role="STUDENT", is_active=True)
+    if active_days:
+        cutoff = timezone.now() - timedelta(days=active_days)
+        qs = qs.filter(Q(profile__last_seen__gte=cutoff) | Q(last_login__gte=cutoff))
+    return qs.order_by("id").values_list("id", flat=True)
+
+
+def build_daily_plans(date=None, user_ids=None, batch_size: int = 500, active_days: int = 30):
+    """
+    Verilen gün (varsayılan: yarın) için planı olmayan öğrencilerin planlarını
+    hazırlar. Her user parçası için sabit sayıda sorgu:
+      mevcut planlar, tekrarlar, kurs kapsamları, müfredat imleçleri,
+      plan bulk_create, plan id'leri, madde bulk_create
+    (imleci henüz olmayan öğrenci/kapsam için bir kerelik ek sorgu; önceden
+    açılmış boş plan varsa sayaçları için bir bulk_update)
+    Dönüş: {"plans": n, "items": n, "skipped": n}
+    """
+    date = date or timezone.localdate() + timedelta(days=1)
+    if user_ids is None:
+        user_ids = active_students(active_days)
+
+    result = {"plans": 0, "items": 0, "skipped": 0}
+    user_ids = iter(user_ids)
+
+    while True:
+        chunk = list(islice(user_ids, batch_size))
+        if not chunk:
+            break
+
+        existing = set(DailyPlan.objects.filter(date=date, user_id__in=chunk).values_list("user_id", flat=True))
+        todo = [uid for uid in chunk if uid not in existing]
+        result["skipped"] += len(existing)
+        if not todo:
+            continue
+
+        reviews_by_user = {}
+        for rid, uid, tid, title in (
+            ReviewItem.objects
+            .filter(user_id__in=todo, is_active=True, next_review_at__date__lte=date)
+            .order_by("user_id", "next_review_at")
+            .values_list("id", "user_id", "topic_id", "topic__title")
+        ):
+            reviews_by_user.setdefault(uid, []).append((rid, tid, title))
+
+        next_by_user = {}
+        for uid, cursors in cursors_for(todo).items():
+            topic = pick(cursors)
+            next_by_user[uid] = (topic.id, topic.title) if topic else None
+
+        def item_count(uid):
+            return len(reviews_by_user.get(uid, [])) + (2 if next_by_user.get(uid) else 0)
+
+        with transaction.atomic():
+            DailyPlan.objects.bulk_create(
+                [DailyPlan(user_id=uid, date=date, total_items=item_count(uid)) for uid in todo],
+                ignore_conflicts=True,
+            )
+            # lazy yol araya girdiyse o planın maddeleri (ve sayacı) zaten var:
+            # sadece boş planlar doldurulur
+            plans = {
+                uid: (plan_id, total, done)
+                for uid, plan_id, total, done in (
+                    DailyPlan.objects
+                    .filter(date=date, user_id__in=todo, items__isnull=True)
+                    .values_list("user_id", "id", "total_items", "done_items")
+                )
+            }
+
+            items, stale = [], []
+            for uid, (plan_id, total, done) in plans.items():
+                items.extend(_plan_items(plan_id, reviews_by_user.get(uid, []), next_by_user.get(uid)))
+                # boş plan bizden önce açılmışsa sayaçları bizim maddelerle tutmaz
+                if (total, done) != (item_count(uid), 0):
+                    stale.append(DailyPlan(
+                        id=plan_id, total_items=item_count(uid), done_items=0,
+                        completion_rate=0, is_completed=False,
+                    ))
+            DailyPlanItem.objects.bulk_create(items, batch_size=1000)
+            if stale:
+                DailyPlan.objects.bulk_update(
+                    stale, ["total_items", "done_items", "completion_rate", "is_completed"], batch_size=batch_size
+                )
+
+        result["plans"] += len(plans)
+        result["items"] += len(items)
+
+    return result
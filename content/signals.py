@@ -0,0 +1,182 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .models import (
+    Grade, Subject, TopicTemplate, TopicContent, TopicQuestion, StudentTopicProgress,
+    Lesson, LessonFile, LessonVideo,
+)
+from .caching import bump_tree_version, invalidate_topic_payload
+from .adaptive import invalidate_index
+from .cursors import advance_past
+from .blobs import BLOB_FIELDS, add_refs, remove_refs
+from .course_progress import refresh_course
+from .mediaproc import SOURCE_FIELDS
+from .tasks import process_media_task
+
+
+# Cache'ler commit sonrası geçersiz kılınır; commit'ten önce okuyan bir
+# istek eski veriyi yeni anahtar altına yazamasın.
+
+# Konu ağacı cache'i: herhangi bir değişiklikte versiyon artar,
+# eski (grade, subject) ağaçları kendiliğinden geçersiz olur.
+@receiver(post_save, sender=TopicTemplate)
+@receiver(post_delete, sender=TopicTemplate)
+@receiver(post_save, sender=Grade)
+@receiver(post_delete, sender=Grade)
+@receiver(post_save, sender=Subject)
+@receiver(post_delete, sender=Subject)
+def topic_tree_changed(sender, **kwargs):
+    transaction.on_commit(bump_tree_version)
+
+
+# Konu detay cache'i (başlık + içerik + sorular)
+@receiver(post_save, sender=TopicTemplate)
+@receiver(post_delete, sender=TopicTemplate)
+def topic_detail_changed(sender, instance, **kwargs):
+    transaction.on_commit(lambda: invalidate_topic_payload(instance.pk))
+
+
+@receiver(post_save, sender=TopicContent)
+@receiver(post_delete, sender=TopicContent)
+@receiver(post_save, sender=TopicQuestion)
+@receiver(post_delete, sender=TopicQuestion)
+def topic_material_changed(sender, instance, **kwargs):
+    topic_id = instance.topic_id
+    transaction.on_commit(lambda: invalidate_topic_payload(topic_id))
+    if sender is TopicQuestion:
+        transaction.on_commit(lambda: invalidate_index(topic_id))
+
+
+# Müfredat imleci: konu tamamlanınca o konuyu gösteren imleç ilerler
+@receiver(post_save, sender=StudentTopicProgress)
+def topic_progress_saved(sender, instance, **kwargs):
+    if instance.completed:
+        advance_past(instance.user_id, instance.topic_id)
+
+
+# Kurs ilerleme özetleri: ders eklenince / silinince / kursu ya da sırası
+# değişince kursun özetleri yeniden hesaplanır; başlık vb. düzenlemeler hariç.
+# Karşılaştırma yüklenen değerlerle yapılır (ertelenmiş alan varsa her kayıtta yenilenir).
+def _lesson_position(instance):
+    if "course_id" not in instance.__dict__ or "order" not in instance.__dict__:
+        return None
+    return instance.course_id, instance.order
+
+
+@receiver(post_init, sender=Lesson)
+def lesson_loaded(sender, instance, **kwargs):
+    instance._loaded_position = _lesson_position(instance) if instance.pk else None
+
+
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+def lesson_changed(sender, instance, created=True, **kwargs):
+    before = getattr(instance, "_loaded_position", None)
+    after = _lesson_position(instance)
+    instance._loaded_position = after
+    if not created and before is not None and before == after:
+        return
+    course_ids = {instance.course_id}
+    if before is not None:
+        course_ids.add(before[0])
+    for course_id in course_ids:
+        transaction.on_commit(lambda course_id=course_id: refresh_course(course_id))
+
+
+# Medya işleme: dosya yüklenince / değişince süre, sayfa sayısı ve önizleme
+# arka planda üretilir. Dosya adı yüklenen değerle karşılaştırılır: başlık vb.
+# düzenlemeler ve işlemenin kendi kaydı tekrar tetiklemez.
+@receiver(post_init, sender=LessonFile)
+@receiver(post_init, sender=LessonVideo)
+@receiver(post_init, sender=TopicContent)
+def media_loaded(sender, instance, **kwargs):
+    source = SOURCE_FIELDS[sender._meta.label]
+    # ertelenmiş alan: eski ad bilinmiyor (None), kayıtta değişmiş sayılır
+    instance._media_source = _file_name(instance, source) if source in instance.__dict__ else None
+
+
+@receiver(post_save, sender=LessonFile)
+@receiver(post_save, sender=LessonVideo)
+@receiver(post_save, sender=TopicContent)
+def media_saved(sender, instance, created=False, update_fields=None, **kwargs):
+    label = sender._meta.label
+    source = SOURCE_FIELDS[label]
+    if source not in instance.__dict__ or (update_fields is not None and source not in update_fields):
+        return
+    name, before = _file_name(instance, source), instance._media_source
+    instance._media_source = name
+    if not name or (not created and name == before):
+        return
+    pk = instance.pk
+    transaction.on_commit(lambda: process_media_task.delay(label, pk))
+
+
+# Blob referans sayacı (content/blobs.py): yüklenen nesnenin dosya adı
+# hatırlanır; kayıtta ad değiştiyse yeni blob +1, eski blob -1, silinince -1.
+# Sayaç yazımı modelin kaydıyla aynı transaction'da (BlobFileMixin; rollback olursa sayaç da döner).
+def _blob_attname(sender):
+    return BLOB_FIELDS[sender._meta.label]
+
+
+def _file_name(instance, attname):
+    # ertelenmiş (only/defer) alan okunmaz: ekstra sorgu olmasın
+    value = instance.__dict__.get(attname)
+    return getattr(value, "name", value) or ""
+
+
+@receiver(post_init, sender=LessonFile)
+@receiver(post_init, sender=LessonVideo)
+@receiver(post_init, sender=TopicContent)
+@receiver(post_init, sender="messaging.Message")
+def blob_loaded(sender, instance, **kwargs):
+    attname = _blob_attname(sender)
+    # ertelenmiş alan: eski ad bilinmiyor (None), gerekirse kayıttan önce okunur
+    instance._blob_name = _file_name(instance, attname) if attname in instance.__dict__ else None
+
+
+@receiver(pre_save, sender=LessonFile)
+@receiver(pre_save, sender=LessonVideo)
+@receiver(pre_save, sender=TopicContent)
+@receiver(pre_save, sender="messaging.Message")
+@receiver(pre_delete, sender=LessonFile)
+@receiver(pre_delete, sender=LessonVideo)
+@receiver(pre_delete, sender=TopicContent)
+@receiver(pre_delete, sender="messaging.Message")
+def blob_original(sender, instance, signal, update_fields=None, **kwargs):
+    # ertelenmiş alan sonradan yüklendiyse karşılaştırma için veritabanındaki ad okunur
+    if getattr(instance, "_blob_name", "") is not None or instance.pk is None:
+        return
+    attname = _blob_attname(sender)
+    if signal is pre_save and (
+        attname not in instance.__dict__ or (update_fields is not None and attname not in update_fields)
+    ):
+        return
+    instance._blob_name = (
+        sender._base_manager.filter(pk=instance.pk).values_list(attname, flat=True).first() or ""
+    )
+
+
+@receiver(post_save, sender=LessonFile)
+@receiver(post_save, sender=LessonVideo)
+@receiver(post_save, sender=TopicContent)
+@receiver(post_save, sender="messaging.Message")
+def blob_saved(sender, instance, update_fields=None, **kwargs):
+    attname = _blob_attname(sender)
+    if attname not in instance.__dict__ or (update_fields is not None and attname not in update_fields):
+        return
+    new, old = _file_name(instance, attname), getattr(instance, "_blob_name", "")
+    if new != old:
+        add_refs([new])
+        remove_refs([old])
+        instance._blob_name = new
+
+
+@receiver(post_delete, sender=LessonFile)
+@receiver(post_delete, sender=LessonVideo)
+@receiver(post_delete, sender=TopicContent)
+@receiver(post_delete, sender="messaging.Message")
+def blob_deleted(sender, instance, **kwargs):
+    attname = _blob_attname(sender)
+    name = _file_name(instance, attname) if attname in instance.__dict__ else instance._blob_name
+    remove_refs([name or ""])
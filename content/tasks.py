@@ -0,0 +1,80 @@
+# content/tasks.py
+import logging
+from datetime import date as date_cls
+
+from celery import shared_task
+
+from .heartbeats import sweep
+from .mediaproc import process
+from .services import build_daily_plans
+
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def build_daily_plans_task(day=None, active_days=30):
+    """Gece çalışır (config/celery.py beat_schedule). day: "YYYY-MM-DD" veya None (= yarın)."""
+    return build_daily_plans(
+        date=date_cls.fromisoformat(day) if day else None,
+        active_days=active_days,
+    )
+
+
+@shared_task
+def flush_video_progress_task():
+    """Tamponda bekleyen video ilerlemelerini yazar (config/celery.py beat_schedule)."""
+    return sweep()
+
+
+@shared_task
+def process_media_task(model_label, pk):
+    """
+    Yüklenen dosyanın süre / sayfa sayısı ve önizlemesi (content/mediaproc.py).
+    Türetilmiş veri: hata yüklemeyi bozmasın (eager modda istek içinde çalışır).
+    """
+    try:
+        return process(model_label, pk)
+    except Exception:
+        logger.exception("Medya işlenemedi: %s #%s", model_label, pk)
+        return []
+
+
+@shared_task
+def assemble_upload_task(session_id):
+    """
+    Parçalı yüklemenin birleştirilmesi (content/uploads.py). Hata oturuma
+    yazılır (sahiplik bırakılır), istemci durumu görüp finalize'ı tekrarlar.
+    """
+    from .uploads import assemble
+
+    try:
+        obj = assemble(session_id)
+    except Exception:
+        logger.exception("Yükleme birleştirilemedi: %s", session_id)
+        return None
+    return obj.pk if obj else None
+
+
+@shared_task
+def purge_uploads_task():
+    """Yarım kalmış yüklemeler ve ölü birleştirme sahiplikleri (content/uploads.py)."""
+    from .uploads import purge_stale
+
+    return purge_stale()
+
+
+@shared_task
+def rebalance_lessons_task(course_id):
+    """Sıra anahtarları arasında yer kalmadı: kursun dersleri yeniden aralıklanır (content/ordering.py)."""
+    from .ordering import rebalance
+
+    return rebalance(course_id)
+
+
+@shared_task
+def purge_blobs_task():
+    """Referansı kalmamış blob dosyaları (content/blobs.py)."""
+    from .blobs import purge
+
+    return purge()
@@ -1,3 +1,912 @@
-from django.test import TestCase
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError, transaction
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from accounts.models import User
+from courses.models import Course, Enrollment
+from messaging.models import Conversation, Message
+from payments.models import PurchaseRequest
+
+from . import heartbeats, services, uploads
+from .blobs import (
+    PREFIX, TMP_DIR, add_refs, blob_name, blob_storage, purge, recount, remove_refs, temp_name,
+)
+from .caching import (
+    TREE_VERSION_KEY, bump_tree_version, cache_is_shared, cache_timeout, content_cache, get_tree_version,
+    invalidate_topic_payload,
+)
+from .cursors import cursors_for
+from .media import media_link
+from .mediaproc import preview_name, process
+from .models import (
+    Blob, CurriculumCursor, DailyPlan, Grade, Lesson, LessonFile, LessonVideo, ReviewItem, StudentTopicProgress,
+    Subject, TopicContent, TopicTemplate, UploadSession,
+)
+from .ordering import STEP, move, rebalance, reorder
+from .uploads import UploadConflict, create_session, discard, finalize, purge_stale, upload_status, write_chunk
+
+
+class TempMediaTestCase(TestCase):
+    """Dosya yazan testler: MEDIA_ROOT geçici dizin."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls._media_root = tempfile.mkdtemp()
+        cls._media_override = override_settings(MEDIA_ROOT=cls._media_root)
+        cls._media_override.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls._media_override.disable()
+        shutil.rmtree(cls._media_root, ignore_errors=True)
+
+
+# ---------------------------
+# Konu ağacı (materialized path)
+# ---------------------------
+
+class TopicTreeTests(TestCase):
+    def setUp(self):
+        grade, subject = Grade.objects.create(number=8), Subject.objects.create(name="Matematik")
+        self.root = TopicTemplate.objects.create(grade=grade, subject=subject, title="Sayılar")
+        self.child = TopicTemplate.objects.create(grade=grade, subject=subject, title="Kesirler", parent=self.root)
+        self.leaf = TopicTemplate.objects.create(grade=grade, subject=subject, title="Sadeleştirme", parent=self.child)
+
+    def test_paths(self):
+        self.assertEqual(self.leaf.path, f"{self.root.id}/{self.child.id}/{self.leaf.id}/")
+        self.assertEqual(self.leaf.depth, 2)
+
+    def test_move_subtree(self):
+        self.child.parent = None
+        self.child.save()
+        self.leaf.refresh_from_db()
+        self.assertEqual((self.leaf.path, self.leaf.depth), (f"{self.child.id}/{self.leaf.id}/", 1))
+
+    def test_cannot_move_under_own_descendant(self):
+        for parent in (self.leaf, self.root):
+            self.root.parent = parent
+            with self.assertRaises(ValidationError):
+                self.root.save()
+            with self.assertRaises(ValidationError):
+                self.root.full_clean()
+        self.leaf.refresh_from_db()
+        self.assertEqual(self.leaf.path, f"{self.root.id}/{self.child.id}/{self.leaf.id}/")
+
+
+# ---------------------------
+# Ders sıralaması (content/ordering.py)
+# ---------------------------
+
+class LessonOrderingTests(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create_user("ogretmen", password="x", role=User.Role.TEACHER)
+        self.course = Course.objects.create(title="Matematik", owner=self.teacher)
+        self.a, self.b, self.c, self.d, self.e = [
+            Lesson.objects.create(course=self.course, title=t, order=(i + 1) * STEP)
+            for i, t in enumerate("ABCDE")
+        ]
+
+    def titles(self):
+        return "".join(Lesson.objects.filter(course=self.course).order_by("order", "id").values_list("title", flat=True))
+
+    def orders(self):
+        return dict(Lesson.objects.filter(course=self.course).values_list("id", "order"))
+
+    def set_orders(self, *orders):
+        for lesson, order in zip((self.a, self.b, self.c, self.d, self.e), orders):
+            Lesson.objects.filter(id=lesson.id).update(order=order)
+
+    # taşıma
+
+    def test_move_writes_only_the_moved_lesson(self):
+        before = self.orders()
+        self.assertTrue(move(self.e, after_id=self.a.id))
+        self.assertEqual(self.titles(), "AEBCD")
+        after = self.orders()
+        self.assertEqual({k for k in before if before[k] != after[k]}, {self.e.id})
+        self.assertEqual(after[self.e.id], (STEP + 2 * STEP) // 2)
+
+    def test_move_to_front(self):
+        self.assertTrue(move(self.c, after_id=None))
+        self.assertEqual(self.titles(), "CABDE")
+
+    def test_move_to_current_place_is_noop(self):
+        before = self.orders()
+        self.assertFalse(move(self.c, after_id=self.b.id))
+        self.assertFalse(move(self.c, after_id=self.c.id))
+        self.assertEqual(self.orders(), before)
+
+    def test_move_after_lesson_of_other_course(self):
+        other = Course.objects.create(title="Fizik", owner=self.teacher)
+        foreign = Lesson.objects.create(course=other, title="X", order=STEP)
+        with self.assertRaises(ValueError):
+            move(self.a, after_id=foreign.id)
+        self.assertEqual(self.titles(), "ABCDE")
+
+    def test_move_into_exhausted_gap_renumbers_course(self):
+        self.set_orders(1, 2, 3, 4, 5)
+        self.assertTrue(move(self.e, after_id=self.a.id))
+        self.assertEqual(self.titles(), "AEBCD")
+        self.assertEqual(sorted(self.orders().values()), [STEP * i for i in range(1, 6)])
+
+    def test_repeated_inserts_at_same_point_keep_order(self):
+        # aynı aralığa art arda ekleme: anahtarlar tükenince yeniden numaralandırma
+        for _ in range(20):
+            move(self.e, after_id=self.a.id)
+            move(self.d, after_id=self.a.id)
+        self.assertEqual(self.titles(), "ADEBC")
+        self.assertEqual(len(set(self.orders().values())), 5)
+
+    # toplu sıralama
+
+    def test_reorder_writes_only_lessons_outside_longest_run(self):
+        before = self.orders()
+        # A C D E yerinde kalır (en uzun artan dizi), sadece B taşınır
+        self.assertEqual(reorder(self.course.id, [self.a.id, self.c.id, self.d.id, self.b.id, self.e.id]), 1)
+        self.assertEqual(self.titles(), "ACDBE")
+        after = self.orders()
+        self.assertEqual({k for k in before if before[k] != after[k]}, {self.b.id})
+
+    def test_reorder_reversed(self):
+        ids = [self.e.id, self.d.id, self.c.id, self.b.id, self.a.id]
+        self.assertEqual(reorder(self.course.id, ids), 4)
+        self.assertEqual(self.titles(), "EDCBA")
+
+    def test_reorder_unchanged_writes_nothing(self):
+        ids = [self.a.id, self.b.id, self.c.id, self.d.id, self.e.id]
+        self.assertEqual(reorder(self.course.id, ids), 0)
+
+    def test_reorder_missing_unknown_and_duplicate_ids(self):
+        # listede olmayanlar sona, başka kursun / tekrar eden id'ler yok sayılır
+        reorder(self.course.id, [self.d.id, self.d.id, 999999, self.b.id])
+        self.assertEqual(self.titles(), "DBACE")
+
+    def test_reorder_without_room_renumbers(self):
+        self.set_orders(1, 2, 3, 4, 5)
+        reorder(self.course.id, [self.e.id, self.a.id, self.b.id, self.c.id, self.d.id])
+        self.assertEqual(self.titles(), "EABCD")
+        self.assertEqual(sorted(self.orders().values()), [STEP * i for i in range(1, 6)])
+
+    def test_rebalance(self):
+        self.set_orders(7, 8, 9, 10, 11)
+        self.assertEqual(rebalance(self.course.id), 5)
+        self.assertEqual(self.titles(), "ABCDE")
+        self.assertEqual(rebalance(self.course.id), 0)
+
+    # kurs ilerleme özetleri
+
+    def refreshed(self, change):
+        with mock.patch("content.signals.refresh_course") as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                change()
+        return sorted(c.args[0] for c in refresh.call_args_list)
+
+    def test_title_edit_does_not_refresh_summaries(self):
+        lesson = Lesson.objects.get(id=self.a.id)
+        lesson.title = "A2"
+        self.assertEqual(self.refreshed(lesson.save), [])
+
+    def test_order_or_course_change_refreshes_summaries(self):
+        other = Course.objects.create(title="Fen", owner=self.teacher)
+        lesson = Lesson.objects.get(id=self.a.id)
+        lesson.order = 6 * STEP
+        self.assertEqual(self.refreshed(lesson.save), [self.course.id])
+        lesson.course = other
+        self.assertEqual(self.refreshed(lesson.save), sorted([self.course.id, other.id]))
+        self.assertEqual(self.refreshed(lesson.save), [])
+        self.assertEqual(self.refreshed(lesson.delete), [other.id])
+
+
+# ---------------------------
+# Parçalı yükleme (content/uploads.py)
+# ---------------------------
+
+class ChunkedUploadTests(TempMediaTestCase):
+    data = bytes(range(256)) * 40  # 10240 bayt
+
+    def setUp(self):
+        self.teacher = User.objects.create_user("ogretmen", password="x", role=User.Role.TEACHER)
+        course = Course.objects.create(title="Matematik", owner=self.teacher)
+        self.lesson = Lesson.objects.create(course=course, title="Ders", order=STEP)
+        self.session = create_session(self.teacher, self.lesson, "file", "Çalışma.pdf", len(self.data), title="Föy")
+
+    def send(self, offset, chunk, length=None):
+        return write_chunk(self.session, offset, io.BytesIO(chunk), len(chunk) if length is None else length)
+
+    def test_chunks_advance_offset(self):
+        self.assertEqual(self.send(0, self.data[:4000]), 4000)
+        self.assertEqual(self.send(4000, self.data[4000:]), len(self.data))
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.offset, len(self.data))
+        self.assertEqual(len(self.session.parts), 2)
+
+    def test_duplicate_offset_conflicts(self):
+        self.send(0, self.data[:4000])
+        with self.assertRaises(UploadConflict):
+            self.send(0, self.data[:4000])
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.offset, 4000)
+        self.assertEqual(len(self.session.parts), 1)
+
+    def test_concurrent_write_at_same_offset_loses(self):
+        # iki istek aynı offset'i okudu; ikincisi koşullu UPDATE'i kaybeder, parçası silinir
+        stale = UploadSession.objects.get(id=self.session.id)
+        self.send(0, self.data[:4000])
+        with self.assertRaises(UploadConflict):
+            write_chunk(stale, 0, io.BytesIO(self.data[:5000]), 5000)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.offset, 4000)
+        self.assertEqual(len(default_storage.listdir(f"uploads/{self.session.id}")[1]), 1)
+        with default_storage.open(self.session.parts[0][2], "rb") as f:
+            self.assertEqual(f.read(), self.data[:4000])
+
+    def test_short_chunk_is_discarded(self):
+        with self.assertRaises(ValueError):
+            self.send(0, self.data[:100], length=4000)
+        self.session.refresh_from_db()
+        self.assertEqual((self.session.offset, self.session.parts), (0, []))
+
+    def test_discard_removes_parts(self):
+        self.send(0, self.data[:4000])
+        stray = default_storage.save(f"uploads/{self.session.id}/000000000004000.part", io.BytesIO(b"yarim"))
+        parts = [name for _, _, name in self.session.parts] + [stray]
+        discard(self.session)
+        self.assertFalse(any(default_storage.exists(name) for name in parts))
+        self.assertFalse(UploadSession.objects.filter(id=self.session.id).exists())
+
+    def test_chunk_past_size_rejected(self):
+        with self.assertRaises(ValueError):
+            self.send(0, self.data + b"x")
+
+    def test_patch_duplicate_offset_returns_409(self):
+        self.client.force_login(self.teacher)
+        url = f"/teacher/uploads/{self.session.id}/"
+        headers = {"HTTP_UPLOAD_OFFSET": "0"}
+        r = self.client.generic("PATCH", url, self.data[:4000], content_type="application/offset+octet-stream", **headers)
+        self.assertEqual(r.status_code, 204)
+        r = self.client.generic("PATCH", url, self.data[:4000], content_type="application/offset+octet-stream", **headers)
+        self.assertEqual(r.status_code, 409)
+        self.assertEqual(r["Upload-Offset"], "4000")
+
+    def finish(self):
+        """finalize + commit sonrası kuyruğa verilen birleştirme (eager Celery)."""
+        with self.captureOnCommitCallbacks(execute=True):
+            finalize(self.session)
+        self.session.refresh_from_db()
+        return self.session
+
+    def test_finalize_assembles_parts(self):
+        self.send(0, self.data[:3000])
+        self.send(3000, self.data[3000:])
+        parts = [name for _, _, name in self.session.parts]
+
+        session = self.finish()
+        self.assertEqual(upload_status(session), {"state": "done", "id": session.result_id})
+        obj = LessonFile.objects.get(id=session.result_id)
+        self.assertEqual(obj.original_name, "Çalışma.pdf")
+        with obj.file.open("rb") as f:
+            self.assertEqual(f.read(), self.data)
+        self.assertFalse(any(default_storage.exists(name) for name in parts))
+
+        with self.assertRaises(UploadConflict):
+            finalize(session)
+
+    def test_finalize_incomplete_upload(self):
+        self.send(0, self.data[:3000])
+        with self.assertRaises(UploadConflict):
+            finalize(self.session)
+
+    def test_second_finalize_while_assembling_conflicts(self):
+        self.send(0, self.data)
+        finalize(self.session)  # görev commit'e kadar kuyrukta
+        self.assertEqual(upload_status(self.session)["state"], "assembling")
+        with self.assertRaises(UploadConflict):
+            finalize(UploadSession.objects.get(id=self.session.id))
+
+    def test_failed_assembly_releases_claim(self):
+        self.send(0, self.data)
+        with mock.patch("content.uploads._PartsReader.readinto", side_effect=OSError("okunamadı")):
+            with self.assertLogs("content.tasks", "ERROR"):
+                session = self.finish()
+        self.assertIsNone(session.completed_at)
+        self.assertEqual(upload_status(session)["state"], "failed")
+        self.assertFalse(LessonFile.objects.exists())
+        self.assertTrue(all(default_storage.exists(name) for _, _, name in session.parts))
+
+        session = self.finish()
+        with LessonFile.objects.get(id=session.result_id).file.open("rb") as f:
+            self.assertEqual(f.read(), self.data)
+
+    def test_dead_claim_is_reset_and_parts_kept(self):
+        # worker sahiplikten sonra öldü: oturum tamamlanmış görünüp parçaları silinmemeli
+        self.send(0, self.data)
+        finalize(self.session)
+        old = timezone.now() - timedelta(hours=3)
+        UploadSession.objects.filter(id=self.session.id).update(completed_at=old, updated_at=old)
+
+        purge_stale()
+        self.session.refresh_from_db()
+        self.assertIsNone(self.session.completed_at)
+        self.assertEqual(upload_status(self.session)["state"], "failed")
+        self.assertTrue(all(default_storage.exists(name) for _, _, name in self.session.parts))
+
+        session = self.finish()
+        self.assertEqual(upload_status(session)["state"], "done")
+
+    def test_dead_claim_can_be_taken_over(self):
+        self.send(0, self.data)
+        finalize(self.session)
+        stale_claim = timezone.now() - timedelta(hours=3)
+        UploadSession.objects.filter(id=self.session.id).update(completed_at=stale_claim)
+        session = self.finish()
+        self.assertEqual(upload_status(session)["state"], "done")
+
+    def test_late_worker_does_not_overwrite_new_claim(self):
+        self.send(0, self.data)
+        finalize(self.session)
+        # eski görev çalışırken sahiplik ölü sayılıp başka bir finalize'a geçti
+        real = uploads._assemble_file
+
+        def reclaim_then_assemble(session, names):
+            UploadSession.objects.filter(id=session.id).update(completed_at=timezone.now())
+            return real(session, names)
+
+        with mock.patch("content.uploads._assemble_file", reclaim_then_assemble):
+            with self.assertRaises(UploadConflict):
+                uploads.assemble(self.session.id)
+        self.session.refresh_from_db()
+        self.assertIsNotNone(self.session.completed_at)
+        self.assertIsNone(self.session.result_id)
+        self.assertFalse(LessonFile.objects.exists())
+        self.assertTrue(all(default_storage.exists(name) for _, _, name in self.session.parts))
+
+    def test_s3_parts_are_composed_server_side(self):
+        big = 6 * 1024 ** 2
+        self.session.parts = [[0, big, "uploads/x/0.part"], [big, big, "uploads/x/1.part"], [2 * big, 10, "uploads/x/2.part"]]
+        storage = mock.Mock(bucket_name="b", bucket=object())
+        storage._normalize_name.side_effect = lambda name: f"media/{name}"
+        client = storage.connection.meta.client
+        client.create_multipart_upload.return_value = {"UploadId": "u1"}
+        client.upload_part_copy.side_effect = lambda **kw: {"CopyPartResult": {"ETag": f"e{kw['PartNumber']}"}}
+
+        self.assertTrue(uploads._can_compose(storage, self.session.parts))
+        self.assertFalse(uploads._can_compose(storage, [[0, 100, "a"], [100, big, "b"]]))
+        self.assertFalse(uploads._can_compose(default_storage, self.session.parts))
+
+        uploads._compose_s3(storage, [name for _, _, name in self.session.parts], "blobs/tmp/t")
+        copies = [c.kwargs["CopySource"]["Key"] for c in client.upload_part_copy.call_args_list]
+        self.assertEqual(copies, ["media/uploads/x/0.part", "media/uploads/x/1.part", "media/uploads/x/2.part"])
+        client.complete_multipart_upload.assert_called_once_with(
+            Bucket="b", Key="media/blobs/tmp/t", UploadId="u1",
+            MultipartUpload={"Parts": [{"PartNumber": n, "ETag": f"e{n}"} for n in (1, 2, 3)]},
+        )
+
+    def test_finalize_view_reports_status(self):
+        self.send(0, self.data)
+        self.client.force_login(self.teacher)
+        url = f"/teacher/uploads/{self.session.id}/finalize/"
+        with self.captureOnCommitCallbacks(execute=True):
+            r = self.client.post(url)
+            self.assertEqual(r.status_code, 202)
+            self.assertEqual(r.json()["data"]["state"], "assembling")
+        data = self.client.get(url).json()["data"]
+        self.assertEqual((data["state"], data["kind"]), ("done", "file"))
+        self.assertIn("redirect", data)
+        self.assertEqual(self.client.post(url).status_code, 409)
+
+
+# ---------------------------
+# Blob deposu ve referans sayacı (content/blobs.py)
+# ---------------------------
+
+class BlobStorageTests(TempMediaTestCase):
+    def setUp(self):
+        teacher = User.objects.create_user("ogretmen", password="x", role=User.Role.TEACHER)
+        course = Course.objects.create(title="Matematik", owner=teacher)
+        self.lesson = Lesson.objects.create(course=course, title="Ders", order=STEP)
+
+    def upload(self, data, name="föy.pdf"):
+        return LessonFile.objects.create(lesson=self.lesson, title="f", file=SimpleUploadedFile(name, data))
+
+    def blob(self, obj):
+        return Blob.objects.get(name=obj.file.name)
+
+    def stored_blobs(self):
+        root = default_storage.path(PREFIX)
+        return {
+            os.path.join(d, f) for d, _, files in os.walk(root) for f in files
+            if not d.startswith(default_storage.path(TMP_DIR))
+        }
+
+    def temp_files(self):
+        return set(default_storage.listdir(TMP_DIR)[1]) if default_storage.exists(TMP_DIR) else set()
+
+    def age(self, blob, hours=2):
+        Blob.objects.filter(id=blob.id).update(last_used_at=timezone.now() - timedelta(hours=hours))
+
+    def test_same_content_stored_once(self):
+        a = self.upload(b"%PDF ayni", "a.pdf")
+        b = self.upload(b"%PDF ayni", "B.PDF")
+        self.assertEqual(a.file.name, b.file.name)
+        self.assertEqual(Blob.objects.count(), 1)
+        self.assertEqual(self.blob(a).refcount, 2)
+        self.assertEqual((a.original_name, b.original_name), ("a.pdf", "B.PDF"))
+
+    def test_delete_and_replace_release_references(self):
+        a = self.upload(b"bir")
+        b = self.upload(b"bir")
+        blob = self.blob(a)
+
+        b.file = SimpleUploadedFile("yeni.pdf", b"iki")
+        b.save()
+        blob.refresh_from_db()
+        self.assertEqual(blob.refcount, 1)
+        self.assertEqual(self.blob(b).refcount, 1)
+
+        a.delete()
+        blob.refresh_from_db()
+        self.assertEqual(blob.refcount, 0)
+        # dosya hemen silinmez (purge_blobs)
+        self.assertTrue(default_storage.exists(blob.name))
+
+    def test_refcount_never_negative_and_non_blob_names_ignored(self):
+        blob = self.blob(self.upload(b"bir"))
+        remove_refs([blob.name, blob.name, blob.name])
+        add_refs(["lesson_files/eski.pdf", "", None])
+        blob.refresh_from_db()
+        self.assertEqual(blob.refcount, 0)
+
+    def test_failed_save_rolls_back_refcount(self):
+        a = self.upload(b"bir")
+        with mock.patch("content.signals.add_refs", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.upload(b"bir")
+        self.assertEqual(LessonFile.objects.count(), 1)
+        self.assertEqual(self.blob(a).refcount, 1)
+
+    def test_deferred_field_resave_keeps_count(self):
+        a = self.upload(b"bir")
+        obj = LessonFile.objects.defer("file").get(id=a.id)
+        obj.file  # alan sonradan yüklenir
+        obj.save()
+        self.assertEqual(self.blob(a).refcount, 1)
+
+        LessonFile.objects.defer("file").get(id=a.id).delete()
+        self.assertEqual(self.blob(a).refcount, 0)
+
+    def test_purge_removes_only_unreferenced_old_blobs(self):
+        kept = self.blob(self.upload(b"kullaniliyor"))
+        fresh = self.blob(self.upload(b"yeni"))
+        old = self.blob(self.upload(b"eski"))
+        LessonFile.objects.filter(file__in=[fresh.name, old.name]).delete()
+        self.age(kept)
+        self.age(old)
+
+        self.assertEqual(purge(), 1)
+        self.assertEqual(set(Blob.objects.values_list("id", flat=True)), {kept.id, fresh.id})
+        self.assertFalse(default_storage.exists(old.name))
+        self.assertTrue(default_storage.exists(kept.name))
+
+    def test_reupload_after_purge_rewrites_file(self):
+        a = self.upload(b"tekrar")
+        blob = self.blob(a)
+        a.delete()
+        self.age(blob)
+        purge()
+
+        b = self.upload(b"tekrar")
+        self.assertEqual(b.file.name, blob.name)
+        self.assertTrue(default_storage.exists(b.file.name))
+        self.assertEqual(self.blob(b).refcount, 1)
+
+    def test_purge_wins_race_with_reupload(self):
+        # purge, save() blob satırını okuduktan hemen sonra siler: satır ve dosya yeniden
+        a = self.upload(b"yaris")
+        blob = self.blob(a)
+        a.delete()
+        self.age(blob)
+
+        first = QuerySet.first
+        calls = []
+
+        def first_then_purge(qs):
+            obj = first(qs)
+            if qs.model is Blob and not calls:
+                calls.append(obj)
+                self.assertEqual(purge(), 1)
+            return obj
+
+        with mock.patch.object(QuerySet, "first", first_then_purge):
+            name = blob_storage().save("b.pdf", ContentFile(b"yaris"))
+        self.assertEqual(calls, [blob])
+        self.assertEqual(name, blob.name)
+        self.assertTrue(default_storage.exists(name))
+        self.assertTrue(Blob.objects.filter(name=name).exists())
+
+    def test_reupload_wins_race_with_purge(self):
+        # save() satırı güncelledikten sonra purge çalışır: blob silinmez
+        a = self.upload(b"yaris")
+        blob = self.blob(a)
+        a.delete()
+        self.age(blob)
+
+        exists = default_storage.exists
+        purged = []
+
+        def purge_then_exists(name):
+            if not purged:
+                purged.append(purge())
+            return exists(name)
+
+        with mock.patch.object(default_storage, "exists", side_effect=purge_then_exists):
+            name = blob_storage().save("b.pdf", ContentFile(b"yaris"))
+        self.assertEqual(purged, [0])
+        self.assertTrue(default_storage.exists(name))
+        self.assertTrue(Blob.objects.filter(id=blob.id).exists())
+
+    def test_truncated_blob_file_is_rewritten(self):
+        data = b"x" * 100000
+        digest = hashlib.sha256(data).hexdigest()
+        name = blob_name(digest, ".pdf")
+        default_storage.save(name, ContentFile(data[:500]))
+        Blob.objects.create(digest=digest, name=name, size=len(data))
+
+        self.assertEqual(blob_storage().save("b.pdf", ContentFile(data)), name)
+        self.assertEqual(default_storage.size(name), len(data))
+        with default_storage.open(name) as f:
+            self.assertEqual(f.read(), data)
+
+    def test_interrupted_stream_leaves_no_blob(self):
+        class Broken(io.RawIOBase):
+            sent = False
+
+            def readable(self):
+                return True
+
+            def readinto(self, buf):
+                if self.sent:
+                    raise OSError("bağlantı koptu")
+                self.sent = True
+                buf[:3] = b"yar"
+                return 3
+
+        before = self.stored_blobs()
+        with self.assertRaises(OSError):
+            blob_storage().save("b.pdf", File(Broken(), name="b.pdf"))
+        self.assertFalse(Blob.objects.exists())
+        # yarım kalan yazım sadece blobs/tmp/ altında (purge temizler)
+        self.assertEqual(self.stored_blobs(), before)
+
+    def test_streamed_content_is_hashed_while_written(self):
+        data = b"akis" * 1000
+        temps = self.temp_files()
+        name = blob_storage().save("b.pdf", File(io.BufferedReader(io.BytesIO(data)), name="b.pdf"))
+        self.assertEqual(name, blob_name(hashlib.sha256(data).hexdigest(), ".pdf"))
+        self.assertEqual(default_storage.size(name), len(data))
+        self.assertEqual(self.temp_files(), temps)
+
+    def test_adopt_moves_stored_temp_file(self):
+        data = b"birlestirilmis"
+        temp = default_storage.save(temp_name(".mp4"), ContentFile(data))
+        name = blob_storage().adopt(temp, "ders.mp4")
+        self.assertEqual(name, blob_name(hashlib.sha256(data).hexdigest(), ".mp4"))
+        self.assertFalse(default_storage.exists(temp))
+
+        again = default_storage.save(temp_name(".mp4"), ContentFile(data))
+        self.assertEqual(blob_storage().adopt(again, "ders.mp4"), name)
+        self.assertFalse(default_storage.exists(again))
+        self.assertEqual(Blob.objects.get(name=name).size, len(data))
+
+    def test_purge_removes_old_temp_files(self):
+        old = default_storage.save(f"{TMP_DIR}/eski.pdf", ContentFile(b"yarim"))
+        fresh = default_storage.save(f"{TMP_DIR}/yeni.pdf", ContentFile(b"yaziliyor"))
+        past = (timezone.now() - timedelta(hours=2)).timestamp()
+        os.utime(default_storage.path(old), (past, past))
+
+        purge()
+        self.assertFalse(default_storage.exists(old))
+        self.assertTrue(default_storage.exists(fresh))
+
+    def test_recount(self):
+        a = self.upload(b"bir")
+        self.upload(b"bir")
+        Blob.objects.update(refcount=7)
+        self.assertEqual(recount(), 1)
+        self.assertEqual(self.blob(a).refcount, 2)
+        self.assertEqual(recount(), 0)
+
+
+# ---------------------------
+# İçerik cache'i (content/caching.py)
+# ---------------------------
+
+class ContentCacheTests(TestCase):
+    def setUp(self):
+        content_cache().clear()
+
+    @override_settings(CONTENT_LOCAL_CACHE_TIMEOUT=30)
+    def test_local_cache_timeouts_are_capped(self):
+        self.assertFalse(cache_is_shared())
+        self.assertEqual(cache_timeout(None), 30)
+        self.assertEqual(cache_timeout(10), 10)
+        self.assertEqual(cache_timeout(3600), 30)
+
+    def test_shared_cache_keeps_timeouts(self):
+        with mock.patch("content.caching.cache_is_shared", return_value=True):
+            self.assertIsNone(cache_timeout(None))
+            self.assertEqual(cache_timeout(3600), 3600)
+
+    @override_settings(CONTENT_LOCAL_CACHE_TIMEOUT=30)
+    def test_tree_version_expires_in_local_cache(self):
+        # başka worker'daki bump bu worker'a en geç CONTENT_LOCAL_CACHE_TIMEOUT'ta yansır
+        c = content_cache()
+        v = get_tree_version()
+        bump_tree_version()
+        self.assertEqual(get_tree_version(), v + 1)
+        expires = c._expire_info[c.make_and_validate_key(TREE_VERSION_KEY)]
+        self.assertIsNotNone(expires)
+        self.assertLessEqual(expires - time.time(), 30)
+
+    def test_progress_only_detail_404s_for_missing_or_inactive_topic(self):
+        grade, subject = Grade.objects.create(number=8), Subject.objects.create(name="Matematik")
+        topic = TopicTemplate.objects.create(grade=grade, subject=subject, title="Sayılar")
+        self.client.force_login(User.objects.create_user("ogrenci", password="x"))
+        url = reverse("api_topic_detail", args=[topic.id]) + "?fields=progress"
+        missing = reverse("api_topic_detail", args=[topic.id + 100]) + "?fields=progress"
+
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(self.client.get(missing).status_code, 404)
+        # pasifleştirme bulk update ile yapılsa da cache'teki payload'a güvenilmez
+        TopicTemplate.objects.filter(id=topic.id).update(is_active=False)
+        invalidate_topic_payload(topic.id)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+# ---------------------------
+# Gece planlama (content/services.py)
+# ---------------------------
+
+class DailyPlanBuildTests(TestCase):
+    def setUp(self):
+        grade, subject = Grade.objects.create(number=8), Subject.objects.create(name="Matematik")
+        self.topic = TopicTemplate.objects.create(grade=grade, subject=subject, title="Sayılar")
+        self.student = User.objects.create_user("ogrenci", password="x")
+        ReviewItem.objects.create(user=self.student, topic=self.topic)
+        self.date = timezone.localdate() + timedelta(days=1)
+
+    def test_empty_plan_opened_meanwhile_gets_counters(self):
+        real_cursors_for = services.cursors_for
+
+        def racing_cursors_for(user_ids):
+            # kontrol ile bulk_create arasında başka yol boş ve sayaçları bozuk bir plan açar
+            DailyPlan.objects.create(user=self.student, date=self.date, total_items=7, done_items=4)
+            return real_cursors_for(user_ids)
+
+        with mock.patch("content.services.cursors_for", racing_cursors_for):
+            result = services.build_daily_plans(date=self.date, user_ids=[self.student.id])
+
+        plan = DailyPlan.objects.get(user=self.student, date=self.date)
+        self.assertEqual(result["plans"], 1)
+        self.assertEqual(plan.items.count(), result["items"])
+        self.assertEqual((plan.total_items, plan.done_items), (result["items"], 0))
+
+
+# ---------------------------
+# Müfredat imleci (content/cursors.py)
+# ---------------------------
+
+class CurriculumCursorTests(TestCase):
+    def test_global_cursor_is_unique_per_user(self):
+        student = User.objects.create_user("ogrenci", password="x")
+        cursors_for([student.id])
+        cursors_for([student.id])
+        self.assertEqual(CurriculumCursor.objects.filter(user=student).count(), 1)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            CurriculumCursor.objects.create(user=student)
+
+
+# ---------------------------
+# Video nabız tamponu (content/heartbeats.py)
+# ---------------------------
+
+class VideoHeartbeatTests(TestCase):
+    def setUp(self):
+        content_cache().clear()
+        grade, subject = Grade.objects.create(number=8), Subject.objects.create(name="Matematik")
+        self.topic = TopicTemplate.objects.create(grade=grade, subject=subject, title="Sayılar")
+        self.student = User.objects.create_user("ogrenci", password="x")
+
+    def _progress(self):
+        return StudentTopicProgress.objects.get(user=self.student, topic=self.topic)
+
+    def test_local_cache_writes_through(self):
+        self.assertFalse(heartbeats.buffering_enabled())
+        heartbeats.record(self.student.id, self.topic.id, 10)
+        heartbeats.record(self.student.id, self.topic.id, 30)
+        self.assertEqual(self._progress().video_progress, 30)
+        self.assertIsNone(heartbeats.buffered_progress(self.student.id, self.topic.id))
+
+    def test_flush_applies_progress_to_row_inserted_meanwhile(self):
+        manager = StudentTopicProgress.objects
+        real_bulk_create = manager.bulk_create
+
+        def racing_bulk_create(objs, **kwargs):
+            # SELECT'ten sonra başka istek satırı açar (test zaten geçilmiş)
+            StudentTopicProgress.objects.create(user=self.student, topic=self.topic, video_progress=10, test_score=90)
+            return real_bulk_create(objs, **kwargs)
+
+        with mock.patch.object(manager, "bulk_create", racing_bulk_create):
+            state = heartbeats.flush({(self.student.id, self.topic.id): 85})
+
+        prog = self._progress()
+        self.assertEqual((prog.video_progress, prog.video_completed, prog.completed), (85, True, True))
+        self.assertEqual(state[(self.student.id, self.topic.id)]["completed"], True)
+
+
+# ---------------------------
+# Korumalı dosya teslimi (content/media.py)
+# ---------------------------
+
+class ProtectedMediaTests(TempMediaTestCase):
+    def setUp(self):
+        self.teacher = User.objects.create_user("ogretmen", password="x", role=User.Role.TEACHER)
+        self.student = User.objects.create_user("ogrenci", password="x")
+        self.outsider = User.objects.create_user("yabanci", password="x")
+        self.course = Course.objects.create(title="Matematik", owner=self.teacher)
+        Enrollment.objects.create(course=self.course, user=self.student)
+        lesson = Lesson.objects.create(course=self.course, title="Kesirler")
+        self.file = LessonFile.objects.create(lesson=lesson, file=SimpleUploadedFile("notlar.pdf", b"0123456789"))
+        self.video = LessonVideo.objects.create(lesson=lesson, video=SimpleUploadedFile("ders.mp4", b"v" * 100))
+
+    def get(self, user, kind, pk, preview=False, **headers):
+        self.client.force_login(user)
+        return self.client.get(media_link(kind, pk, preview=preview), headers=headers)
+
+    def body(self, resp):
+        return b"".join(resp.streaming_content)
+
+    def test_lesson_files_follow_enrollment(self):
+        for kind, pk in (("lesson-file", self.file.id), ("lesson-video", self.video.id)):
+            self.assertEqual(self.get(self.teacher, kind, pk).status_code, 200)
+            self.assertEqual(self.get(self.student, kind, pk).status_code, 200)
+            self.assertEqual(self.get(self.outsider, kind, pk).status_code, 403)
+        resp = self.get(self.student, "lesson-file", self.file.id)
+        self.assertEqual(self.body(resp), b"0123456789")
+        self.assertEqual(resp["Content-Disposition"], "inline; filename*=UTF-8''notlar.pdf")
+
+    def test_paid_course_needs_approved_purchase(self):
+        self.course.is_paid = True
+        self.course.save()
+        request = PurchaseRequest.objects.create(user=self.student, course=self.course)
+        self.assertEqual(self.get(self.student, "lesson-file", self.file.id).status_code, 403)
+        request.status = PurchaseRequest.Status.APPROVED
+        request.save()
+        self.assertEqual(self.get(self.student, "lesson-file", self.file.id).status_code, 200)
+
+    def test_topic_content_is_hidden_when_inactive(self):
+        grade, subject = Grade.objects.create(number=8), Subject.objects.create(name="Matematik")
+        topic = TopicTemplate.objects.create(grade=grade, subject=subject, title="Sayılar")
+        content = TopicContent.objects.create(
+            topic=topic, content_type=TopicContent.ContentType.PDF, title="Özet",
+            file=SimpleUploadedFile("ozet.pdf", b"pdf"),
+        )
+        self.assertEqual(self.get(self.outsider, "topic-content", content.id).status_code, 200)
+        TopicContent.objects.filter(id=content.id).update(is_active=False)
+        self.assertEqual(self.get(self.outsider, "topic-content", content.id).status_code, 404)
+
+    def test_message_files_need_conversation_membership(self):
+        convo = Conversation.objects.create(course=self.course, student=self.student, teacher=self.teacher)
+        msg = Message.objects.create(
+            conversation=convo, sender=self.student, file=SimpleUploadedFile("odev.txt", b"cevap"),
+        )
+        self.assertEqual(self.get(self.teacher, "message", msg.id).status_code, 200)
+        self.assertEqual(self.get(self.student, "message", msg.id).status_code, 200)
+        self.assertEqual(self.get(self.outsider, "message", msg.id).status_code, 403)
+        self.assertEqual(self.get(self.student, "message", msg.id, preview=True).status_code, 404)
+        Message.objects.filter(id=msg.id).update(is_deleted=True)
+        self.assertEqual(self.get(self.student, "message", msg.id).status_code, 404)
+
+    def test_missing_preview_is_404(self):
+        self.assertEqual(self.get(self.student, "lesson-file", self.file.id, preview=True).status_code, 404)
+        self.assertEqual(self.get(self.student, "lesson-file", self.file.id + 100).status_code, 404)
+
+    def test_range_requests(self):
+        resp = self.get(self.student, "lesson-file", self.file.id, range="bytes=2-5")
+        self.assertEqual(resp.status_code, 206)
+        self.assertEqual((resp["Content-Range"], self.body(resp)), ("bytes 2-5/10", b"2345"))
+
+        resp = self.get(self.student, "lesson-file", self.file.id, range="bytes=-3")
+        self.assertEqual((resp.status_code, self.body(resp)), (206, b"789"))
+
+        resp = self.get(self.student, "lesson-file", self.file.id, range="bytes=10-")
+        self.assertEqual((resp.status_code, resp["Content-Range"]), (416, "bytes */10"))
+
+        # çok aralıklı istek tüm dosyayla cevaplanır
+        resp = self.get(self.student, "lesson-file", self.file.id, range="bytes=0-1,4-5")
+        self.assertEqual((resp.status_code, self.body(resp)), (200, b"0123456789"))
+
+    def test_range_on_empty_file_is_416(self):
+        empty = LessonFile.objects.create(lesson=self.file.lesson, file=SimpleUploadedFile("bos.txt", b""))
+        for header in ("bytes=0-", "bytes=-5"):
+            resp = self.get(self.student, "lesson-file", empty.id, range=header)
+            self.assertEqual((resp.status_code, resp["Content-Range"]), (416, "bytes */0"))
+        self.assertEqual(self.get(self.student, "lesson-file", empty.id).status_code, 200)
+
+
+# ---------------------------
+# Medya işleme (content/mediaproc.py)
+# ---------------------------
+
+class MediaProcessingTests(TempMediaTestCase):
+    def setUp(self):
+        teacher = User.objects.create_user("ogretmen", password="x", role=User.Role.TEACHER)
+        course = Course.objects.create(title="Matematik", owner=teacher)
+        self.lesson = Lesson.objects.create(course=course, title="Ders", order=STEP)
+
+    def png(self, color):
+        out = io.BytesIO()
+        Image.new("RGB", (40, 30), color).save(out, "PNG")
+        return SimpleUploadedFile("sekil.png", out.getvalue())
+
+    def queued(self, change):
+        with mock.patch("content.signals.process_media_task") as task:
+            with self.captureOnCommitCallbacks(execute=True):
+                change()
+        return [c.args for c in task.delay.call_args_list]
+
+    def test_preview_name_keeps_extension(self):
+        self.assertNotEqual(preview_name("topic_contents/notlar.pdf"), preview_name("topic_contents/notlar.mp4"))
+        self.assertNotEqual(preview_name("lesson_files/x.pdf"), preview_name("lesson_files/x.png"))
+
+    def test_only_file_changes_queue_processing(self):
+        obj = LessonFile(lesson=self.lesson, title="Şekil", file=self.png("red"))
+        self.assertEqual(self.queued(obj.save), [("content.LessonFile", obj.pk)])
+
+        obj = LessonFile.objects.get(pk=obj.pk)
+        obj.title = "Yeni başlık"
+        self.assertEqual(self.queued(obj.save), [])
+
+        obj.file = self.png("blue")
+        self.assertEqual(self.queued(obj.save), [("content.LessonFile", obj.pk)])
+
+    def test_shared_preview_survives_reupload(self):
+        a = LessonFile.objects.create(lesson=self.lesson, file=self.png("red"))
+        b = LessonFile.objects.create(lesson=self.lesson, file=self.png("red"))
+        process("content.LessonFile", a.pk)
+        process("content.LessonFile", b.pk)
+        a.refresh_from_db()
+        b.refresh_from_db()
+        shared = a.preview.name
+        self.assertEqual(b.preview.name, shared)
+
+        a.file = self.png("blue")
+        a.save()
+        process("content.LessonFile", a.pk)
+        a.refresh_from_db()
+        self.assertNotEqual(a.preview.name, shared)
+        self.assertTrue(default_storage.exists(shared))
+
+        # son kullanan da değişince eski önizleme silinir
+        b.file = self.png("green")
+        b.save()
+        process("content.LessonFile", b.pk)
+        self.assertFalse(default_storage.exists(shared))
@@ -0,0 +1,93 @@
+# content/tree.py
+"""
+TopicTemplate için materialized path yardımcıları.
+
+path  : kökten düğüme kadar id'ler, "/" ile ayrılmış ve "/" ile biten
+        (örn. "12/45/301/")
+depth : kök = 0
+
+- alt ağaç  : path__startswith=node.path
+- ataları   : id__in=node.ancestor_ids()
+- derinlik  : depth=<n>
+"""
+
+PATH_SEP = "/"
+
+
+def make_path(parent_path: str, pk: int) -> str:
+    return f"{parent_path or ''}{pk}{PATH_SEP}"
+
+
+def path_ids(path: str):
+    return [int(x) for x in (path or "").split(PATH_SEP) if x]
+
+
+def compute_paths(rows):
+    """
+    rows: (id, parent_id) çiftleri.
+    Dönüş: {id: (path, depth)}
+    Tek geçişte, DB'ye dokunmadan hesaplar (parent zinciri döngüsel ise
+    o düğümü kök kabul eder).
+    """
+    parent_of = dict(rows)
+    out = {}
+
+    def resolve(pk, seen=()):
+        if pk in out:
+            return out[pk]
+        parent_id = parent_of.get(pk)
+        if not parent_id or parent_id not in parent_of or parent_id in seen:
+            out[pk] = (make_path("", pk), 0)
+        else:
+            p_path, p_depth = resolve(parent_id, seen + (pk,))
+            out[pk] = (make_path(p_path, pk), p_depth + 1)
+        return out[pk]
+
+    for pk in parent_of:
+        resolve(pk)
+
+    return out
+
+
+def title_chains(rows):
+    """
+    rows: (id, parent_id, title) üçlüleri.
+    Dönüş: {id: ("Üst konu", "Alt konu", ...)}  (kökten düğüme başlık zinciri)
+    """
+    by_id = {pk: (parent_id, title) for pk, parent_id, title in rows}
+    out = {}
+
+    def resolve(pk, seen=()):
+        if pk in out:
+            return out[pk]
+        parent_id, title = by_id[pk]
+        if parent_id not in by_id or parent_id in seen:
+            out[pk] = (title,)
+        else:
+            out[pk] = resolve(parent_id, seen + (pk,)) + (title,)
+        return out[pk]
+
+    for pk in by_id:
+        resolve(pk)
+
+    return out
+
+
+def rebuild_paths(model, batch_size: int = 1000) -> int:
+    """
+    Tüm tablo için path/depth'i yeniden hesaplar (1 SELECT + toplu UPDATE).
+    model: TopicTemplate (migration'da tarihsel model de olabilir).
+    """
+    rows = list(model.objects.values_list("id", "parent_id", "path", "depth"))
+    computed = compute_paths([(r[0], r[1]) for r in rows])
+
+    changed = []
+    for pk, _, path, depth in rows:
+        new_path, new_depth = computed[pk]
+        if path != new_path or depth != new_depth:
+            changed.append(model(id=pk, path=new_path, depth=new_depth))
+
+    if changed:
+        model.objects.bulk_update(changed, ["path", "depth"], batch_size=batch_size)
+
+    return len(changed)
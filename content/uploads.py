@@ -0,0 +1,340 @@
+# content/uploads.py
+"""
+Devam ettirilebilir parçalı yükleme (tus benzeri).
+
+    create   -> UploadSession (offset = 0)
+    PATCH    -> Upload-Offset başlığındaki konumdan bir parça; parça istek
+                gövdesinden bellekte toplanmadan depolamaya akıtılır
+    HEAD     -> sunucudaki offset (bağlantı koparsa istemci buradan devam eder)
+    finalize -> oturum sahiplenilir, birleştirme Celery görevine verilir
+                (assemble): parçalar tek dosya olarak blob deposuna yazılır,
+                LessonFile / LessonVideo oluşturulur, parçalar silinir.
+                İstemci durumu (upload_status) sorgular.
+
+Parçalar default storage'a yazılır (yerel disk veya S3); uygulama sunucuları
+arasında paylaşılır, hangi node'a gelinirse gelinsin devam edilebilir.
+Offset ilerletme koşullu UPDATE'tir: aynı konuma iki istek gelirse biri kazanır.
+
+Birleştirme tek geçiştir: yerel diskte parçalar okunurken özetlenip geçici
+dosyaya yazılır; S3'te parçalar sunucu tarafında çok parçalı kopyayla
+(UploadPartCopy) birleştirilir, worker dosyayı sadece özet için bir kez okur.
+(Özet parça yüklenirken tutulamaz: hashlib durumu istekler / worker'lar
+arasında saklanamıyor.)
+"""
+import io
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .blobs import blob_storage, temp_name, upload_name
+from .models import LessonFile, LessonVideo, UploadSession
+
+
+# S3 çok parçalı yükleme sınırları (son parça hariç en az 5 MiB, en fazla 10000 parça)
+S3_MIN_PART = 5 * 1024 ** 2
+S3_MAX_PARTS = 10000
+
+
+class UploadConflict(Exception):
+    """İstemcinin offset'i sunucudakiyle uyuşmuyor (HEAD ile tekrar sorulmalı)."""
+
+
+def max_upload_size() -> int:
+    return getattr(settings, "UPLOAD_MAX_SIZE", 20 * 1024 ** 3)
+
+
+def max_chunk_size() -> int:
+    return getattr(settings, "UPLOAD_CHUNK_MAX_SIZE", 64 * 1024 ** 2)
+
+
+def assemble_timeout() -> timedelta:
+    """Bu süreden eski birleştirme sahipliği ölü sayılır (worker öldü), yeniden alınabilir."""
+    return timedelta(seconds=getattr(settings, "UPLOAD_ASSEMBLE_TIMEOUT", 2 * 60 * 60))
+
+
+def _part_name(session_id, offset) -> str:
+    return f"uploads/{session_id}/{offset:015d}.part"
+
+
+# ---------------------------
+# Akış yardımcıları
+# ---------------------------
+
+class _LimitedReader(io.RawIOBase):
+    """İstek gövdesinden en fazla `length` bayt okur; okunan miktarı sayar."""
+
+    def __init__(self, stream, length):
+        self._stream = stream
+        self._left = length
+        self.size = length
+        self.read_bytes = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buf):
+        if self._left <= 0:
+            return 0
+        data = self._stream.read(min(len(buf), self._left))
+        n = len(data)
+        buf[:n] = data
+        self._left -= n
+        self.read_bytes += n
+        return n
+
+
+class _PartsReader(io.RawIOBase):
+    """Parça nesnelerini sırayla tek bir dosya gibi okur (hepsi belleğe alınmaz)."""
+
+    def __init__(self, storage, names, size):
+        self._storage = storage
+        self._names = iter(names)
+        self._current = None
+        self.size = size
+
+    def readable(self):
+        return True
+
+    def readinto(self, buf):
+        while True:
+            if self._current is None:
+                name = next(self._names, None)
+                if name is None:
+                    return 0
+                self._current = self._storage.open(name, "rb")
+            data = self._current.read(len(buf))
+            if data:
+                buf[:len(data)] = data
+                return len(data)
+            self._current.close()
+            self._current = None
+
+    def close(self):
+        if self._current is not None:
+            self._current.close()
+        super().close()
+
+
+# ---------------------------
+# Protokol adımları
+# ---------------------------
+
+def create_session(user, lesson, kind, filename, size, title=""):
+    if kind not in UploadSession.Kind.values:
+        raise ValueError("kind file veya video olmalı")
+    if size <= 0 or size > max_upload_size():
+        raise ValueError(f"Dosya boyutu 1 bayt ile {max_upload_size()} bayt arasında olmalı")
+    filename = (filename or "").replace("\\", "/").rsplit("/", 1)[-1].strip()
+    if not filename:
+        raise ValueError("Dosya adı gerekli")
+
+    return UploadSession.objects.create(
+        user=user, lesson=lesson, kind=kind, filename=filename[:255], size=size, title=title[:200],
+    )
+
+
+def write_chunk(session, offset: int, stream, length: int) -> int:
+    """
+    Parçayı depolamaya yazar ve offset'i ilerletir. Dönüş: yeni offset.
+    Eksik gelen (kopan) parça atılır; istemci aynı offset'ten tekrar gönderir.
+    """
+    if session.completed_at:
+        raise UploadConflict("Yükleme zaten tamamlandı")
+    if offset != session.offset:
+        raise UploadConflict(f"Beklenen offset {session.offset}")
+    if length <= 0 or length > max_chunk_size():
+        raise ValueError(f"Parça boyutu 1 bayt ile {max_chunk_size()} bayt arasında olmalı")
+    if offset + length > session.size:
+        raise ValueError("Parça dosya boyutunu aşıyor")
+
+    # aynı konuma eşzamanlı bir istek yazıyor olabilir: ad çakışırsa depo yeni ad
+    # verir (parçanın gerçek adı session.parts'ta), kazananın parçasına dokunulmaz
+    name = _part_name(session.id, offset)
+    reader = _LimitedReader(stream, length)
+    saved = default_storage.save(name, File(reader, name=name))
+    if reader.read_bytes != length:
+        default_storage.delete(saved)
+        raise ValueError("Parça eksik geldi; aynı offset'ten tekrar gönderin")
+
+    parts = session.parts + [[offset, length, saved]]
+    updated = UploadSession.objects.filter(id=session.id, offset=offset, completed_at__isnull=True).update(
+        offset=offset + length, parts=parts, updated_at=timezone.now(),
+    )
+    if not updated:
+        # aynı konuma başka bir istek önce yazdı
+        default_storage.delete(saved)
+        raise UploadConflict("Offset başka bir istekle ilerledi")
+
+    session.offset, session.parts = offset + length, parts
+    return session.offset
+
+
+def finalize(session):
+    """
+    Oturumu sahiplenir ve birleştirmeyi kuyruğa verir (commit sonrası).
+
+    Sahiplik koşullu UPDATE'tir (completed_at): ikinci bir finalize ve yeni
+    parçalar reddedilir. Sahibi ölmüş (assemble_timeout'tan eski) bir
+    birleştirme yeniden sahiplenilebilir; parçalar yerinde durur.
+    """
+    from .tasks import assemble_upload_task
+
+    if session.result_id:
+        raise UploadConflict("Yükleme zaten tamamlandı")
+    if session.offset != session.size:
+        raise UploadConflict(f"Eksik yükleme: {session.offset}/{session.size}")
+
+    now = timezone.now()
+    claimed = (
+        UploadSession.objects
+        .filter(id=session.id, offset=session.size, result_id__isnull=True)
+        .filter(Q(completed_at__isnull=True) | Q(completed_at__lt=now - assemble_timeout()))
+        .update(completed_at=now, error="", updated_at=now)
+    )
+    if not claimed:
+        raise UploadConflict("Yükleme zaten birleştiriliyor")
+
+    session.completed_at, session.error = now, ""
+    session_id = str(session.id)
+    transaction.on_commit(lambda: assemble_upload_task.delay(session_id))
+    return session
+
+
+def assemble(session_id):
+    """
+    Dönüş: oluşturulan LessonFile / LessonVideo (oturum sahiplenilmemişse /
+    iptal edildiyse / zaten bittiyse None).
+
+    Birleştirme (GB'larca okuma / yazma) transaction dışında yapılır; kayıt
+    satırı kısa bir transaction'da yazılır. Hata olursa sahiplik bırakılır,
+    error yazılır, istemci tekrar dener. Sahiplik bu arada başkasına geçtiyse
+    (ölü sayılıp yeniden alındı) kayıt geri alınır.
+    """
+    session = UploadSession.objects.filter(id=session_id).first()
+    if session is None or session.completed_at is None or session.result_id is not None:
+        return None
+    claimed_at = session.completed_at
+    mine = UploadSession.objects.filter(id=session.id, completed_at=claimed_at, result_id__isnull=True)
+
+    names = [name for _, _, name in sorted(session.parts)]
+    if session.kind == UploadSession.Kind.VIDEO:
+        obj = LessonVideo(lesson_id=session.lesson_id, title=session.title)
+        attname = "video"
+    else:
+        obj = LessonFile(lesson_id=session.lesson_id, title=session.title)
+        attname = "file"
+    obj.original_name = upload_name(session.filename)
+
+    try:
+        setattr(obj, attname, _assemble_file(session, names))
+        with transaction.atomic():
+            obj.save()
+            if not mine.update(parts=[], result_id=obj.id, error=""):
+                raise UploadConflict("Birleştirme başka bir işlemle sürüyor")
+    except Exception:
+        mine.update(completed_at=None, error="Dosya birleştirilemedi; tekrar deneyin")
+        raise
+
+    _delete_parts(names)
+    return obj
+
+
+def _assemble_file(session, names) -> str:
+    """Parçaları blob deposuna tek dosya olarak yazar. Dönüş: blob adı."""
+    storage = blob_storage()
+    if _can_compose(default_storage, session.parts):
+        temp = temp_name()
+        _compose_s3(default_storage, names, temp)
+        return storage.adopt(temp, session.filename)
+
+    reader = _PartsReader(default_storage, names, session.size)
+    try:
+        return storage.save(session.filename, File(reader, name=session.filename))
+    finally:
+        reader.close()
+
+
+def _can_compose(storage, parts) -> bool:
+    if getattr(storage, "bucket", None) is None or not parts or len(parts) > S3_MAX_PARTS:
+        return False
+    return all(length >= S3_MIN_PART for _, length, _ in sorted(parts)[:-1])
+
+
+def _compose_s3(storage, names, target):
+    """Parçalar S3'te sunucu tarafında tek nesnede birleştirilir (baytlar worker'dan geçmez)."""
+    from storages.utils import clean_name
+
+    def key(name):
+        return storage._normalize_name(clean_name(name))
+
+    client, bucket = storage.connection.meta.client, storage.bucket_name
+    upload_id = client.create_multipart_upload(Bucket=bucket, Key=key(target))["UploadId"]
+    try:
+        done = []
+        for number, name in enumerate(names, 1):
+            result = client.upload_part_copy(
+                Bucket=bucket, Key=key(target), UploadId=upload_id, PartNumber=number,
+                CopySource={"Bucket": bucket, "Key": key(name)},
+            )
+            done.append({"PartNumber": number, "ETag": result["CopyPartResult"]["ETag"]})
+        client.complete_multipart_upload(
+            Bucket=bucket, Key=key(target), UploadId=upload_id, MultipartUpload={"Parts": done},
+        )
+    except Exception:
+        client.abort_multipart_upload(Bucket=bucket, Key=key(target), UploadId=upload_id)
+        raise
+
+
+def upload_status(session) -> dict:
+    """İstemcinin finalize sonrası sorguladığı durum."""
+    if session.result_id:
+        return {"state": "done", "id": session.result_id}
+    if session.completed_at:
+        if session.completed_at < timezone.now() - assemble_timeout():
+            return {"state": "failed", "error": "Birleştirme yarıda kesildi; tekrar deneyin"}
+        return {"state": "assembling"}
+    if session.error:
+        return {"state": "failed", "error": session.error}
+    return {"state": "uploading", "offset": session.offset, "size": session.size}
+
+
+def _delete_parts(names):
+    for name in names:
+        default_storage.delete(name)
+
+
+def discard(session):
+    _delete_parts(name for _, _, name in session.parts)
+    # yarıda kesilmiş (kaydı yazılamamış) parçalar
+    try:
+        _, leftovers = default_storage.listdir(f"uploads/{session.id}")
+    except (FileNotFoundError, NotImplementedError):
+        leftovers = []
+    _delete_parts(f"uploads/{session.id}/{name}" for name in leftovers)
+    session.delete()
+
+
+def purge_stale(older_than_hours: int = 24) -> int:
+    """
+    Yarım kalmış eski oturumlar ve tamamlanmış oturum kayıtları silinir.
+    Birleştirmesi yarıda kalan (worker öldü) oturumların sahipliği bırakılır,
+    parçaları silinmez: istemci finalize'ı tekrarlayabilir; yine gelmezse
+    oturum sonraki süpürmelerde yarım kalmış olarak silinir.
+    """
+    now = timezone.now()
+    UploadSession.objects.filter(
+        completed_at__lt=now - assemble_timeout(), result_id__isnull=True,
+    ).exclude(parts=[]).update(completed_at=None, error="Birleştirme yarıda kesildi; tekrar deneyin", updated_at=now)
+
+    stale = UploadSession.objects.filter(updated_at__lt=now - timedelta(hours=older_than_hours))
+    n = 0
+    for session in stale.filter(completed_at__isnull=True).only("id", "parts").iterator():
+        discard(session)
+        n += 1
+    stale.filter(completed_at__isnull=False, parts=[]).delete()
+    return n
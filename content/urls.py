@@ -1,22 +1,26 @@
 from django.urls import path
 
 from .views import (
-    lesson_detail, lesson_complete,
+    lesson_detail, lesson_complete, protected_media,
     topics_home, topic_page,
     daily_plan_page, daily_plan_assign,
 )
 
 from .api import (
     topics_tree, topic_detail, topic_video_progress, topic_test_submit,
+    topic_adaptive_next,
     my_reviews_today, review_mark_done,
     my_daily_plan, daily_plan_item_done,
     my_stats,
+    leaderboard,
 )
 
 urlpatterns = [
     # Lessons (mevcut)
     path("lessons/<int:lesson_id>/", lesson_detail, name="lesson_detail"),
     path("lessons/<int:lesson_id>/complete/", lesson_complete, name="lesson_complete"),
+    path("files/<slug:kind>/<int:pk>/", protected_media, name="protected_media"),
+    path("files/<slug:kind>/<int:pk>/preview/", protected_media, {"preview": True}, name="protected_media_preview"),
 
     # Sprint-1 UI: Konu ağacı + konu sayfası
     path("topics/", topics_home, name="topics_home"),
@@ -31,6 +35,7 @@ urlpatterns = [
     path("api/topics/<int:topic_id>", topic_detail, name="api_topic_detail"),
     path("api/topics/<int:topic_id>/video-progress", topic_video_progress, name="api_topic_video_progress"),
     path("api/topics/<int:topic_id>/test-submit", topic_test_submit, name="api_topic_test_submit"),
+    path("api/topics/<int:topic_id>/adaptive", topic_adaptive_next, name="api_topic_adaptive"),
 
     # Sprint-2 API
     path("api/reviews/today", my_reviews_today, name="api_reviews_today"),
@@ -42,4 +47,7 @@ urlpatterns = [
 
     # Sprint-3 Gamification API (XP/Streak)
     path("api/me/stats", my_stats, name="api_my_stats"),
+    path("api/leaderboard/global", leaderboard, {"scope": "global"}, name="api_leaderboard_global"),
+    path("api/leaderboard/grade/<int:scope_id>", leaderboard, {"scope": "grade"}, name="api_leaderboard_grade"),
+    path("api/leaderboard/course/<int:scope_id>", leaderboard, {"scope": "course"}, name="api_leaderboard_course"),
 ]
@@ -3,11 +3,15 @@ from django.contrib.auth.decorators import login_required
 from django.utils import timezone
 from django.contrib import messages
 from django.contrib.auth import get_user_model
+from django.core.exceptions import PermissionDenied
 
 from courses.models import Enrollment
 from content.models import Lesson, LessonProgress
 from .models import Grade, Subject, TopicTemplate, DailyPlan, DailyPlanItem
 from .forms import DailyPlanAssignForm
+from .services import bump_plan_counters
+from .course_progress import lesson_completed
+from .media import resolve_file, serve
 
 User = get_user_model()
 
@@ -46,13 +50,37 @@ def lesson_complete(request, lesson_id):
     if not Enrollment.objects.filter(course=lesson.course, user=user).exists():
         return render(request, "courses/forbidden.html", status=403)
 
-    prog, _ = LessonProgress.objects.get_or_create(lesson=lesson, user=user)
-    prog.completed = True
-    prog.completed_at = timezone.now()
-    prog.save()
+    now = timezone.now()
+    prog, created = LessonProgress.objects.get_or_create(
+        lesson=lesson, user=user, defaults={"completed": True, "completed_at": now}
+    )
+    # sadece tamamlanmadı -> tamamlandı geçişi özeti kaydırır (çift tık saymaz)
+    flipped = created or LessonProgress.objects.filter(id=prog.id, completed=False).update(
+        completed=True, completed_at=now
+    )
+    if flipped:
+        lesson_completed(user.id, lesson, now)
     return redirect("lesson_detail", lesson_id=lesson_id)
 
 
+# ---------------------------
+# Protected media
+# ---------------------------
+
+@login_required
+def protected_media(request, kind, pk, preview=False):
+    """
+    /files/<lesson-file|lesson-video|topic-content|message>/<id>/
+    /files/<lesson-file|lesson-video|topic-content>/<id>/preview/ (önizleme görseli)
+    Kayıt / ödeme / konuşma kontrolünden sonra dosya (content/media.py).
+    """
+    try:
+        f = resolve_file(request.user, kind, pk, preview=preview)
+    except PermissionDenied:
+        return render(request, "courses/forbidden.html", status=403)
+    return serve(request, f)
+
+
 # ---------------------------
 # Topics UI
 # ---------------------------
@@ -137,6 +165,7 @@ def daily_plan_assign(request):
                 topic=topic,
                 order=last_order + 1
             )
+            bump_plan_counters(plan.id, added=1)
 
             messages.success(request, f"{student.username} için {date} tarihli plana görev eklendi.")
             return redirect("daily_plan_assign")
@@ -0,0 +1,25 @@
+# Generated by Django 6.0 on 2026-10-18 12:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0015_curriculum_cursor'),
+        ('courses', '0002_course_is_paid_course_price_try'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='grade',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='courses', to='content.grade'),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='subject',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='courses', to='content.subject'),
+        ),
+    ]
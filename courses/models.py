@@ -9,6 +9,10 @@ class Course(models.Model):
     price_try = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     is_paid = models.BooleanField(default=False)
 
+    # Kursun müfredat kapsamı (günlük plandaki "yeni konu" bu sınıf/dersten seçilir)
+    grade = models.ForeignKey("content.Grade", null=True, blank=True, on_delete=models.SET_NULL, related_name="courses")
+    subject = models.ForeignKey("content.Subject", null=True, blank=True, on_delete=models.SET_NULL, related_name="courses")
+
     def __str__(self):
         return self.title
 
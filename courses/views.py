@@ -4,6 +4,7 @@ from django.contrib.auth.decorators import login_required
 from courses.models import Course, Enrollment
 from payments.models import PurchaseRequest
 from content.models import LessonProgress
+from content.course_progress import summaries_for
 
 
 @login_required
@@ -26,33 +27,28 @@ def course_detail(request, course_id):
             if not ok:
                 return render(request, "courses/paywall.html", {"course": course}, status=402)
 
-    lessons = course.lessons.order_by("order")
+    lessons = list(course.lessons.order_by("order", "id"))
 
     # ===== Öğrenci ilerleme =====
     progress_map = {}
     completed_ids = set()
     completed_count = 0
-    total_lessons = lessons.count()
+    total_lessons = len(lessons)
+    percent = 0
+    next_lesson = None
 
     if user.role == "STUDENT":
-        qs = LessonProgress.objects.filter(user=user, lesson__course=course)
-        progress_map = {p.lesson_id: p.completed for p in qs}
+        qs = LessonProgress.objects.filter(user=user, lesson__course=course).values_list("lesson_id", "completed")
+        progress_map = dict(qs)
         completed_ids = {lid for lid, done in progress_map.items() if done}
-        completed_count = len(completed_ids)
 
-    percent = int((completed_count / total_lessons) * 100) if total_lessons else 0
-    
-        # ✅ Devam Et: ilk tamamlanmamış ders
-    next_lesson = None
-    if user.role == "STUDENT":
-        next_lesson = (
-            lessons.exclude(id__in=completed_ids)
-            .order_by("order", "id")
-            .first()
-        )
-        # hepsi bittiyse ilk dersi göster
-        if not next_lesson:
-            next_lesson = lessons.order_by("order", "id").first()
+        # sayaçlar ve "Devam Et" dersi özet tablosundan (yeniden sayılmaz)
+        summary = summaries_for(user.id, [course.id]).get(course.id)
+        if summary:
+            completed_count = summary.done_count
+            total_lessons = summary.total_lessons
+            percent = summary.percent
+            next_lesson = next((l for l in lessons if l.id == summary.next_lesson_id), None)
 
     return render(request, "courses/course_detail.html", {
         "course": course,
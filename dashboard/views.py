@@ -1,9 +1,8 @@
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
-from django.db.models import Count
 
-from courses.models import Course, Enrollment
-from content.models import LessonProgress
+from courses.models import Course
+from content.course_progress import summaries_for
 
 @login_required
 def dashboard(request):
@@ -21,50 +20,19 @@ def dashboard(request):
     continue_lesson_by_course = {}
 
     if user.role == "STUDENT":
-        # toplam ders sayıları (kurs bazlı)
-        total_by_course = {c.id: c.lessons.count() for c in courses}
-
-        # tamamlanan ders sayıları (kurs bazlı)
-        done_qs = (
-            LessonProgress.objects
-            .filter(user=user, completed=True, lesson__course__in=courses)
-            .values("lesson__course_id")
-            .annotate(done=Count("id"))
-        )
-        done_by_course = {row["lesson__course_id"]: row["done"] for row in done_qs}
-
-        # Continue: ilk tamamlanmamış ders
-        for c in courses:
-            total = total_by_course.get(c.id, 0)
-            done = done_by_course.get(c.id, 0)
-            percent = int((done / total) * 100) if total else 0
-
-            progress_by_course[c.id] = {
-                "done": done,
-                "total": total,
-                "percent": percent,
-                "remaining": max(0, total - done),
+        courses = list(courses)
+
+        # tüm kursların ilerlemesi özet tablosundan tek sorguda
+        for course_id, s in summaries_for(user.id, [c.id for c in courses]).items():
+            progress_by_course[course_id] = {
+                "done": s.done_count,
+                "total": s.total_lessons,
+                "percent": s.percent,
+                "remaining": s.remaining,
             }
-
-            # ilk tamamlanmamış dersi bul
-            completed_ids = set(
-                LessonProgress.objects
-                .filter(user=user, lesson__course=c, completed=True)
-                .values_list("lesson_id", flat=True)
-            )
-
-            next_lesson = (
-                c.lessons
-                .exclude(id__in=completed_ids)
-                .order_by("order", "id")
-                .first()
-            )
-
-            # hepsi tamamlandıysa ilk dersi göster
-            if not next_lesson:
-                next_lesson = c.lessons.order_by("order", "id").first()
-
-            continue_lesson_by_course[c.id] = next_lesson
+            # şablon sadece id kullanıyor; ders satırı ayrıca çekilmez
+            if s.next_lesson_id:
+                continue_lesson_by_course[course_id] = {"id": s.next_lesson_id}
 
     return render(request, "dashboard/dashboard.html", {
         "courses": courses,
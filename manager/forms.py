@@ -43,10 +43,34 @@ class AssignTeacherForm(forms.Form):
     )
 
 
+class CourseCloneForm(forms.Form):
+    title = forms.CharField(label="Yeni kurs adı", max_length=180)
+    copies = forms.IntegerField(
+        label="Kopya sayısı (şube)", min_value=1, max_value=50, initial=1,
+        help_text="1'den fazlaysa adların sonuna \"- Şube N\" eklenir.",
+    )
+    teacher = forms.ModelChoiceField(
+        queryset=User.objects.filter(role="TEACHER").order_by("username"),
+        label="Öğretmen", required=False,
+        help_text="Boş bırakılırsa kaynak kursun öğretmeni.",
+    )
+
+
 class EnrollStudentForm(forms.Form):
     username = forms.CharField(label="Öğrenci kullanıcı adı", max_length=150)
 
 
+class QuestionBankImportForm(forms.Form):
+    file = forms.FileField(label="Soru dosyası (.csv / .xlsx)")
+    dry_run = forms.BooleanField(label="Sadece doğrula (kaydetme)", required=False)
+
+    def clean_file(self):
+        f = self.cleaned_data["file"]
+        if not f.name.lower().endswith((".csv", ".xlsx")):
+            raise forms.ValidationError("Sadece .csv veya .xlsx yükleyebilirsin.")
+        return f
+
+
 class ReadyLessonsForm(forms.Form):
     grade = forms.ModelChoiceField(
         queryset=Grade.objects.order_by("number"),
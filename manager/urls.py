@@ -9,6 +9,11 @@ urlpatterns = [
     path("manager/courses/<int:course_id>/assign-teacher/", views.manager_assign_teacher, name="manager_assign_teacher"),
     path("manager/courses/<int:course_id>/students/", views.manager_course_students, name="manager_course_students"),
     path("manager/courses/<int:course_id>/ready-lessons/", views.manager_ready_lessons, name="manager_ready_lessons"),
+    path("manager/courses/<int:course_id>/clone/", views.manager_course_clone, name="manager_course_clone"),
+
+    # Soru bankası (TopicQuestion) toplu içe/dışa aktarım
+    path("manager/question-bank/", views.manager_question_bank, name="manager_question_bank"),
+    path("manager/question-bank/export/", views.manager_question_bank_export, name="manager_question_bank_export"),
 
     # ✅ Kullanıcı Yönetimi
     path("manager/users/", views.manager_users, name="manager_users"),
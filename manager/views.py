@@ -1,3 +1,4 @@
+from django.http import FileResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
@@ -6,11 +7,18 @@ from django.db import transaction
 
 from accounts.utils import admin_required
 from courses.models import Course, Enrollment
-from content.models import Lesson, TopicTemplate
+from content.models import Grade, Subject
+from content.course_clone import clone_course, section_titles
+from content.ready_lessons import apply_plan, compute_plan
+from content.question_bank import (
+    QuestionImportError, import_questions, iter_rows,
+    export_queryset, iter_export_rows, iter_csv, write_xlsx,
+)
 from parents.models import ParentStudent
 
 from .forms import (
-    CourseCreateForm, AssignTeacherForm, EnrollStudentForm, ReadyLessonsForm,
+    CourseCreateForm, AssignTeacherForm, CourseCloneForm, EnrollStudentForm, ReadyLessonsForm,
+    QuestionBankImportForm,
     AdminUserCreateForm, AdminUserEditForm,
     StudentWithParentCreateForm,
 )
@@ -65,6 +73,22 @@ def manager_assign_teacher(request, course_id):
     return render(request, "manager/assign_teacher.html", {"course": course, "form": form})
 
 
+@login_required
+@admin_required
+def manager_course_clone(request, course_id):
+    """Dersler, dosya / video kayıtları, sınavlar ve sorularla birlikte kopya (content/course_clone.py)."""
+    course = get_object_or_404(Course, id=course_id)
+    form = CourseCloneForm(request.POST or None, initial={"title": f"{course.title} (kopya)"})
+
+    if request.method == "POST" and form.is_valid():
+        titles = section_titles(form.cleaned_data["title"], form.cleaned_data["copies"])
+        clones = clone_course(course, titles, owner=form.cleaned_data["teacher"])
+        messages.success(request, f"{len(clones)} kurs oluşturuldu.")
+        return redirect("manager_courses")
+
+    return render(request, "manager/course_clone.html", {"course": course, "form": form})
+
+
 @login_required
 @admin_required
 def manager_course_students(request, course_id):
@@ -104,42 +128,78 @@ def manager_course_students(request, course_id):
 def manager_ready_lessons(request, course_id):
     course = get_object_or_404(Course, id=course_id)
     form = ReadyLessonsForm(request.POST or None)
+    plan = None
 
     if request.method == "POST" and form.is_valid():
         grade = form.cleaned_data["grade"]
         subject = form.cleaned_data["subject"]
+        plan = compute_plan(course, grade, subject)
 
-        parents = TopicTemplate.objects.filter(
-            grade=grade, subject=subject, parent__isnull=True
-        ).order_by("order", "id")
-
-        created = 0
-        for p in parents:
-            _, created_parent = Lesson.objects.get_or_create(
-                course=course,
-                title=p.title,
-                defaults={"order": p.order * 100},
-            )
-            if created_parent:
-                created += 1
-
-            for c in p.children.all().order_by("order", "id"):
-                child_title = f"— {c.title}"
-                _, created_child = Lesson.objects.get_or_create(
-                    course=course,
-                    title=child_title,
-                    defaults={"order": (p.order * 100) + c.order},
-                )
-                if created_child:
-                    created += 1
+        if "preview" not in request.POST:
+            created = apply_plan(plan)
+            messages.success(request, f"{grade.number}. sınıf {subject.name} için {created} ders eklendi.")
+            return redirect("manager_courses")
 
-        course.grade = grade.number
-        course.save()
+    return render(request, "manager/ready_lessons.html", {"course": course, "form": form, "plan": plan})
 
-        messages.success(request, f"{grade.number}. sınıf {subject.name} için {created} ders eklendi.")
-        return redirect("manager_courses")
 
-    return render(request, "manager/ready_lessons.html", {"course": course, "form": form})
+# ---------------------------
+# Question bank (TopicQuestion) import / export
+# ---------------------------
+
+@login_required
+@admin_required
+def manager_question_bank(request):
+    form = QuestionBankImportForm(request.POST or None, request.FILES or None)
+    result = None
+
+    if request.method == "POST" and form.is_valid():
+        f = form.cleaned_data["file"]
+        try:
+            result = import_questions(iter_rows(f, f.name), dry_run=form.cleaned_data["dry_run"])
+        except QuestionImportError as e:
+            messages.error(request, str(e))
+        else:
+            if form.cleaned_data["dry_run"]:
+                messages.info(request, f"Doğrulama: {result['created']} soru eklenebilir.")
+            else:
+                messages.success(request, f"{result['created']} soru eklendi.")
+
+    return render(request, "manager/question_bank.html", {
+        "form": form,
+        "result": result,
+        "grades": Grade.objects.order_by("number"),
+        "subjects": Subject.objects.order_by("name"),
+    })
+
+
+@login_required
+@admin_required
+def manager_question_bank_export(request):
+    grade = (request.GET.get("grade") or "").strip()
+    subject = (request.GET.get("subject") or "").strip()
+    fmt = request.GET.get("format") or "csv"
+
+    qs = export_queryset(grade=int(grade) if grade.isdigit() else None, subject=subject or None)
+    rows = iter_export_rows(qs)
+
+    if fmt == "xlsx":
+        import tempfile
+
+        # write-only workbook geçici dosyaya yazılır, oradan parça parça gönderilir
+        tmp = tempfile.TemporaryFile()
+        write_xlsx(rows, tmp)
+        tmp.seek(0)
+        return FileResponse(
+            tmp,
+            as_attachment=True,
+            filename="soru_bankasi.xlsx",
+            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
+
+    resp = StreamingHttpResponse(iter_csv(rows), content_type="text/csv; charset=utf-8")
+    resp["Content-Disposition"] = 'attachment; filename="soru_bankasi.csv"'
+    return resp
 
 
 # ---------------------------
@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-18 13:20
+
+import content.blobs
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0004_message_deleted_at_message_is_deleted'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='message',
+            name='file',
+            field=models.FileField(blank=True, null=True, storage=content.blobs.blob_storage, upload_to='message_files/'),
+        ),
+    ]
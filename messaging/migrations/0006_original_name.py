@@ -0,0 +1,36 @@
+# Generated by Django 6.0 on 2026-10-18 13:33
+
+import os
+
+from django.db import migrations, models
+
+
+def fill_original_names(apps, schema_editor):
+    """Henüz blob deposuna taşınmamış eklerin adı (blobs/... adları özettir, atlanır)."""
+    Message = apps.get_model("messaging", "Message")
+    qs = Message.objects.exclude(file__startswith="blobs/").exclude(file="").exclude(file__isnull=True)
+    changed = []
+    for msg in qs.only("id", "file").iterator():
+        msg.original_name = os.path.basename(msg.file.name)[:255]
+        changed.append(msg)
+        if len(changed) >= 1000:
+            Message.objects.bulk_update(changed, ["original_name"])
+            changed = []
+    if changed:
+        Message.objects.bulk_update(changed, ["original_name"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0005_blob_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='original_name',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.RunPython(fill_original_names, migrations.RunPython.noop),
+    ]
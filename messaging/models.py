@@ -1,6 +1,7 @@
 from django.db import models
 from django.conf import settings
 from courses.models import Course
+from content.blobs import BlobFileMixin, blob_storage
 
 
 class Conversation(models.Model):
@@ -17,11 +18,12 @@ class Conversation(models.Model):
         return f"{self.course.title} | {self.student.username} -> {self.teacher.username}"
 
 
-class Message(models.Model):
+class Message(BlobFileMixin, models.Model):
     conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name="messages")
     sender = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     text = models.TextField(blank=True)
-    file = models.FileField(upload_to="message_files/", null=True, blank=True)  # ✅ burada
+    file = models.FileField(upload_to="message_files/", null=True, blank=True, storage=blob_storage)  # ✅ burada
+    original_name = models.CharField(max_length=255, blank=True)  # depodaki ad içerik özeti
     created_at = models.DateTimeField(auto_now_add=True)
     read_by_teacher = models.BooleanField(default=False)
     read_by_student = models.BooleanField(default=False)
@@ -0,0 +1,58 @@
+# quiz/answers.py
+"""
+Sınav cevapları tembel tutulur: exam_start sadece Attempt oluşturur, Answer
+satırı öğrenci bir şık seçince yazılır. Satırı olmayan soru boş sayılır.
+(Eski denemelerdeki boş "selected=None" satırları da aynı şekilde okunur.)
+
+- answer_sheet: soru sırasıyla cevap listesi; eksikler kaydedilmemiş boş
+  Answer nesneleri (şablonlar a.question / a.selected ile aynı kalır). 2 sorgu.
+- save_selections: seçimler tek bulk_create (upsert) ile yazılır.
+- grade: toplam = sınavdaki soru sayısı, doğru / yanlış tek sorgu.
+"""
+from django.db.models import Count, F, Q
+
+from .models import Answer
+
+
+def answer_sheet(attempt):
+    questions = list(attempt.exam.questions.order_by("order", "id"))
+    saved = {a.question_id: a for a in Answer.objects.filter(attempt=attempt)}
+
+    sheet = []
+    for q in questions:
+        a = saved.get(q.id) or Answer(attempt=attempt, question=q, selected=None)
+        a.question = q
+        sheet.append(a)
+    return sheet
+
+
+def save_selections(attempt, selections) -> int:
+    """
+    selections: {question_id: "A"|"B"|"C"|"D"}. Tek INSERT ... ON CONFLICT:
+    yeni cevaplar eklenir, var olanlar (eski boş satırlar dahil) güncellenir.
+    Dönüş: yazılan cevap sayısı.
+    """
+    valid = set(attempt.exam.questions.filter(id__in=selections).values_list("id", flat=True))
+    rows = [
+        Answer(attempt=attempt, question_id=qid, selected=sel)
+        for qid, sel in selections.items()
+        if qid in valid and sel in ("A", "B", "C", "D")
+    ]
+    if rows:
+        Answer.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["attempt", "question"],
+            update_fields=["selected"],
+        )
+    return len(rows)
+
+
+def grade(attempt):
+    """Dönüş: (toplam, doğru, yanlış). Satırı olmayan / boş cevap ne doğru ne yanlış."""
+    total = attempt.exam.questions.count()
+    counts = Answer.objects.filter(attempt=attempt, selected__isnull=False).aggregate(
+        correct=Count("id", filter=Q(selected=F("question__correct"))),
+        answered=Count("id"),
+    )
+    return total, counts["correct"], counts["answered"] - counts["correct"]
@@ -1,3 +1,70 @@
+from datetime import timedelta
+
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from courses.models import Course, Enrollment
+
+from .answers import answer_sheet, grade, save_selections
+from .models import Answer, Attempt, Exam, Question
+
+
+class AnswerTests(TestCase):
+    def setUp(self):
+        teacher = User.objects.create_user("ogretmen", password="x", role=User.Role.TEACHER)
+        self.student = User.objects.create_user("ogrenci", password="x")
+        course = Course.objects.create(title="Matematik", owner=teacher)
+        Enrollment.objects.create(course=course, user=self.student)
+        self.exam = Exam.objects.create(course=course, title="Deneme")
+        self.q1, self.q2, self.q3 = [self.question(self.exam, order, correct) for order, correct in enumerate("ABC", 1)]
+        self.attempt = Attempt.objects.create(
+            exam=self.exam, user=self.student, deadline_at=timezone.now() + timedelta(minutes=20),
+        )
+
+    def question(self, exam, order, correct="A"):
+        return Question.objects.create(
+            exam=exam, text=f"Soru {order}", order=order, correct=correct,
+            choice_a="a", choice_b="b", choice_c="c", choice_d="d",
+        )
+
+    def test_attempt_without_answer_rows(self):
+        sheet = answer_sheet(self.attempt)
+        self.assertEqual([a.question for a in sheet], [self.q1, self.q2, self.q3])
+        self.assertTrue(all(a.pk is None and a.selected is None for a in sheet))
+        self.assertEqual(grade(self.attempt), (3, 0, 0))
+
+    def test_old_blank_rows_are_overwritten(self):
+        # eski denemeler exam_start'ta her soru için boş satır açıyordu
+        Answer.objects.bulk_create([Answer(attempt=self.attempt, question=q) for q in (self.q1, self.q2, self.q3)])
+
+        self.assertEqual(save_selections(self.attempt, {self.q1.id: "A", self.q2.id: "D"}), 2)
+        self.assertEqual(Answer.objects.filter(attempt=self.attempt).count(), 3)
+        self.assertEqual([a.selected for a in answer_sheet(self.attempt)], ["A", "D", None])
+        self.assertEqual(grade(self.attempt), (3, 1, 1))
+
+    def test_invalid_selections_are_ignored(self):
+        other = Exam.objects.create(course=self.exam.course, title="Başka")
+        foreign = self.question(other, 1)
+        n = save_selections(self.attempt, {foreign.id: "A", self.q1.id: "E", self.q2.id: "B"})
+        self.assertEqual(n, 1)
+        self.assertFalse(Answer.objects.filter(question=foreign).exists())
+        self.assertEqual(grade(self.attempt), (3, 1, 0))
+
+    def test_take_ignores_questions_from_other_exam(self):
+        other = Exam.objects.create(course=self.exam.course, title="Başka")
+        foreign = self.question(other, 1)
+        self.client.force_login(self.student)
+
+        resp = self.client.post(reverse("exam_take", args=[self.attempt.id]), {
+            f"q_{self.q1.id}": "A",
+            f"q_{foreign.id}": "A",
+            "q_abc": "B",
+        })
+        self.assertRedirects(resp, reverse("exam_finish", args=[self.attempt.id]), fetch_redirect_response=False)
+        self.assertEqual(list(Answer.objects.values_list("question_id", "selected")), [(self.q1.id, "A")])
 
-# Create your tests here.
+        self.client.get(reverse("exam_finish", args=[self.attempt.id]))
+        self.attempt.refresh_from_db()
+        self.assertEqual((self.attempt.correct_count, self.attempt.wrong_count, self.attempt.score), (1, 0, 33.33))
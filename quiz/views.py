@@ -5,7 +5,8 @@ from django.contrib.auth.decorators import login_required
 from django.utils import timezone
 
 from courses.models import Enrollment
-from .models import Exam, Attempt, Answer
+from .answers import answer_sheet, grade, save_selections
+from .models import Exam, Attempt
 
 
 @login_required
@@ -21,17 +22,13 @@ def exam_start(request, exam_id):
     if not Enrollment.objects.filter(course=exam.course, user=user).exists():
         return render(request, "courses/forbidden.html", status=403)
 
-    # Attempt oluştur + deadline ayarla
+    # Attempt oluştur + deadline ayarla; cevap satırları seçim yapılınca yazılır (quiz/answers.py)
     attempt = Attempt.objects.create(
         exam=exam,
         user=user,
         deadline_at=timezone.now() + timedelta(minutes=exam.duration_minutes),
     )
 
-    # Her soru için boş answer oluştur
-    for q in exam.questions.all():
-        Answer.objects.create(attempt=attempt, question=q, selected=None)
-
     return redirect("exam_take", attempt_id=attempt.id)
 
 
@@ -53,17 +50,17 @@ def exam_take(request, attempt_id):
         if attempt.deadline_at and timezone.now() >= attempt.deadline_at:
             return redirect("exam_finish", attempt_id=attempt.id)
 
-        # Seçimleri kaydet
-        for ans in attempt.answers.select_related("question").all():
-            key = f"q_{ans.question.id}"
-            sel = request.POST.get(key)
-            if sel in ("A", "B", "C", "D"):
-                ans.selected = sel
-                ans.save()
+        # Seçimleri kaydet (tek upsert)
+        selections = {
+            int(key[2:]): sel
+            for key, sel in request.POST.items()
+            if key.startswith("q_") and key[2:].isdigit()
+        }
+        save_selections(attempt, selections)
 
         return redirect("exam_finish", attempt_id=attempt.id)
 
-    answers = attempt.answers.select_related("question").all()
+    answers = answer_sheet(attempt)
     return render(request, "quiz/exam_take.html", {"attempt": attempt, "answers": answers})
 
 
@@ -79,18 +76,8 @@ def exam_finish(request, attempt_id):
     if attempt.finished_at is not None:
         return render(request, "quiz/exam_result.html", {"attempt": attempt})
 
-    # Puan hesapla
-    total = attempt.answers.count()
-    correct = 0
-    wrong = 0
-
-    for ans in attempt.answers.select_related("question").all():
-        if ans.selected is None:
-            continue
-        if ans.selected == ans.question.correct:
-            correct += 1
-        else:
-            wrong += 1
+    # Puan hesapla: toplam sınavdaki soru sayısı, cevapsız soru boş sayılır
+    total, correct, wrong = grade(attempt)
 
     score = (correct / total) * 100 if total > 0 else 0
 
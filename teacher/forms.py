@@ -10,12 +10,13 @@ from content.models import Grade, Subject
 class CourseForm(forms.ModelForm):
     class Meta:
         model = Course
-        fields = ["title", "description"]
+        fields = ["title", "description", "grade", "subject"]
 
 class LessonForm(forms.ModelForm):
     class Meta:
         model = Lesson
-        fields = ["title", "body", "order"]
+        # sıra kurs sayfasından değişir (content/ordering.py)
+        fields = ["title", "body"]
 
 class LessonFileForm(forms.ModelForm):
     class Meta:
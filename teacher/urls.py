@@ -12,6 +12,11 @@ urlpatterns = [
     path("lesson/<int:lesson_id>/file/new/", views.file_new, name="teacher_file_new"),
     path("lesson/<int:lesson_id>/video/new/", views.video_new, name="teacher_video_new"),
 
+    # Büyük dosyalar: devam ettirilebilir parçalı yükleme
+    path("lesson/<int:lesson_id>/uploads/", views.upload_create, name="teacher_upload_create"),
+    path("uploads/<uuid:upload_id>/", views.upload_detail, name="teacher_upload"),
+    path("uploads/<uuid:upload_id>/finalize/", views.upload_finalize, name="teacher_upload_finalize"),
+
     # Sınav
     path("course/<int:course_id>/exam/new/", views.exam_new, name="teacher_exam_new"),
     path("exam/<int:exam_id>/question/new/", views.question_new, name="teacher_question_new"),
@@ -49,4 +54,5 @@ urlpatterns = [
     path("lesson/<int:lesson_id>/edit/", views.edit_lesson, name="teacher_lesson_edit"),
     path("lesson/<int:lesson_id>/delete/", views.delete_lesson, name="teacher_lesson_delete"),
     path("course/<int:course_id>/lessons/reorder/", views.reorder_lessons, name="teacher_reorder_lessons"),
+    path("lesson/<int:lesson_id>/move/", views.lesson_move, name="teacher_lesson_move"),
 ]
@@ -4,14 +4,19 @@ from django.contrib import messages
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.db.models import Q, Avg, Max, Count, OuterRef, Subquery
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
-from django.views.decorators.http import require_POST
+from django.urls import reverse
+from django.views.decorators.http import require_POST, require_http_methods
 
 from accounts.utils import admin_required, teacher_required
 from courses.models import Course, Enrollment
-from content.models import Lesson, TopicTemplate, LessonProgress
-from quiz.models import Exam, Attempt, Answer
+from content.models import Lesson, LessonProgress, UploadSession
+from content.ordering import append_key, move, reorder
+from content.ready_lessons import apply_plan, compute_plan
+from content.uploads import UploadConflict, create_session, discard, finalize, upload_status, write_chunk
+from quiz.answers import answer_sheet
+from quiz.models import Exam, Attempt
 from payments.models import PurchaseRequest
 from messaging.models import Conversation
 
@@ -78,6 +83,8 @@ def lesson_new(request, course_id):
         if form.is_valid():
             lesson = form.save(commit=False)
             lesson.course = course
+            # yeni ders sona eklenir; yeri kurs sayfasında sürükle-bırakla değişir
+            lesson.order = append_key(course.id)
             lesson.save()
             return redirect("course_detail", course_id=course.id)
     else:
@@ -131,23 +138,45 @@ def reorder_lessons(request, course_id):
     if request.user.role != "ADMIN" and course.owner_id != request.user.id:
         return render(request, "courses/forbidden.html", status=403)
 
-    lessons = Lesson.objects.filter(course=course)
-    updated = 0
+    # order_<id> = istenen sıra numarası (1, 2, ...); boş bırakılan yerinde kalır
+    ids = list(Lesson.objects.filter(course=course).order_by("order", "id").values_list("id", flat=True))
+    wanted = {}
+    for pos, lid in enumerate(ids, start=1):
+        val = request.POST.get(f"order_{lid}", "")
+        wanted[lid] = (int(val) if val.isdigit() else pos, pos)
 
-    for l in lessons:
-        key = f"order_{l.id}"
-        val = request.POST.get(key)
-        if val and val.isdigit():
-            new_order = int(val)
-            if l.order != new_order:
-                l.order = new_order
-                l.save(update_fields=["order"])
-                updated += 1
+    # sadece yeri değişen dersler yazılır (content/ordering.py)
+    updated = reorder(course.id, sorted(ids, key=wanted.get))
 
     messages.success(request, f"Sıralama güncellendi. ({updated} ders)")
     return redirect("course_detail", course_id=course.id)
 
 
+@login_required
+@teacher_required
+@require_POST
+def lesson_move(request, lesson_id):
+    """
+    POST /teacher/lesson/<id>/move/  after=<önceki dersin id'si> (boş: en başa)
+    Sürükle-bırak: normalde sadece taşınan dersin satırı güncellenir.
+    """
+    lesson = get_object_or_404(Lesson.objects.select_related("course"), id=lesson_id)
+
+    if request.user.role != "ADMIN" and lesson.course.owner_id != request.user.id:
+        return JsonResponse({"ok": False, "error": "Bu dersi taşıyamazsınız"}, status=403)
+
+    after = request.POST.get("after") or ""
+    if after and not after.isdigit():
+        return JsonResponse({"ok": False, "error": "after geçersiz"}, status=400)
+
+    try:
+        moved = move(lesson, int(after) if after else None)
+    except ValueError as e:
+        return JsonResponse({"ok": False, "error": str(e)}, status=400)
+
+    return JsonResponse({"ok": True, "data": {"id": lesson.id, "moved": moved}})
+
+
 # =========================
 # FILE / VIDEO UPLOAD
 # =========================
@@ -193,6 +222,108 @@ def video_new(request, lesson_id):
     return render(request, "teacher/video_new.html", {"form": form, "lesson": lesson})
 
 
+# =========================
+# RESUMABLE UPLOAD (tus benzeri, content/uploads.py)
+# =========================
+def _upload_headers(resp, session):
+    resp["Upload-Offset"] = str(session.offset)
+    resp["Upload-Length"] = str(session.size)
+    resp["Cache-Control"] = "no-store"
+    return resp
+
+
+@login_required
+@teacher_required
+@require_POST
+def upload_create(request, lesson_id):
+    """
+    POST /teacher/lesson/<id>/uploads/  kind=video|file, filename, size, title
+    201 + Location: parçaların gönderileceği adres
+    """
+    lesson = get_object_or_404(Lesson.objects.select_related("course"), id=lesson_id)
+
+    if request.user.role != "ADMIN" and lesson.course.owner_id != request.user.id:
+        return JsonResponse({"ok": False, "error": "Bu derse yükleme yapamazsınız"}, status=403)
+
+    try:
+        session = create_session(
+            request.user,
+            lesson,
+            request.POST.get("kind", UploadSession.Kind.VIDEO),
+            request.POST.get("filename"),
+            int(request.POST.get("size") or 0),
+            (request.POST.get("title") or "").strip(),
+        )
+    except ValueError as e:
+        return JsonResponse({"ok": False, "error": str(e)}, status=400)
+
+    url = reverse("teacher_upload", args=[session.id])
+    resp = JsonResponse({"ok": True, "data": {"id": str(session.id), "url": url}}, status=201)
+    resp["Location"] = url
+    return _upload_headers(resp, session)
+
+
+@login_required
+@teacher_required
+@require_http_methods(["HEAD", "PATCH", "DELETE"])
+def upload_detail(request, upload_id):
+    """
+    HEAD   -> Upload-Offset (devam etmek için)
+    PATCH  -> Upload-Offset başlığı + ham parça gövdesi; 204 + yeni Upload-Offset
+    DELETE -> yüklemeyi iptal et
+    """
+    session = get_object_or_404(UploadSession, id=upload_id, user=request.user)
+
+    if request.method == "HEAD":
+        return _upload_headers(HttpResponse(), session)
+
+    if request.method == "DELETE":
+        discard(session)
+        return HttpResponse(status=204)
+
+    try:
+        offset = int(request.headers.get("Upload-Offset", ""))
+        length = int(request.headers.get("Content-Length") or 0)
+    except ValueError:
+        return JsonResponse({"ok": False, "error": "Upload-Offset ve Content-Length gerekli"}, status=400)
+
+    try:
+        write_chunk(session, offset, request, length)
+    except UploadConflict as e:
+        session.refresh_from_db(fields=["offset"])
+        return _upload_headers(JsonResponse({"ok": False, "error": str(e)}, status=409), session)
+    except ValueError as e:
+        return _upload_headers(JsonResponse({"ok": False, "error": str(e)}, status=400), session)
+
+    return _upload_headers(HttpResponse(status=204), session)
+
+
+@login_required
+@teacher_required
+@require_http_methods(["GET", "POST"])
+def upload_finalize(request, upload_id):
+    """
+    POST -> birleştirmeyi başlat (arka planda); 202 + durum
+    GET  -> durum: uploading | assembling | failed (POST ile tekrar) | done (+ redirect)
+    """
+    session = get_object_or_404(UploadSession.objects.select_related("lesson"), id=upload_id, user=request.user)
+
+    if request.method == "POST":
+        try:
+            finalize(session)
+        except UploadConflict as e:
+            return _upload_headers(JsonResponse({"ok": False, "error": str(e)}, status=409), session)
+        # eager Celery'de birleştirme commit'te bitmiş olabilir
+        session.refresh_from_db()
+
+    data = {"kind": session.kind, **upload_status(session)}
+    if data["state"] == "done":
+        data["redirect"] = reverse("course_detail", args=[session.lesson.course_id])
+    resp = JsonResponse({"ok": True, "data": data}, status=202 if request.method == "POST" else 200)
+    resp["Cache-Control"] = "no-store"
+    return resp
+
+
 # =========================
 # EXAM
 # =========================
@@ -361,47 +492,20 @@ def course_students(request, course_id):
 def add_ready_lessons(request, course_id):
     course = get_object_or_404(Course, id=course_id)
     form = AddTopicLessonsForm(request.POST or None)
+    plan = None
 
     if request.method == "POST" and form.is_valid():
         grade = form.cleaned_data["grade"]
         subject = form.cleaned_data["subject"]
+        plan = compute_plan(course, grade, subject)
 
-        parents = TopicTemplate.objects.filter(
-            grade=grade, subject=subject, parent__isnull=True
-        ).order_by("order", "id")
-
-        created = 0
-
-        for p in parents:
-            _, created_parent = Lesson.objects.get_or_create(
-                course=course,
-                title=p.title,
-                defaults={"order": p.order * 100},
-            )
-            if created_parent:
-                created += 1
-
-            children = p.children.all().order_by("order", "id")
-            for c in children:
-                child_title = f"— {c.title}"
-                _, created_child = Lesson.objects.get_or_create(
-                    course=course,
-                    title=child_title,
-                    defaults={"order": (p.order * 100) + c.order},
-                )
-                if created_child:
-                    created += 1
-
-        try:
-            course.grade = grade.number
-            course.save()
-        except Exception:
-            pass
-
-        messages.success(request, f"{grade.number}. sınıf {subject.name} için {created} ders eklendi.")
-        return redirect("course_detail", course_id=course.id)
+        # önizleme: eklenecek / atlanacak dersler listelenir, yazılmaz
+        if "preview" not in request.POST:
+            created = apply_plan(plan)
+            messages.success(request, f"{grade.number}. sınıf {subject.name} için {created} ders eklendi.")
+            return redirect("course_detail", course_id=course.id)
 
-    return render(request, "teacher/add_ready_lessons.html", {"course": course, "form": form})
+    return render(request, "teacher/add_ready_lessons.html", {"course": course, "form": form, "plan": plan})
 
 
 # =========================
@@ -537,7 +641,8 @@ def attempt_detail(request, attempt_id):
     if request.user.role != "ADMIN" and exam.course.owner_id != request.user.id:
         return render(request, "courses/forbidden.html", status=403)
 
-    answers = Answer.objects.filter(attempt=attempt).select_related("question").order_by("question__order", "question__id")
+    # cevaplanmamış sorular satırsız (quiz/answers.py): boş olarak listelenir
+    answers = answer_sheet(attempt)
     return render(request, "teacher/attempt_detail.html", {"attempt": attempt, "exam": exam, "answers": answers})
 
 